@@ -4,29 +4,155 @@ Batch PDF to Excel Table Extractor
 
 Process multiple PDF files at once and extract all tables.
 
+Large documents are split into page-range shards so that several
+workers can share one long filing instead of it setting the wall-clock
+time of the whole batch.
+
 Usage:
-    python batch_extract_tables.py <directory>
+    python batch_extract_tables.py <directory> [--workers N] [--pages-per-shard N]
+                                   [--collapse-duplicates] [--templates FILE]
+                                   [--write-workers N] [--time-budget SECONDS]
+                                   [--cost-model FILE]
 
 Example:
     python batch_extract_tables.py ./pdfs
+    python batch_extract_tables.py ./pdfs --workers 4
 """
 
 import sys
 import os
 import glob
+import argparse
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, wait
 from pathlib import Path
 
 # Import the main extractor from src
-from src.extractor import extract_tables_from_pdf
+from src.backends import BACKENDS
+from src.budget import deadline_after
+from src.errors import record_error
+from src.estimate import (admit_documents, estimate_document, eta_seconds, format_eta,
+                          load_cost_model, scan_document)
+from src.packing import PackedTables, make_spill_dir, remove_spill_dir
+from src.pool import warm_pool
 from src.writer import create_excel_from_tables
+from src.shards import PAGES_PER_SHARD, plan_shards, extract_shard, merge_shard_results
+from src.pdf_source import release_shared_maps
+from src.templates import load_templates, save_templates
+
+
+def run_shards(shards, workers):
+    """
+    Run shard extraction tasks, yielding (shard, tables, error) as they finish.
+
+    With a single worker the shards run inline in this process. With
+    more, they run in the persistent warm pool (see src.pool). At most
+    two shards per worker are submitted at a time and new ones only when
+    results are consumed, so a caller that stops reading (because its
+    writers are busy) also stops extraction from piling up results in
+    memory.
+    """
+    if workers <= 1:
+        for shard in shards:
+            try:
+                yield (*extract_shard(shard), None)
+            except Exception as e:
+                yield shard, None, e
+        return
+
+    queued = iter(shards)
+    pool = warm_pool(workers, 'extract')
+    futures = {}
+    try:
+        while True:
+            for shard in queued:
+                futures[pool.submit(extract_shard, shard)] = shard
+                if len(futures) >= workers * 2:
+                    break
+            if not futures:
+                return
+            finished, _ = wait(futures, return_when=FIRST_COMPLETED)
+            for future in finished:
+                shard = futures.pop(future)
+                try:
+                    yield (*future.result(), None)
+                except Exception as e:
+                    yield shard, None, e
+    finally:
+        # The pool outlives this run; drop work nobody will read
+        for future in futures:
+            future.cancel()
+
+
+def write_document(job):
+    """
+    Stitch one document's shard results and write its workbook; runs in
+    the writer pool.
+
+    Module-level so it can be sent to worker processes. The shard
+    tables are usually PackedTables handles, so the process handing out
+    the job only forwards the handles; the cells are decoded once, here,
+    while they stream into the workbook. The spill files are deleted
+    once the workbook is saved, unless the job has a false 'release'
+    (their owner deletes them); a failed write leaves them in place, so
+    the document can be written again.
 
+    Args:
+        job (dict): 'pdf_path', 'output_path', 'errors' (extended by the
+            writer), 'results' ((shard, tables) tuples of the document)
+            and optionally 'collapse_duplicates' and 'release'
 
-def batch_extract(input_dir):
+    Returns:
+        dict: 'pdf_path', 'table_count', 'degraded' (tables cut short by
+        a time budget), 'errors' and 'error', set when the workbook
+        could not be written or the document had no tables
+    """
+    errors = job['errors']
+    table_count = degraded = 0
+    try:
+        tables = merge_shard_results(job['results'], job.get('collapse_duplicates', False))
+        table_count = len(tables)
+        degraded = sum(1 for t in tables if t.get('degraded'))
+        if not tables:
+            raise ValueError("No tables found")
+        create_excel_from_tables(tables, job['output_path'], errors=errors)
+    except Exception as e:
+        error = e
+    else:
+        error = None
+        if job.get('release', True):
+            for _, shard_tables in job['results']:
+                if isinstance(shard_tables, PackedTables):
+                    shard_tables.release()
+    return {'pdf_path': job['pdf_path'], 'table_count': table_count, 'degraded': degraded,
+            'errors': errors, 'error': error}
+
+
+def batch_extract(input_dir, workers=1, pages_per_shard=PAGES_PER_SHARD,
+                  collapse_duplicates=False, templates_path=None, write_workers=1,
+                  borderless=False, backend='pdfplumber', time_budget=None,
+                  cost_model_path=None):
     """
     Process all PDF files in a directory.
     
     Args:
         input_dir (str): Directory containing PDF files
+        workers (int): Number of worker processes
+        pages_per_shard (int): Target shard size for large documents
+        collapse_duplicates (bool): Write repeated tables of a document once
+        templates_path (str, optional): Layout template store shared by
+            recurring filings; updated with the layouts seen in this batch
+        write_workers (int): Processes serializing workbooks while the
+            next documents are extracted (0 writes inline)
+        borderless (bool): Also read tables on pages without rulings
+        backend (str): Page parser, 'pdfplumber' or 'pdfium'
+        time_budget (float, optional): Seconds for the whole batch.
+            Documents whose estimated time does not fit are rejected up
+            front; small documents run first; when time runs out costly
+            steps are skipped, then remaining pages, and every document
+            is written with the tables found so far
+        cost_model_path (str, optional): Cost model calibrated with
+            calibrate_estimator.py; defaults to the built-in one
     """
     
     # Validate directory
@@ -51,26 +177,138 @@ def batch_extract(input_dir):
     print()
     print(f"📁 Directory: {input_dir}")
     print(f"📄 PDF files found: {len(pdf_files)}")
+    print(f"⚙️  Workers: {workers} extracting, {write_workers} writing")
     print()
     
-    # Process each PDF
-    success_count = 0
-    error_count = 0
-    total_tables = 0
+    deadline = deadline_after(time_budget)
+    templates = load_templates(templates_path) if templates_path else None
+    model = load_cost_model(cost_model_path) if cost_model_path else None
+    # Results crossing a process boundary travel as packed spill files
+    # (see src.packing) instead of pickled cells
+    spill_dir = make_spill_dir() if workers > 1 or write_workers > 0 else None
+    shards = []
+    pending = {}
+    totals = {'success': 0, 'error': 0, 'skipped': 0, 'tables': 0, 'duplicate_chars': 0,
+              'degraded': 0, 'rejected': 0}
     
-    for idx, pdf_path in enumerate(pdf_files, start=1):
-        pdf_name = Path(pdf_path).name
+    # Pre-scan every document's content streams (far cheaper than
+    # parsing) to estimate its extraction time (see src.estimate)
+    estimates = {}
+    for pdf_path in pdf_files:
+        try:
+            scanned = scan_document(pdf_path)
+        except Exception as e:
+            print(f"❌ Error reading {Path(pdf_path).name}: {e}")
+            totals['error'] += 1
+            continue
+        if not scanned:
+            print(f"⚠️  {Path(pdf_path).name}: document has no pages")
+            totals['error'] += 1
+            continue
+        estimates[pdf_path] = estimate_document(scanned, backend, model)
+    
+    # Workers beyond the CPU count add no throughput to the estimate
+    parallel = max(1, min(workers, os.cpu_count() or 1))
+    if time_budget is not None:
+        _, rejected = admit_documents(
+            {p: e['seconds'] for p, e in estimates.items()}, time_budget, parallel)
+        for pdf_path in rejected:
+            print(f"⏭️  {Path(pdf_path).name}: estimated "
+                  f"{format_eta(estimates.pop(pdf_path)['seconds'])} does not fit "
+                  f"the time budget; rejected")
+            totals['rejected'] += 1
+    
+    total_estimate = sum(e['seconds'] for e in estimates.values())
+    print(f"⏱️  Estimated extraction time: {format_eta(eta_seconds(total_estimate, parallel))}")
+    
+    # Plan page-range shards for every document up front so the pool
+    # always has work, even while one long filing is still running
+    for pdf_path, estimate in estimates.items():
+        page_count = estimate['pages']
+        doc_shards = plan_shards(pdf_path, page_count, pages_per_shard,
+                                 page_costs=estimate['page_costs'])
+        if len(doc_shards) > 1:
+            print(f"✂️  {Path(pdf_path).name}: {page_count} pages "
+                  f"split into {len(doc_shards)} shards")
+        pending[pdf_path] = {'remaining': len(doc_shards), 'results': [],
+                             'error': None, 'errors': []}
+        for shard in doc_shards:
+            if templates is not None:
+                shard['templates'] = templates
+            shard['borderless'] = borderless
+            shard['backend'] = backend
+            shard['deadline'] = deadline
+            if spill_dir is not None:
+                shard['spill_dir'] = spill_dir
+        shards.extend(doc_shards)
+    
+    # Costliest shards first so long tasks start early; under a time
+    # budget cheapest first, so as many documents as possible finish
+    shards.sort(key=lambda s: s['estimate'], reverse=deadline is None)
+    
+    def finish(result):
+        """Account for one written (or failed) workbook."""
+        name = Path(result['pdf_path']).name
+        if result['error'] is not None:
+            print(f"      ❌ {name}: {result['error']}")
+            totals['error'] += 1
+            return
+        totals['degraded'] += result['degraded']
+        print(f"      ✅ {name}: extracted {result['table_count']} tables")
+        if result['errors']:
+            print(f"      ⚠️  {len(result['errors'])} page(s)/table(s) skipped")
+            totals['skipped'] += len(result['errors'])
+        totals['success'] += 1
+        totals['tables'] += result['table_count']
+    
+    # Writing a workbook (XML + zip) is CPU-bound, so it runs in its own
+    # pool while extraction continues. At most two documents per writer
+    # wait for serialization; beyond that this loop blocks, which in
+    # turn stops new extraction work (see run_shards).
+    # Writers come from the warm pool too: forked from the preloaded
+    # forkserver, not from this process whose pool threads are running
+    write_pool = warm_pool(write_workers, 'write') if write_workers > 0 else None
+    max_queued_writes = max(1, write_workers) * 2
+    writes = deque()
+    
+    done = 0
+    # Estimated and measured seconds of the finished shards, for the ETA
+    done_estimate = done_seconds = 0.0
+    for shard, tables, error in run_shards(shards, workers):
+        pdf_path = shard['pdf_path']
+        state = pending[pdf_path]
+        state['remaining'] -= 1
+        if 'cpu_seconds' in shard:
+            done_estimate += shard['estimate']
+            done_seconds += shard['cpu_seconds']
+        if error is not None:
+            # Only this shard's pages are lost; the others are still written
+            state['error'] = error
+            first, last = shard['page_range']
+            record_error(state['errors'], 'shard', error, pages=f"{first}-{last}")
+        else:
+            # Only the page range is needed to stitch the shards in order
+            state['results'].append(({'page_range': shard['page_range']}, tables))
+            state['errors'].extend(shard.get('errors', ()))
+            totals['duplicate_chars'] += shard.get('stats', {}).get('duplicate_chars', 0)
+            if templates is not None:
+                # Workers return their copy of the store with new layouts
+                templates.update(shard['templates'])
+        
+        if state['remaining'] > 0:
+            continue
         
-        print(f"[{idx}/{len(pdf_files)}] Processing: {pdf_name}")
+        # All shards of this document finished: queue it for writing. The
+        # writer stitches the shards, so only their handles pass through here
+        done += 1
+        pdf_name = Path(pdf_path).name
+        eta = eta_seconds(total_estimate - done_estimate, parallel, done_estimate, done_seconds)
+        print(f"[{done}/{len(pending)}] Processing: {pdf_name}"
+              + (f" (ETA {format_eta(eta)})" if done < len(pending) else ""))
         
         try:
-            # Extract tables
-            tables = extract_tables_from_pdf(pdf_path)
-            
-            if not tables:
-                print(f"      ⚠️  No tables found")
-                error_count += 1
-                continue
+            if not state['results']:
+                raise state['error']
             
             # Generate output filename
             pdf_stem = Path(pdf_path).stem
@@ -78,30 +316,52 @@ def batch_extract(input_dir):
             os.makedirs(output_dir, exist_ok=True)
             output_path = os.path.join(output_dir, f"{pdf_stem}_Tables.xlsx")
             
-            # Create Excel file
-            create_excel_from_tables(tables, output_path)
+            job = {'pdf_path': pdf_path, 'results': state['results'],
+                   'collapse_duplicates': collapse_duplicates,
+                   'output_path': output_path, 'errors': state['errors']}
+            state['results'] = []
+            if write_pool is None:
+                finish(write_document(job))
+                continue
             
-            print(f"      ✅ Extracted {len(tables)} tables")
-            success_count += 1
-            total_tables += len(tables)
+            # Backpressure: wait for the oldest workbook when the queue is full
+            while len(writes) >= max_queued_writes:
+                finish(writes.popleft().result())
+            writes.append(write_pool.submit(write_document, job))
+            while writes and writes[0].done():
+                finish(writes.popleft().result())
             
         except Exception as e:
             print(f"      ❌ Error: {e}")
-            error_count += 1
-        
-        print()
+            totals['error'] += 1
+    
+    while writes:
+        finish(writes.popleft().result())
+    
+    release_shared_maps()
+    if spill_dir is not None:
+        remove_spill_dir(spill_dir)
+    if templates_path:
+        save_templates(templates_path, templates)
     
     # Summary
     print("=" * 60)
     print("BATCH PROCESSING SUMMARY")
     print("=" * 60)
     print(f"Total files processed: {len(pdf_files)}")
-    print(f"Successful:           {success_count}")
-    print(f"Errors:               {error_count}")
-    print(f"Total tables extracted: {total_tables}")
+    print(f"Successful:           {totals['success']}")
+    print(f"Errors:               {totals['error']}")
+    if totals['rejected']:
+        print(f"Rejected (over budget): {totals['rejected']}")
+    print(f"Skipped pages/tables: {totals['skipped']}")
+    print(f"Total tables extracted: {totals['tables']}")
+    if totals['duplicate_chars']:
+        print(f"Overprinted chars removed: {totals['duplicate_chars']}")
+    if totals['degraded']:
+        print(f"Tables read the fast way to meet the time budget: {totals['degraded']}")
     print()
     
-    if success_count > 0:
+    if totals['success'] > 0:
         print("✅ Batch processing completed!")
         print(f"📂 Output directory: {os.path.join(os.getcwd(), 'Output_excel')}")
     else:
@@ -115,14 +375,48 @@ def main():
         print("Batch PDF to Excel Table Extractor")
         print("=" * 50)
         print("\nUsage:")
-        print("  python batch_extract_tables.py <directory>")
+        print("  python batch_extract_tables.py <directory> [--workers N] [--pages-per-shard N]")
+        print("                                 [--collapse-duplicates] [--templates FILE]")
+        print("                                 [--write-workers N] [--borderless]")
+        print("                                 [--backend {pdfplumber,pdfium}] [--time-budget SECONDS]")
+        print("                                 [--cost-model FILE]")
         print("\nExample:")
         print("  python batch_extract_tables.py ./pdfs")
+        print("  python batch_extract_tables.py ./pdfs --workers 4")
         print()
         sys.exit(1)
     
-    input_dir = sys.argv[1]
-    batch_extract(input_dir)
+    parser = argparse.ArgumentParser(description="Batch PDF to Excel Table Extractor")
+    parser.add_argument("input_dir", help="Directory containing PDF files")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="Number of worker processes (default: CPU count)")
+    parser.add_argument("--pages-per-shard", type=int, default=PAGES_PER_SHARD,
+                        help="Target pages per shard for large documents")
+    parser.add_argument("--collapse-duplicates", action="store_true",
+                        help="Write tables that repeat within a document only once")
+    parser.add_argument("--templates", metavar="FILE",
+                        help="Layout template store shared by recurring filings")
+    parser.add_argument("--write-workers", type=int, default=1,
+                        help="Processes writing workbooks while extraction continues "
+                             "(0 writes in the main process)")
+    parser.add_argument("--borderless", action="store_true",
+                        help="Also find tables on pages without ruled lines")
+    parser.add_argument("--backend", choices=BACKENDS, default='pdfplumber',
+                        help="Parser of page chars and rulings (default: pdfplumber)")
+    parser.add_argument("--time-budget", type=float, metavar="SECONDS",
+                        help="Time for the whole batch; when it runs out, documents are "
+                             "written with the tables found so far")
+    parser.add_argument("--cost-model", metavar="FILE",
+                        help="Runtime cost model saved by calibrate_estimator.py")
+    args = parser.parse_args()
+    
+    batch_extract(args.input_dir, workers=max(1, args.workers),
+                  pages_per_shard=args.pages_per_shard,
+                  collapse_duplicates=args.collapse_duplicates,
+                  templates_path=args.templates,
+                  write_workers=max(0, args.write_workers),
+                  borderless=args.borderless, backend=args.backend,
+                  time_budget=args.time_budget, cost_model_path=args.cost_model)
 
 
 if __name__ == "__main__":
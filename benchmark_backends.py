@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Page Parser Benchmark
+
+Compares the page parsing backends (see src/backends.py) on a directory
+of PDFs: the time to parse chars and rulings, the time of the full table
+extraction, and how many tables come out with the same cells.
+
+Usage:
+    python benchmark_backends.py [directory] [--backends pdfplumber pdfium]
+                                 [--pages N]
+
+Example:
+    python benchmark_backends.py pdf
+    python benchmark_backends.py pdf --pages 20
+"""
+
+import sys
+import os
+import io
+import glob
+import time
+import argparse
+from contextlib import redirect_stdout
+from pathlib import Path
+from src.backends import BACKENDS, page_loader
+from src.extractor import extract_tables_from_pdf
+from src.pdf_source import open_pdf
+
+
+def time_parsing(pdf_path, backend, page_range):
+    """Seconds spent parsing the chars and rulings of the pages."""
+    first, last = page_range
+    start = time.perf_counter()
+    with open_pdf(pdf_path) as pdf, page_loader(pdf_path, backend) as load_page:
+        for page in pdf.pages[first - 1:last]:
+            page = load_page(page)
+            page.chars, page.edges
+            page.close()
+    return time.perf_counter() - start
+
+
+def run_backend(pdf_path, backend, page_range):
+    """
+    Parse and extract one document with one backend.
+
+    Returns:
+        dict: 'parse' and 'extract' seconds, 'tables' keyed by
+        (page, index_on_page) and the number of 'errors'
+    """
+    errors = []
+    parse = time_parsing(pdf_path, backend, page_range)
+    start = time.perf_counter()
+    with redirect_stdout(io.StringIO()):
+        tables = extract_tables_from_pdf(pdf_path, page_range=page_range, stitch=False,
+                                         errors=errors, backend=backend)
+    return {
+        'parse': parse,
+        'extract': time.perf_counter() - start,
+        'tables': {(t['page'], t['index_on_page']): t['table'].to_rows() for t in tables},
+        'errors': len(errors),
+    }
+
+
+def benchmark(input_dir, backends=BACKENDS, max_pages=None):
+    """
+    Benchmark every PDF in a directory with each backend.
+
+    The first backend is the reference: for the others, tables whose
+    cells differ from it are counted.
+    """
+    pdf_files = sorted(glob.glob(os.path.join(input_dir, "*.pdf")))
+    if not pdf_files:
+        print(f"No PDF files found in: {input_dir}")
+        sys.exit(0)
+
+    print("=" * 78)
+    print("Page Parser Benchmark")
+    print("=" * 78)
+    print(f"{'Document':<30} {'Backend':<11} {'Pages':>5} {'Parse s':>8} "
+          f"{'Extract s':>9} {'Tables':>6} {'Differ':>6}")
+    print("-" * 78)
+
+    totals = {b: {'parse': 0.0, 'extract': 0.0, 'tables': 0, 'differ': 0} for b in backends}
+    for pdf_path in pdf_files:
+        with open_pdf(pdf_path) as pdf:
+            page_count = len(pdf.pages)
+        page_range = (1, min(page_count, max_pages or page_count))
+        name = Path(pdf_path).name
+        name = name if len(name) <= 30 else name[:27] + "..."
+
+        reference = None
+        for backend in backends:
+            result = run_backend(pdf_path, backend, page_range)
+            if reference is None:
+                reference = result['tables']
+                differ = 0
+            else:
+                keys = set(reference) | set(result['tables'])
+                differ = sum(1 for k in keys if reference.get(k) != result['tables'].get(k))
+            t = totals[backend]
+            t['parse'] += result['parse']
+            t['extract'] += result['extract']
+            t['tables'] += len(result['tables'])
+            t['differ'] += differ
+            errors = f"  ({result['errors']} errors)" if result['errors'] else ""
+            print(f"{name:<30} {backend:<11} {page_range[1]:>5} {result['parse']:>8.2f} "
+                  f"{result['extract']:>9.2f} {len(result['tables']):>6} {differ:>6}{errors}")
+
+    print("-" * 78)
+    base = totals[backends[0]]
+    for backend in backends:
+        t = totals[backend]
+        speedup = base['extract'] / t['extract'] if t['extract'] else 0
+        print(f"{'Total':<30} {backend:<11} {'':>5} {t['parse']:>8.2f} "
+              f"{t['extract']:>9.2f} {t['tables']:>6} {t['differ']:>6}  x{speedup:.2f}")
+
+
+def main():
+    """Main function."""
+    parser = argparse.ArgumentParser(description="Compare page parsing backends")
+    parser.add_argument("input_dir", nargs="?", default="pdf",
+                        help="Directory containing PDF files (default: pdf)")
+    parser.add_argument("--backends", nargs="+", choices=BACKENDS, default=list(BACKENDS),
+                        help="Backends to compare; the first is the reference")
+    parser.add_argument("--pages", type=int, metavar="N",
+                        help="Only the first N pages of each document")
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.input_dir):
+        print(f"Error: Directory not found: {args.input_dir}")
+        sys.exit(1)
+    benchmark(args.input_dir, args.backends, args.pages)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Runtime Cost Model Calibration
+
+Times the extraction of every page of a directory of PDFs with each
+page parsing backend, fits the per-page cost model of src/estimate.py
+to the measurements and reports how well it predicts whole documents.
+
+Usage:
+    python calibrate_estimator.py [directory] [--backends pdfplumber pdfium]
+                                  [--output FILE]
+
+Example:
+    python calibrate_estimator.py pdf
+    python calibrate_estimator.py pdf --output cost_model.json
+"""
+
+import sys
+import os
+import io
+import glob
+import json
+import time
+import argparse
+from contextlib import redirect_stdout
+from pathlib import Path
+from src.backends import BACKENDS, page_loader
+from src.estimate import estimate_document, fit_cost_model, scan_document
+from src.extractor import extract_page_tables
+from src.overprint import dedupe_page_chars
+from src.pdf_source import open_pdf
+
+
+def time_pages(pdf_path, backend):
+    """Seconds spent extracting each page, in page order."""
+    seconds = []
+    with open_pdf(pdf_path) as pdf, page_loader(pdf_path, backend) as load_page:
+        for page in pdf.pages:
+            start = time.perf_counter()
+            try:
+                with redirect_stdout(io.StringIO()):
+                    extract_page_tables(dedupe_page_chars(load_page(page)))
+            except Exception:
+                pass  # a failing page still cost its time
+            finally:
+                page.close()
+            seconds.append(time.perf_counter() - start)
+    return seconds
+
+
+def calibrate(input_dir, backends=BACKENDS):
+    """
+    Measure every page of every PDF and fit one cost model per backend.
+
+    Returns:
+        dict: backend -> fitted coefficients (see src.estimate.COST_MODEL)
+    """
+    pdf_files = sorted(glob.glob(os.path.join(input_dir, "*.pdf")))
+    if not pdf_files:
+        print(f"No PDF files found in: {input_dir}")
+        sys.exit(0)
+
+    scans = {pdf_path: scan_document(pdf_path) for pdf_path in pdf_files}
+    measured = {}
+    for backend in backends:
+        for pdf_path in pdf_files:
+            print(f"Timing {Path(pdf_path).name} with {backend}...")
+            measured[backend, pdf_path] = time_pages(pdf_path, backend)
+
+    model = {}
+    for backend in backends:
+        samples = [(features, seconds)
+                   for pdf_path in pdf_files
+                   for features, seconds in zip(scans[pdf_path], measured[backend, pdf_path])
+                   if features is not None]
+        model[backend] = fit_cost_model(samples)
+
+    print()
+    print("=" * 70)
+    print(f"{'Document':<30} {'Backend':<11} {'Pages':>5} {'Measured s':>10} "
+          f"{'Predicted s':>11}")
+    print("-" * 70)
+    for backend in backends:
+        for pdf_path in pdf_files:
+            name = Path(pdf_path).name
+            name = name if len(name) <= 30 else name[:27] + "..."
+            predicted = estimate_document(scans[pdf_path], backend, model)['seconds']
+            actual = sum(measured[backend, pdf_path])
+            print(f"{name:<30} {backend:<11} {len(scans[pdf_path]):>5} {actual:>10.2f} "
+                  f"{predicted:>11.2f}")
+    print("=" * 70)
+    return model
+
+
+def main():
+    """Main function."""
+    parser = argparse.ArgumentParser(description="Calibrate the runtime cost model")
+    parser.add_argument("input_dir", nargs="?", default="pdf",
+                        help="Directory containing PDF files (default: pdf)")
+    parser.add_argument("--backends", nargs="+", choices=BACKENDS, default=list(BACKENDS),
+                        help="Backends to calibrate")
+    parser.add_argument("--output", metavar="FILE",
+                        help="Save the fitted model as JSON (see --cost-model)")
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.input_dir):
+        print(f"Error: Directory not found: {args.input_dir}")
+        sys.exit(1)
+    model = calibrate(args.input_dir, args.backends)
+    print(json.dumps(model, indent=4))
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(model, f, indent=2)
+        print(f"Saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+Distributed Batch Table Extractor
+
+Spreads a batch over several machines that share a directory (e.g. an
+NFS mount), without any broker: the documents are queued as page-range
+shard tasks in a queue directory (see src.workqueue), and every node
+that runs `work` claims shards, extracts them and, once all shards of a
+document are done, writes its workbook. Work abandoned by a node that
+died is picked up by the others when its lease expires.
+
+Usage:
+    python distributed_extract.py submit <directory> <queue> [--pages-per-shard N]
+                                  [--collapse-duplicates] [--borderless]
+                                  [--backend {pdfplumber,pdfium}] [--cost-model FILE]
+                                  [--output-dir DIR]
+    python distributed_extract.py work <queue> [--workers N] [--lease SECONDS]
+    python distributed_extract.py status <queue>
+
+Example:
+    python distributed_extract.py submit /mnt/shared/pdfs /mnt/shared/queue
+    python distributed_extract.py work /mnt/shared/queue --workers 4   # on every node
+"""
+
+import sys
+import os
+import glob
+import time
+import uuid
+import argparse
+from pathlib import Path
+from src.backends import BACKENDS
+from src.errors import record_error
+from src.estimate import estimate_document, load_cost_model, scan_document
+from src.pool import warm_pool
+from src.shards import PAGES_PER_SHARD, plan_shards, extract_shard
+from src.workqueue import LEASE_SECONDS, WorkQueue
+from batch_extract_tables import write_document
+
+
+def submit(input_dir, queue_dir, pages_per_shard=PAGES_PER_SHARD, collapse_duplicates=False,
+           borderless=False, backend='pdfplumber', cost_model_path=None, output_dir=None):
+    """
+    Queue every PDF of a directory as shard tasks plus one write task each.
+
+    Paths are stored as given (made absolute), so the input, queue and
+    output directories must be reachable under the same paths on every
+    node. Task ids start with an id of this submission, so a queue can
+    take several submissions without one reading the results of another.
+
+    Args:
+        input_dir (str): Directory containing PDF files
+        queue_dir (str): Shared queue directory
+        pages_per_shard (int): Target shard size for large documents
+        collapse_duplicates (bool): Write repeated tables of a document once
+        borderless (bool): Also read tables on pages without rulings
+        backend (str): Page parser, 'pdfplumber' or 'pdfium'
+        cost_model_path (str, optional): Cost model calibrated with
+            calibrate_estimator.py; shards are cut at equal estimated cost
+        output_dir (str, optional): Where workbooks are written
+            (default: Output_excel in the current directory)
+
+    Returns:
+        int: Number of documents queued
+    """
+    pdf_files = sorted(glob.glob(os.path.join(os.path.abspath(input_dir), "*.pdf")))
+    output_dir = os.path.abspath(output_dir or os.path.join(os.getcwd(), "Output_excel"))
+    model = load_cost_model(cost_model_path) if cost_model_path else None
+    queue = WorkQueue(queue_dir)
+
+    estimates = {}
+    for pdf_path in pdf_files:
+        try:
+            scanned = scan_document(pdf_path)
+        except Exception as e:
+            print(f"❌ Error reading {Path(pdf_path).name}: {e}")
+            continue
+        if not scanned:
+            print(f"⚠️  {Path(pdf_path).name}: document has no pages")
+            continue
+        estimates[pdf_path] = estimate_document(scanned, backend, model)
+
+    # Task ids sort in claim order: earlier submissions first and, within
+    # one, costliest documents first, so long filings are started early
+    # and do not finish last
+    batch = f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+    ordered = sorted(estimates, key=lambda p: estimates[p]['seconds'], reverse=True)
+    for doc, pdf_path in enumerate(ordered):
+        estimate = estimates[pdf_path]
+        shards = plan_shards(pdf_path, estimate['pages'], pages_per_shard,
+                             page_costs=estimate['page_costs'])
+        shard_ids = []
+        for shard in shards:
+            shard.update(kind='extract', borderless=borderless, backend=backend)
+            shard_ids.append(f"{batch}-{doc:04d}-s{shard['shard']:03d}")
+            queue.put(shard_ids[-1], shard)
+        output_path = os.path.join(output_dir, f"{Path(pdf_path).stem}_Tables.xlsx")
+        queue.put(f"{batch}-{doc:04d}-write",
+                  {'kind': 'write', 'pdf_path': pdf_path, 'shards': shard_ids,
+                   'output_path': output_path, 'collapse_duplicates': collapse_duplicates},
+                  after=shard_ids, consumes=True)
+        print(f"📥 {Path(pdf_path).name}: {estimate['pages']} pages in {len(shards)} shard(s)")
+    return len(ordered)
+
+
+def handle_task(task, queue, claim):
+    """
+    Run one queued task on this node.
+
+    'extract' tasks pack their tables into the claim's output directory
+    in the queue, so the node writing the document can read them.
+    'write' tasks stitch the shard results of a document and write its
+    workbook; shards that failed cost only their own pages. The queue
+    deletes the shard results and spill files once the write task is
+    completed, so a write retried after a lost lease still finds them.
+
+    Returns:
+        The shard and its PackedTables for 'extract' tasks, or the
+        write_document() summary for 'write' tasks
+    """
+    if task['kind'] == 'extract':
+        task['spill_dir'] = queue.output_dir(claim)
+        return extract_shard(task)
+
+    results, errors = [], []
+    for shard_id in task['shards']:
+        try:
+            result = queue.result(shard_id)
+        except KeyError:
+            result = RuntimeError(f"shard {shard_id} was abandoned too often")
+        if isinstance(result, Exception):
+            record_error(errors, 'shard', result, task=shard_id)
+            continue
+        shard, tables = result
+        if tables.path is not None:
+            # Spill files are addressed relative to this node's mount
+            tables.path = os.path.join(queue.result_dir(shard_id),
+                                       os.path.basename(tables.path))
+        results.append((shard, tables))
+        errors.extend(shard.get('errors', ()))
+
+    name = Path(task['pdf_path']).name
+    if not results:
+        raise RuntimeError(f"no shard of {name} was extracted")
+    os.makedirs(os.path.dirname(task['output_path']), exist_ok=True)
+    summary = write_document({'pdf_path': task['pdf_path'], 'results': results,
+                              'collapse_duplicates': task['collapse_duplicates'],
+                              'output_path': task['output_path'], 'errors': errors,
+                              'release': False})
+    if summary['error'] is not None:
+        print(f"❌ {name}: {summary['error']}")
+    else:
+        print(f"✅ {name}: extracted {summary['table_count']} tables")
+    return summary
+
+
+def run_node(queue_dir, lease_seconds=LEASE_SECONDS):
+    """
+    Work on a queue until it is finished; runs in each worker process.
+
+    Returns:
+        int: Number of tasks this process completed
+    """
+    return WorkQueue(queue_dir, lease_seconds=lease_seconds).run(handle_task)
+
+
+def work(queue_dir, workers=1, lease_seconds=LEASE_SECONDS):
+    """
+    Join the queue with `workers` processes of this machine.
+
+    Returns:
+        int: Number of tasks completed here
+    """
+    if workers <= 1:
+        return run_node(queue_dir, lease_seconds)
+    pool = warm_pool(workers, 'queue')
+    futures = [pool.submit(run_node, queue_dir, lease_seconds) for _ in range(workers)]
+    return sum(future.result() for future in futures)
+
+
+def print_status(queue_dir):
+    """Print how many tasks are in each state and which node runs what."""
+    queue = WorkQueue(queue_dir)
+    counts = queue.status()
+    print(f"Pending: {counts['pending']}  Running: {counts['claimed']}  "
+          f"Done: {counts['done']}  Failed: {counts['failed']}")
+    for name in sorted(os.listdir(os.path.join(queue_dir, 'claimed'))):
+        task_id, _, node = name.split('~', 2)
+        print(f"  {task_id} on {node}")
+    if queue.finished():
+        print("✅ Queue finished")
+
+
+def main():
+    """Main function."""
+    parser = argparse.ArgumentParser(description="Distributed Batch Table Extractor")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    submit_parser = commands.add_parser("submit", help="Queue a directory of PDFs")
+    submit_parser.add_argument("input_dir", help="Directory containing PDF files")
+    submit_parser.add_argument("queue_dir", help="Shared queue directory")
+    submit_parser.add_argument("--pages-per-shard", type=int, default=PAGES_PER_SHARD,
+                               help="Target pages per shard for large documents")
+    submit_parser.add_argument("--collapse-duplicates", action="store_true",
+                               help="Write tables that repeat within a document only once")
+    submit_parser.add_argument("--borderless", action="store_true",
+                               help="Also find tables on pages without ruled lines")
+    submit_parser.add_argument("--backend", choices=BACKENDS, default='pdfplumber',
+                               help="Parser of page chars and rulings (default: pdfplumber)")
+    submit_parser.add_argument("--cost-model", metavar="FILE",
+                               help="Runtime cost model saved by calibrate_estimator.py")
+    submit_parser.add_argument("--output-dir", metavar="DIR",
+                               help="Shared directory for the workbooks "
+                                    "(default: ./Output_excel)")
+
+    work_parser = commands.add_parser("work", help="Work on a queue until it is finished")
+    work_parser.add_argument("queue_dir", help="Shared queue directory")
+    work_parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                             help="Worker processes on this node (default: CPU count)")
+    work_parser.add_argument("--lease", type=float, default=LEASE_SECONDS, metavar="SECONDS",
+                             help="Seconds without heartbeat after which a task is "
+                                  "taken over by another node")
+
+    status_parser = commands.add_parser("status", help="Show the progress of a queue")
+    status_parser.add_argument("queue_dir", help="Shared queue directory")
+    args = parser.parse_args()
+
+    if args.command == "submit":
+        if not os.path.isdir(args.input_dir):
+            print(f"❌ Error: Directory not found: {args.input_dir}")
+            sys.exit(1)
+        queued = submit(args.input_dir, args.queue_dir, args.pages_per_shard,
+                        collapse_duplicates=args.collapse_duplicates,
+                        borderless=args.borderless, backend=args.backend,
+                        cost_model_path=args.cost_model, output_dir=args.output_dir)
+        print(f"📥 Queued {queued} document(s) in {args.queue_dir}")
+    elif args.command == "work":
+        completed = work(args.queue_dir, max(1, args.workers), args.lease)
+        print(f"✅ Completed {completed} task(s) on this node")
+    else:
+        print_status(args.queue_dir)
+
+
+if __name__ == "__main__":
+    main()
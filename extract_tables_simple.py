@@ -13,7 +13,8 @@ import sys
 import os
 
 # Import the main extractor
-from pdf_to_excel_tables import extract_tables_from_pdf, create_excel_from_tables
+from src.extractor import extract_tables_from_pdf
+from src.writer import create_excel_from_tables
 
 
 def main():
@@ -41,7 +42,11 @@ def main():
     print()
     
     # Extract tables
-    tables = extract_tables_from_pdf(pdf_path)
+    try:
+        tables = extract_tables_from_pdf(pdf_path)
+    except Exception as e:
+        print(f"❌ Error reading PDF: {e}")
+        sys.exit(1)
     
     if not tables:
         print("⚠️  No tables found in the PDF")
@@ -56,7 +61,11 @@ def main():
     output_path = f"/home/z/my-project/download/{pdf_name}_Tables.xlsx"
     
     print("💾 Creating Excel file...")
-    create_excel_from_tables(tables, output_path)
+    try:
+        create_excel_from_tables(tables, output_path)
+    except Exception as e:
+        print(f"❌ Error saving Excel file: {e}")
+        sys.exit(1)
     
     print()
     print("✅ Done! Your Excel file is ready:")
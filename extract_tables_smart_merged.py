@@ -91,6 +91,15 @@ def create_styles():
     }
 
 
+def _occupancy(row, strip=True):
+    """Bitmap of a row's cells with content (bit i set for column i)."""
+    mask = 0
+    for col_idx, cell in enumerate(row or ()):
+        if cell and (not strip or str(cell).strip()):
+            mask |= 1 << col_idx
+    return mask
+
+
 def analyze_column_structure(table):
     """
     Analyze table structure to detect column groupings.
@@ -109,61 +118,51 @@ def analyze_column_structure(table):
         'column_groups': []
     }
     
-    # Analyze first 3 rows for header patterns
+    # Analyze first 3 rows for header patterns. Occupancy bitmaps for
+    # the rows involved are built once; spans then come from bit tests.
     max_analysis_rows = min(3, len(table))
+    look_rows = min(max_analysis_rows + 2, len(table))
+    # Content in the current row is judged on stripped text, content
+    # below on raw truthiness
+    text_masks = [_occupancy(table[r], strip=True) for r in range(look_rows)]
+    raw_masks = [_occupancy(table[r], strip=False) for r in range(look_rows)]
     
     for row_idx in range(max_analysis_rows):
         row = table[row_idx]
         if not row:
             continue
         
-        # Find groups of consecutive empty cells
-        # These often indicate merged cells above
-        groups = []
-        current_group = None
+        here = text_masks[row_idx]
+        below = 0
+        for below_row_idx in range(row_idx + 1, min(row_idx + 3, len(table))):
+            below |= raw_masks[below_row_idx]
+        # Cells a header can span: empty in this row, content below
+        spannable = below & ~here
         
-        for col_idx, cell in enumerate(row):
-            cell_value = str(cell).strip() if cell else ''
+        col_idx = 0
+        while col_idx < len(row):
+            if not here >> col_idx & 1:
+                col_idx += 1
+                continue
             
-            if cell_value:
-                # This cell has content, check if it spans multiple columns
-                # Look ahead to see if next cells are empty in the same row
-                # but have content in rows below
-                span = 1
-                next_col = col_idx + 1
-                
-                while next_col < len(row):
-                    next_cell_value = str(row[next_col]).strip() if row[next_col] else ''
-                    
-                    if not next_cell_value:  # Empty in current row
-                        # Check if there's content in rows below
-                        has_below_content = False
-                        for below_row_idx in range(row_idx + 1, min(row_idx + 3, len(table))):
-                            if below_row_idx < len(table):
-                                below_cell = table[below_row_idx]
-                                if next_col < len(below_cell) and below_cell[next_col]:
-                                    has_below_content = True
-                                    break
-                        
-                        if has_below_content:
-                            span += 1
-                            next_col += 1
-                        else:
-                            break
-                    else:
-                        break
+            next_col = col_idx + 1
+            while next_col < len(row) and spannable >> next_col & 1:
+                next_col += 1
+            span = next_col - col_idx
+            
+            if span > 1:
+                # This is a merged header
+                result['column_groups'].append({
+                    'row': row_idx + 1,  # 1-based
+                    'start_col': col_idx + 1,
+                    'end_col': col_idx + span,
+                    'label': str(row[col_idx]).strip()
+                })
                 
-                if span > 1:
-                    # This is a merged header
-                    result['column_groups'].append({
-                        'row': row_idx + 1,  # 1-based
-                        'start_col': col_idx + 1,
-                        'end_col': col_idx + span,
-                        'label': cell_value
-                    })
-                    
-                    # Update header row count
-                    result['header_rows'] = max(result['header_rows'], row_idx + 1)
+                # Update header row count
+                result['header_rows'] = max(result['header_rows'], row_idx + 1)
+            
+            col_idx += 1
     
     return result
 
@@ -95,6 +95,15 @@ def create_styles():
     }
 
 
+def _occupancy(row):
+    """Bitmap of a row's non-empty cells (bit i set for column i)."""
+    mask = 0
+    for col_idx, cell in enumerate(row or ()):
+        if cell and str(cell).strip():
+            mask |= 1 << col_idx
+    return mask
+
+
 def detect_header_rows(table):
     """
     Detect which rows are header rows and identify column groupings.
@@ -110,40 +119,45 @@ def detect_header_rows(table):
     header_row_count = 1
     column_groups = []
     
+    # Occupancy bitmaps of the rows involved, built once: non-empty counts
+    # are popcounts and group spans come from runs of empty next-row cells
+    look_rows = min(4, len(table))
+    masks = [_occupancy(table[r]) for r in range(look_rows)]
+    
     # Look for patterns that indicate grouped headers
     for row_idx in range(min(3, len(table))):
         row = table[row_idx]
         if not row:
             continue
         
-        # Count non-empty cells
-        non_empty = sum(1 for cell in row if cell and str(cell).strip())
+        non_empty = masks[row_idx].bit_count()
         
         # If this row has significantly fewer non-empty cells than the next row,
         # it might be a grouping row
         if row_idx + 1 < len(table):
             next_row = table[row_idx + 1]
-            next_non_empty = sum(1 for cell in next_row if cell and str(cell).strip())
+            next_mask = masks[row_idx + 1]
+            next_non_empty = next_mask.bit_count()
             
             if non_empty > 0 and next_non_empty > 0 and non_empty < next_non_empty:
                 # This row likely contains grouped headers
                 header_row_count = max(header_row_count, row_idx + 1)
                 
+                # empty_run[c]: consecutive empty next-row cells from column c
+                empty_run = [0] * (len(next_row) + 1)
+                for col in range(len(next_row) - 1, -1, -1):
+                    if not next_mask >> col & 1:
+                        empty_run[col] = empty_run[col + 1] + 1
+                
                 # Detect column groupings
-                for col_idx, cell in enumerate(row):
-                    if cell and str(cell).strip():
-                        # Check how many consecutive cells in next row belong to this group
-                        group_span = 1
+                for col_idx in range(len(row)):
+                    if masks[row_idx] >> col_idx & 1:
+                        # Consecutive empty cells in next row belong to this group
                         next_col = col_idx + 1
-                        while next_col < len(next_row):
-                            if next_row[next_col] is None or not str(next_row[next_col]).strip():
-                                group_span += 1
-                                next_col += 1
-                            else:
-                                break
+                        group_span = 1 + (empty_run[next_col] if next_col < len(next_row) else 0)
                         
                         if group_span > 1:
-                            column_groups.append((col_idx, col_idx + group_span - 1, str(cell).strip()))
+                            column_groups.append((col_idx, col_idx + group_span - 1, str(row[col_idx]).strip()))
     
     return header_row_count, column_groups
 
@@ -5,17 +5,30 @@ Extracts all tables from a PDF file and saves them to an Excel workbook with eac
 
 Usage:
     python pdf_to_excel_tables.py <pdf_file_path> [output_excel_path]
+                                  [--collapse-duplicates] [--templates FILE] [--resume]
+                                  [--tables-per-workbook N] [--pages-per-workbook N]
+                                  [--write-workers N] [--time-budget SECONDS]
 
 Example:
     python pdf_to_excel_tables.py document.pdf
     python pdf_to_excel_tables.py document.pdf output.xlsx
+    python pdf_to_excel_tables.py document.pdf --collapse-duplicates
+    python pdf_to_excel_tables.py Q2_FY_26.pdf --templates layouts.json
+    python pdf_to_excel_tables.py long_report.pdf --resume
+    python pdf_to_excel_tables.py annual_report.pdf --tables-per-workbook 50 --write-workers 4
+    python pdf_to_excel_tables.py annual_report.pdf --time-budget 30
 """
 
 import sys
 import os
+import argparse
 from pathlib import Path
-from src.extractor import extract_tables_from_pdf
-from src.writer import create_excel_from_tables
+from src.backends import BACKENDS
+from src.budget import deadline_after
+from src.extractor import extract_tables_to_journal, journal_tables
+from src.journal import journal_path_for
+from src.templates import load_templates, save_templates
+from src.writer import create_excel_from_tables, create_sharded_workbooks
 
 def main():
     """Main function to orchestrate the PDF to Excel conversion."""
@@ -26,13 +39,44 @@ def main():
         print("=" * 60)
         print("\nUsage:")
         print("  python pdf_to_excel_tables.py <pdf_file_path> [output_excel_path]")
+        print("                                [--collapse-duplicates] [--templates FILE] [--resume]")
+        print("                                [--tables-per-workbook N] [--pages-per-workbook N]")
+        print("                                [--write-workers N] [--keep-overprint] [--borderless]")
+        print("                                [--backend {pdfplumber,pdfium}] [--time-budget SECONDS]")
         print("\nExamples:")
         print("  python pdf_to_excel_tables.py document.pdf")
         print("  python pdf_to_excel_tables.py document.pdf output.xlsx")
         print()
         sys.exit(1)
     
-    pdf_path = sys.argv[1]
+    parser = argparse.ArgumentParser(description="PDF to Excel Table Extractor")
+    parser.add_argument("pdf_path", help="PDF file to extract tables from")
+    parser.add_argument("output_path", nargs="?",
+                        help="Output workbook (default: Output_excel/<name>_Tables.xlsx)")
+    parser.add_argument("--collapse-duplicates", action="store_true",
+                        help="Write tables that repeat within the document only once")
+    parser.add_argument("--templates", metavar="FILE",
+                        help="Layout template store shared by recurring filings")
+    parser.add_argument("--resume", action="store_true",
+                        help="Continue an interrupted run from its page journal")
+    parser.add_argument("--tables-per-workbook", type=int, metavar="N",
+                        help="Split the output into workbooks of at most N tables")
+    parser.add_argument("--pages-per-workbook", type=int, metavar="N",
+                        help="Split the output into workbooks spanning at most N pages")
+    parser.add_argument("--keep-overprint", action="store_true",
+                        help="Keep overprinted (fake-bold) duplicate chars")
+    parser.add_argument("--borderless", action="store_true",
+                        help="Also find tables on pages without ruled lines")
+    parser.add_argument("--backend", choices=BACKENDS, default='pdfplumber',
+                        help="Parser of page chars and rulings (default: pdfplumber)")
+    parser.add_argument("--write-workers", type=int, default=1, metavar="N",
+                        help="Processes writing split workbooks in parallel")
+    parser.add_argument("--time-budget", type=float, metavar="SECONDS",
+                        help="Stop extracting after this long and write the tables found "
+                             "so far, skipping costly rebuilds first")
+    args = parser.parse_args()
+    
+    pdf_path = args.pdf_path
     
     # Validate PDF file
     if not os.path.exists(pdf_path):
@@ -43,8 +87,8 @@ def main():
         print("Warning: Input file does not have .pdf extension")
     
     # Determine output path
-    if len(sys.argv) >= 3:
-        output_path = sys.argv[2]
+    if args.output_path:
+        output_path = args.output_path
     else:
         # Generate output filename from input filename
         pdf_name = Path(pdf_path).stem
@@ -60,23 +104,86 @@ def main():
     print("=" * 60)
     print()
     
-    # Extract tables
-    tables = extract_tables_from_pdf(pdf_path)
+    # Extract tables page by page into a checkpoint journal next to the
+    # output, so an interrupted run can continue with --resume
+    stats = {}
+    errors = []
+    journal_path = journal_path_for(output_path)
+    templates = load_templates(args.templates) if args.templates else None
+    deadline = deadline_after(args.time_budget)
+    try:
+        table_count = extract_tables_to_journal(pdf_path, journal_path, resume=args.resume,
+                                                stats=stats, templates=templates,
+                                                errors=errors,
+                                                dedupe_chars=not args.keep_overprint,
+                                                borderless=args.borderless,
+                                                backend=args.backend,
+                                                deadline=deadline)
+    except Exception as e:
+        print(f"Error reading PDF file: {e}")
+        print(f"Completed pages are kept in {journal_path}; rerun with --resume")
+        sys.exit(1)
+    if args.templates:
+        save_templates(args.templates, templates)
     
-    if not tables:
+    if not table_count and stats.get('deadline_pages'):
+        # Cut short before any table: keep the checkpoint for --resume
+        print(f"\nNo tables found before the time budget ran out; "
+              f"{stats['deadline_pages']} page(s) not extracted.")
+        print(f"Completed pages are kept in {journal_path}; rerun with --resume")
+        sys.exit(0)
+    if not table_count:
+        os.remove(journal_path)
         print("\nWarning: No tables found in the PDF file.")
         print("The PDF may not contain any tabular data.")
         sys.exit(0)
     
-    print(f"\nTotal tables found: {len(tables)}")
+    print(f"\nTables extracted: {table_count}")
+    if stats.get('duplicate_pages'):
+        print(f"Repeated pages reused: {stats['duplicate_pages']}")
+    if stats.get('template_hits'):
+        print(f"Pages filled from layout templates: {stats['template_hits']}")
+    if stats.get('duplicate_chars'):
+        print(f"Overprinted chars removed: {stats['duplicate_chars']}")
+    if stats.get('skipped_rebuild') or stats.get('skipped_borderless'):
+        print(f"Pages read the fast way to meet the time budget: "
+              f"{stats.get('skipped_rebuild', 0) + stats.get('skipped_borderless', 0)}")
     print()
     
-    # Create Excel file
-    create_excel_from_tables(tables, output_path)
+    # Create Excel file, streaming the tables back from the journal
+    try:
+        tables = journal_tables(journal_path, collapse_duplicates=args.collapse_duplicates,
+                                stats=stats)
+        if args.tables_per_workbook or args.pages_per_workbook:
+            # Several smaller workbooks linked by a JSON manifest
+            create_sharded_workbooks(tables, output_path,
+                                     tables_per_workbook=args.tables_per_workbook,
+                                     pages_per_workbook=args.pages_per_workbook,
+                                     workers=max(1, args.write_workers), errors=errors)
+        else:
+            create_excel_from_tables(tables, output_path, errors=errors)
+    except Exception as e:
+        print(f"Error saving Excel file: {e}")
+        print(f"Extracted pages are kept in {journal_path}; rerun with --resume")
+        sys.exit(1)
+    if stats.get('deadline_pages'):
+        # Out of time: keep the journal so the rest can be added later
+        print(f"{stats['deadline_pages']} page(s) not extracted within the time budget; "
+              f"rerun with --resume to complete {output_path}")
+    else:
+        os.remove(journal_path)
+    if stats.get('duplicate_tables'):
+        print(f"Repeated tables collapsed: {stats['duplicate_tables']}")
     
     print()
     print("=" * 60)
-    print("Process completed successfully!")
+    if errors:
+        print(f"Process completed with {len(errors)} skipped page(s)/table(s):")
+        for err in errors:
+            where = f"page {err['page']}" if err.get('page') else err['stage']
+            print(f"  - {where}: {err['error']}: {err['message']}")
+    else:
+        print("Process completed successfully!")
     print("=" * 60)
 
 
@@ -0,0 +1,326 @@
+
+import ctypes
+import io
+import mmap
+import os
+import pathlib
+from contextlib import contextmanager
+from src.errors import record_error
+
+try:
+    import pypdfium2 as pdfium
+    import pypdfium2.raw as pdfium_c
+except ImportError:  # optional: every page is parsed by pdfplumber
+    pdfium = pdfium_c = None
+
+# Where chars and ruling geometry come from: pdfplumber parses pages with
+# pdfminer; pdfium (C++, through pypdfium2) is several times faster on
+# text-dense pages
+BACKENDS = ('pdfplumber', 'pdfium')
+
+_IDENTITY = (1, 0, 0, 1, 0, 0)
+
+# pdfium reports a hyphen that ends a line as one of these
+_SOFT_HYPHENS = (0x2, 0xFFFE)
+
+
+def _compose(inner, outer):
+    """Matrix applying `inner` first, then `outer` (PDF (a b c d e f) order)."""
+    a, b, c, d, e, f = inner
+    A, B, C, D, E, F = outer
+    return (a * A + b * C, a * B + b * D,
+            c * A + d * C, c * B + d * D,
+            e * A + f * C + E, e * B + f * D + F)
+
+
+class _MapReader(io.RawIOBase):
+    """Seekable reader over a memory map; pypdfium2 needs readinto()."""
+
+    def __init__(self, mapped):
+        self._map = mapped
+        self._pos = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self._pos
+
+    def seek(self, offset, whence=os.SEEK_SET):
+        base = {os.SEEK_SET: 0, os.SEEK_CUR: self._pos, os.SEEK_END: len(self._map)}[whence]
+        self._pos = base + offset
+        return self._pos
+
+    def readinto(self, buffer):
+        data = self._map[self._pos:self._pos + len(buffer)]
+        buffer[:len(data)] = data
+        self._pos += len(data)
+        return len(data)
+
+
+def open_pdfium(source):
+    """
+    Open a PDF with pdfium from any source open_pdf accepts.
+
+    Returns:
+        pypdfium2.PdfDocument
+    """
+    if isinstance(source, (str, pathlib.Path)):
+        return pdfium.PdfDocument(str(source))
+    if isinstance(source, bytes):
+        return pdfium.PdfDocument(source)
+    if isinstance(source, (bytearray, memoryview)):
+        return pdfium.PdfDocument(bytes(source))
+    if isinstance(source, mmap.mmap):
+        return pdfium.PdfDocument(_MapReader(source))
+    if hasattr(source, 'read') and hasattr(source, 'seek'):
+        source.seek(0)
+        return pdfium.PdfDocument(source)
+    raise TypeError(f"Unsupported PDF source: {type(source).__name__}")
+
+
+def pdfium_chars(textpage, page):
+    """
+    Chars of a page from pdfium's text page, as pdfplumber char dicts.
+
+    Positions follow pdfminer's conventions: x0 is the glyph origin, and
+    the box spans from the font's descent below the baseline up by the
+    font size, so words, cells and font sizes come out the same as with
+    pdfplumber. Chars pdfium generates itself (line breaks and spaces
+    between words) are left out. Runs of padding spaces are reported
+    once, which does not change words or cells. Fonts that are not
+    embedded report the name and metrics of pdfium's substitute (Arial
+    for Helvetica), and some subset prefixes are dropped.
+
+    Args:
+        textpage: pypdfium2 PdfTextPage of the page
+        page: The pdfplumber page, for its height and page number
+
+    Returns:
+        list: Char dicts with 'text', 'fontname', 'size', 'upright',
+        'matrix' and the usual coordinates
+    """
+    height = page.mediabox[3] - page.mediabox[1]
+    doc_offset = page.initial_doctop
+    rect = pdfium_c.FS_RECTF()
+    matrix = pdfium_c.FS_MATRIX()
+    origin_x, origin_y = ctypes.c_double(), ctypes.c_double()
+    name = ctypes.create_string_buffer(256)
+    descent = ctypes.c_float()
+    fonts = {}
+    chars = []
+    for i in range(pdfium_c.FPDFText_CountChars(textpage)):
+        if pdfium_c.FPDFText_IsGenerated(textpage, i) == 1:
+            continue
+        code = pdfium_c.FPDFText_GetUnicode(textpage, i)
+        if code in (0, 0xA, 0xD):
+            continue
+        if code in _SOFT_HYPHENS:
+            code = ord('-')
+        pdfium_c.FPDFText_GetLooseCharBox(textpage, i, rect)
+        pdfium_c.FPDFText_GetCharOrigin(textpage, i, origin_x, origin_y)
+        pdfium_c.FPDFText_GetMatrix(textpage, i, matrix)
+        font_size = pdfium_c.FPDFText_GetFontSize(textpage, i)
+
+        # Chars of one text object share its font: name and descent
+        # (per point of font size) are looked up once
+        text_obj = pdfium_c.FPDFText_GetTextObject(textpage, i)
+        key = ctypes.cast(text_obj, ctypes.c_void_p).value
+        font = fonts.get(key)
+        if font is None:
+            handle = pdfium_c.FPDFTextObj_GetFont(text_obj)
+            pdfium_c.FPDFFont_GetBaseFontName(handle, name, len(name))
+            pdfium_c.FPDFFont_GetDescent(handle, 1.0, descent)
+            font = fonts[key] = (name.value.decode('utf-8', 'replace'), descent.value)
+        fontname, font_descent = font
+
+        a, b, c, d = matrix.a, matrix.b, matrix.c, matrix.d
+        upright = a * d > 0 and b * c <= 0
+        x0, x1, y0, y1 = rect.left, rect.right, rect.bottom, rect.top
+        if upright:
+            # The loose box reaches down to descenders ("g") instead
+            x0 = origin_x.value
+            y0 = origin_y.value + font_descent * font_size * d
+            y1 = y0 + font_size * d
+        top = height - y1
+        chars.append({
+            'object_type': 'char',
+            'page_number': page.page_number,
+            'text': chr(code),
+            'fontname': fontname,
+            'size': y1 - y0,
+            'adv': x1 - x0,
+            'upright': upright,
+            'matrix': (a, b, c, d, origin_x.value, origin_y.value),
+            'x0': x0, 'x1': x1, 'y0': y0, 'y1': y1,
+            'width': x1 - x0, 'height': y1 - y0,
+            'top': top, 'bottom': height - y0, 'doctop': doc_offset + top,
+        })
+    return chars
+
+
+def _shape_object(kind, pts, page, paint):
+    """pdfplumber dict of a line, rect or curve from its (x, top) points."""
+    xs = [x for x, _ in pts]
+    tops = [t for _, t in pts]
+    height = page.mediabox[3] - page.mediabox[1]
+    x0, x1, top, bottom = min(xs), max(xs), min(tops), max(tops)
+    obj = {
+        'object_type': kind,
+        'page_number': page.page_number,
+        'x0': x0, 'x1': x1, 'y0': height - bottom, 'y1': height - top,
+        'width': x1 - x0, 'height': bottom - top,
+        'top': top, 'bottom': bottom, 'doctop': page.initial_doctop + top,
+        'pts': pts,
+    }
+    obj.update(paint)
+    return obj
+
+
+def _classify(shape, pts):
+    """pdfminer's reading of one subpath: 'line', 'rect' or 'curve'."""
+    if shape.endswith('lh') and len(pts) > 2 and pts[-1] == pts[0]:
+        # pdfium spells out the segment back to the start of a closed
+        # path (a "re" rectangle comes as m l l l l h); pdfminer does not
+        shape, pts = shape[:-2] + 'h', pts[:-1]
+    if shape in ('ml', 'mlh'):
+        return 'line'
+    if shape in ('mlllh', 'mllll'):
+        (x0, y0), (x1, y1), (x2, y2), (x3, y3) = pts[:4]
+        if ((x0 == x1 and y1 == y2 and x2 == x3 and y3 == y0)
+                or (y0 == y1 and x1 == x2 and y2 == y3 and x3 == x0)):
+            return 'rect'
+    return 'curve'
+
+
+def pdfium_shapes(pdfium_page, page):
+    """
+    Painted lines, rects and curves of a page from pdfium's path objects.
+
+    Each subpath becomes one object and is classified as pdfminer does
+    (a single segment is a line, an axis-aligned four-sided closed path
+    a rect, anything else a curve), so the page's edges and table
+    rulings are the same as with pdfplumber. Paths inside form XObjects
+    are placed with the form's matrix.
+
+    Returns:
+        dict: 'line', 'rect' and 'curve' lists of pdfplumber dicts
+    """
+    height = page.mediabox[3] - page.mediabox[1]
+    shapes = {'line': [], 'rect': [], 'curve': []}
+    raw = pdfium_c.FS_MATRIX()
+    x, y = ctypes.c_float(), ctypes.c_float()
+    fill, stroke = ctypes.c_int(), ctypes.c_int()
+    width = ctypes.c_float()
+
+    # Matrix of the form object enclosing each nesting level
+    outer = [_IDENTITY]
+    for obj in pdfium_page.get_objects():
+        del outer[obj.level + 1:]
+        kind = pdfium_c.FPDFPageObj_GetType(obj)
+        if kind not in (pdfium_c.FPDF_PAGEOBJ_PATH, pdfium_c.FPDF_PAGEOBJ_FORM):
+            continue
+        pdfium_c.FPDFPageObj_GetMatrix(obj, raw)
+        ctm = _compose((raw.a, raw.b, raw.c, raw.d, raw.e, raw.f), outer[obj.level])
+        if kind == pdfium_c.FPDF_PAGEOBJ_FORM:
+            outer.append(ctm)
+            continue
+
+        pdfium_c.FPDFPath_GetDrawMode(obj, fill, stroke)
+        if fill.value == pdfium_c.FPDF_FILLMODE_NONE and not stroke.value:
+            continue  # clipping only
+        pdfium_c.FPDFPageObj_GetStrokeWidth(obj, width)
+        paint = {'fill': fill.value != pdfium_c.FPDF_FILLMODE_NONE,
+                 'stroke': bool(stroke.value), 'linewidth': width.value}
+
+        a, b, c, d, e, f = ctm
+        subpaths = []
+        for k in range(pdfium_c.FPDFPath_CountSegments(obj)):
+            segment = pdfium_c.FPDFPath_GetPathSegment(obj, k)
+            pdfium_c.FPDFPathSegment_GetPoint(segment, x, y)
+            seg_type = pdfium_c.FPDFPathSegment_GetType(segment)
+            point = (a * x.value + c * y.value + e, height - (b * x.value + d * y.value + f))
+            if seg_type == pdfium_c.FPDF_SEGMENT_MOVETO or not subpaths:
+                subpaths.append(['m', [point]])
+            else:
+                subpaths[-1][0] += 'l' if seg_type == pdfium_c.FPDF_SEGMENT_LINETO else 'c'
+                subpaths[-1][1].append(point)
+            if pdfium_c.FPDFPathSegment_GetClose(segment):
+                subpaths[-1][0] += 'h'
+
+        for shape, pts in subpaths:
+            if len(pts) < 2:
+                continue
+            kind = _classify(shape, pts)
+            shapes[kind].append(_shape_object(kind, pts, page, paint))
+    return shapes
+
+
+def load_pdfium_objects(page, pdfium_page):
+    """
+    Give a pdfplumber page the chars and shapes parsed by pdfium.
+
+    The objects replace pdfplumber's own parse (which would run on first
+    access), so cropping, filtering, word extraction and table finding
+    all work on them unchanged.
+    """
+    textpage = pdfium_page.get_textpage()
+    try:
+        objects = {'char': pdfium_chars(textpage, page)}
+    finally:
+        textpage.close()
+    objects.update((kind, objs) for kind, objs in pdfium_shapes(pdfium_page, page).items() if objs)
+    page._objects = objects
+    return page
+
+
+@contextmanager
+def page_loader(source, backend='pdfplumber', errors=None):
+    """
+    Prepare the pages of a document for the chosen backend.
+
+    Yields a function taking a pdfplumber page and returning it with its
+    objects loaded. With the pdfium backend, pages fall back to
+    pdfplumber when pypdfium2 is not installed, when the page is rotated
+    (pdfium reports unrotated coordinates) or when pdfium fails on it;
+    failures are recorded with stage 'backend'.
+
+    Args:
+        source: The PDF source given to open_pdf
+        backend (str): One of BACKENDS
+        errors (list, optional): Receives a record per page falling back
+            after a pdfium failure
+
+    Raises:
+        ValueError: Unknown backend
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown backend {backend!r}, expected one of {BACKENDS}")
+    if backend == 'pdfplumber' or pdfium is None:
+        if backend == 'pdfium':
+            print("  Note: pypdfium2 is not installed, parsing pages with pdfplumber")
+        yield lambda page: page
+        return
+
+    document = open_pdfium(source)
+
+    def load(page):
+        if page.rotation:
+            return page
+        try:
+            pdfium_page = document[page.page_number - 1]
+            try:
+                return load_pdfium_objects(page, pdfium_page)
+            finally:
+                pdfium_page.close()
+        except Exception as e:
+            record_error(errors, 'backend', e, page=page.page_number)
+            return page
+
+    try:
+        yield load
+    finally:
+        document.close()
@@ -0,0 +1,67 @@
+
+import time
+
+
+class TimeBudget:
+    """
+    Wall-clock deadline of an extraction and the cost of its steps so far.
+
+    The deadline is an absolute `time.time()` value, so the shards of a
+    document (or all documents of a batch) running in different worker
+    processes can share one. Optional steps are measured as they run;
+    a step is only started again while its average cost so far still
+    fits into the remaining time. The first run of a step is allowed
+    whenever time is left. With the runs still to come announced via
+    `expect`, `on_pace` tells whether they all fit at the average cost
+    so far; callers drop optional work once they fall behind. Steps left
+    out for lack of time are counted in `skipped`.
+    """
+
+    def __init__(self, deadline):
+        self.deadline = deadline
+        self.skipped = {}
+        # step -> [total seconds, runs]
+        self._costs = {}
+        # step -> runs still to come
+        self._pending = {}
+
+    def remaining(self):
+        """Seconds left until the deadline (negative once it has passed)."""
+        return self.deadline - time.time()
+
+    def expired(self):
+        return self.remaining() <= 0
+
+    def average(self, step):
+        """Average seconds of `step` so far, or 0.0 before its first run."""
+        total, runs = self._costs.get(step, (0.0, 0))
+        return total / runs if runs else 0.0
+
+    def allows(self, step):
+        """Whether another run of `step` is expected to end in time."""
+        remaining = self.remaining()
+        return remaining > 0 and self.average(step) < remaining
+
+    def expect(self, step, runs):
+        """Note that `runs` more runs of `step` are still to come."""
+        self._pending[step] = runs
+
+    def on_pace(self):
+        """Whether the expected runs, at their average cost, end in time."""
+        needed = sum(self.average(step) * runs for step, runs in self._pending.items())
+        return needed < self.remaining()
+
+    def record(self, step, seconds):
+        """Add one measured run of `step`."""
+        cost = self._costs.setdefault(step, [0.0, 0])
+        cost[0] += seconds
+        cost[1] += 1
+
+    def skip(self, step, count=1):
+        """Count `count` runs of `step` left out for lack of time."""
+        self.skipped[step] = self.skipped.get(step, 0) + count
+
+
+def deadline_after(seconds):
+    """Absolute deadline `seconds` from now, or None without a budget."""
+    return time.time() + seconds if seconds is not None else None
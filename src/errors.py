@@ -0,0 +1,34 @@
+
+import traceback
+
+
+def record_error(errors, stage, exc, **location):
+    """
+    Report a page- or table-scoped failure and keep going.
+
+    Args:
+        errors (list or None): Receives the structured record when given
+        stage (str): Pipeline step that failed ('open', 'extract',
+            'table', 'write', ...)
+        exc (Exception): The error
+        **location: Where it happened, e.g. page=12, index_on_page=2
+
+    Returns:
+        dict: {'stage', 'error', 'message', 'detail', **location} where
+        'detail' is the last traceback frame ("file:line in function")
+    """
+    frames = traceback.extract_tb(exc.__traceback__)
+    detail = f"{frames[-1].filename}:{frames[-1].lineno} in {frames[-1].name}" if frames else ''
+    record = {
+        'stage': stage,
+        **location,
+        'error': type(exc).__name__,
+        'message': str(exc),
+        'detail': detail,
+    }
+    where = ', '.join(f"{k.replace('_', ' ')} {v}" for k, v in location.items())
+    print(f"  Warning: {stage} failed{' on ' + where if where else ''}: "
+          f"{record['error']}: {record['message']}")
+    if errors is not None:
+        errors.append(record)
+    return record
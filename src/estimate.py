@@ -0,0 +1,201 @@
+
+import json
+import re
+from pdfminer.pdftypes import resolve1, stream_value
+from src.pdf_source import open_pdf
+
+try:
+    import numpy as np
+except ImportError:  # optional: only needed to calibrate a new model
+    np = None
+
+# Page content operators counted by the pre-scan: text shows, rectangles,
+# straight and curved path segments and XObject (form/image) calls
+_OPERATOR_RE = re.compile(rb'(?<=[\s\])>])(Tj|TJ|\'|"|re|l|c|v|y|Do)(?=[\s/\[(<]|$)')
+_FEATURE_OF = {b'Tj': 'text_ops', b'TJ': 'text_ops', b"'": 'text_ops', b'"': 'text_ops',
+               b're': 'rects', b'l': 'segments', b'c': 'segments', b'v': 'segments',
+               b'y': 'segments', b'Do': 'xobjects'}
+FEATURES = ('kbytes', 'text_ops', 'rects', 'segments', 'xobjects')
+
+# Seconds per unit of each feature, plus a fixed cost per page, fitted
+# by calibrate_estimator.py on the sample corpus in pdf/ (243 pages).
+# On that corpus the text operators carry the whole variable cost; the
+# other features came out at zero but are kept for other calibrations.
+COST_MODEL = {
+    'pdfplumber': {'page': 0.112, 'kbytes': 0.0, 'text_ops': 0.000981,
+                   'rects': 0.0, 'segments': 0.0, 'xobjects': 0.0},
+    'pdfium': {'page': 0.098, 'kbytes': 0.0, 'text_ops': 0.000232,
+               'rects': 0.0, 'segments': 0.0, 'xobjects': 0.0},
+}
+
+# Stand-in for pages the pre-scan could not read: a mid-size text page
+_AVERAGE_PAGE = {'kbytes': 60.0, 'text_ops': 400, 'rects': 100, 'segments': 200, 'xobjects': 0}
+
+# Estimated seconds of finished work at which measurements and the
+# model weigh the same in the ETA correction
+ETA_PRIOR_SECONDS = 10.0
+
+
+def page_features(page):
+    """
+    Cheap cost features of one page, read from its raw content stream.
+
+    Only the stream is decompressed and its operators counted; nothing
+    is interpreted, so this is far cheaper than parsing the page.
+
+    Args:
+        page: pdfplumber Page
+
+    Returns:
+        dict: 'kbytes' of content and counts of 'text_ops', 'rects',
+        'segments' (lines and curves) and 'xobjects'
+    """
+    contents = resolve1(page.page_obj.attrs.get('Contents'))
+    streams = contents if isinstance(contents, list) else [contents]
+    data = b'\n'.join(stream_value(resolve1(s)).get_data() for s in streams if s is not None)
+    features = dict.fromkeys(FEATURES, 0)
+    features['kbytes'] = len(data) / 1024
+    for op in _OPERATOR_RE.findall(data):
+        features[_FEATURE_OF[op]] += 1
+    return features
+
+
+def scan_document(source, page_range=None):
+    """
+    Pre-scan the pages of a document for the cost model.
+
+    Pages whose content cannot be read get None, which estimate_page
+    prices as an average page.
+
+    Returns:
+        list: page_features dicts (or None) in page order
+    """
+    with open_pdf(source) as pdf:
+        pages = pdf.pages
+        if page_range:
+            pages = pages[page_range[0] - 1:page_range[1]]
+        scanned = []
+        for page in pages:
+            try:
+                scanned.append(page_features(page))
+            except Exception:
+                scanned.append(None)
+            finally:
+                page.close()
+        return scanned
+
+
+def estimate_page(features, backend='pdfplumber', model=None):
+    """Predicted extraction seconds of one page (see COST_MODEL)."""
+    coefficients = (model or COST_MODEL)[backend]
+    if features is None:
+        features = _AVERAGE_PAGE
+    return coefficients['page'] + sum(coefficients[f] * features[f] for f in FEATURES)
+
+
+def estimate_document(scanned, backend='pdfplumber', model=None):
+    """Predicted seconds of every page and of the whole document."""
+    page_costs = [estimate_page(f, backend, model) for f in scanned]
+    return {'pages': len(page_costs), 'seconds': sum(page_costs), 'page_costs': page_costs}
+
+
+def format_eta(seconds):
+    """
+    Human-readable remaining time, e.g. '~2 min', '~1 min 45s', '~5s'.
+
+    Rounded to 5 seconds, the granularity the frontend shows.
+    """
+    seconds = max(5, int(round(seconds / 5.0)) * 5)
+    minutes, seconds = divmod(seconds, 60)
+    if not minutes:
+        return f"~{seconds}s"
+    return f"~{minutes} min {seconds}s" if seconds else f"~{minutes} min"
+
+
+def eta_seconds(remaining_estimate, workers=1, done_estimate=0.0, done_seconds=0.0):
+    """
+    Wall-clock seconds until the remaining estimated work is done.
+
+    The estimate is spread over the workers. Once work has finished, it
+    is first scaled by how long the finished work actually took against
+    its estimate, which corrects the model for these documents and this
+    machine. The correction is damped while little work has finished,
+    so one small document does not swing the ETA.
+
+    Args:
+        remaining_estimate (float): Estimated seconds of unfinished work
+        workers (int): Processes working side by side (at most the CPUs)
+        done_estimate (float): Estimated seconds of the finished work
+        done_seconds (float): CPU seconds the finished work actually took
+    """
+    if done_estimate > 0:
+        ratio = (done_seconds + ETA_PRIOR_SECONDS) / (done_estimate + ETA_PRIOR_SECONDS)
+        remaining_estimate *= ratio
+    return remaining_estimate / max(1, workers)
+
+
+def admit_documents(estimates, time_budget, workers=1):
+    """
+    Split documents into those that fit a time budget and those that do not.
+
+    Cheapest documents are admitted first while the estimated work,
+    spread over the workers, still fits the budget.
+
+    Args:
+        estimates (dict): Document -> estimated seconds
+        time_budget (float): Seconds available
+        workers (int): Processes working side by side
+
+    Returns:
+        tuple: (admitted, rejected) lists of documents
+    """
+    admitted, rejected = [], []
+    used = 0.0
+    for doc in sorted(estimates, key=estimates.get):
+        if (used + estimates[doc]) / max(1, workers) <= time_budget:
+            used += estimates[doc]
+            admitted.append(doc)
+        else:
+            rejected.append(doc)
+    return admitted, rejected
+
+
+def fit_cost_model(samples):
+    """
+    Fit per-page cost coefficients to measured page times.
+
+    Least squares on the page features; a feature whose coefficient comes
+    out negative is dropped (priced at 0) and the fit repeated, so every
+    prediction stays positive.
+
+    Args:
+        samples (list): (page_features dict, measured seconds) pairs
+
+    Returns:
+        dict: Coefficients for one backend, in the format of COST_MODEL
+
+    Raises:
+        ImportError: numpy is not installed
+    """
+    if np is None:
+        raise ImportError("numpy is required to calibrate the cost model")
+    names = ['page', *FEATURES]
+    X = np.array([[1.0] + [f[name] for name in FEATURES] for f, _ in samples])
+    y = np.array([seconds for _, seconds in samples])
+    active = list(range(len(names)))
+    while True:
+        coef, *_ = np.linalg.lstsq(X[:, active], y, rcond=None)
+        if (coef >= 0).all():
+            break
+        active = [a for a, c in zip(active, coef) if c >= 0]
+    fitted = dict.fromkeys(names, 0.0)
+    for a, c in zip(active, coef):
+        fitted[names[a]] = float(f"{c:.3g}")
+    return fitted
+
+
+def load_cost_model(path):
+    """Read a cost model saved by calibrate_estimator.py."""
+    with open(path, encoding='utf-8') as f:
+        model = json.load(f)
+    return {**COST_MODEL, **model}
@@ -1,6 +1,22 @@
 
-import pdfplumber
-import sys
+import math
+import re
+import time
+from src.backends import page_loader
+from src.budget import TimeBudget
+from src.errors import record_error
+from src.fingerprint import collapse_duplicate_tables, page_fingerprint
+from src.headers import (bucket_table_chars, header_rows_from_fonts,
+                         layout_header_row, spans_from_cells)
+from src.journal import PageJournal, iter_journal_tables
+from src.lattice import find_tables
+from src.overprint import dedupe_page_chars
+from src.pdf_source import describe_source, open_pdf
+from src.projection import projection_tables
+from src.regions import candidate_regions, table_view
+from src.stitching import stitch_continuations
+from src.table import CompactTable, as_compact
+from src.templates import layout_fingerprint, make_template
 
 # Default settings: trust vertical PDF lines for columns, text for rows
 TABLE_SETTINGS = {
@@ -13,43 +29,127 @@ TABLE_SETTINGS = {
     "intersection_y_tolerance": 10,
 }
 
+# Share of sampled cells that must hold merged numbers
+MERGED_THRESHOLD = 0.25
+# Standard errors from the threshold that count as a certain decision
+DECISIVE_Z = 2.0
+# Merged tables scoring below this are borderline and skip the rebuild
+REBUILD_MIN_CONFIDENCE = 0.2
+
+# A numeric token as accepted before: digits with , ( ) . - or a lone dash
+_NUMERIC_TOKEN = r'(?:-|[,().\-]*\d[\d,().\-]*)'
+_MERGED_CELL_RE = re.compile(rf'{_NUMERIC_TOKEN}(?:\s+{_NUMERIC_TOKEN})+')
+
+
+def _count_merged(table, threshold, early_exit):
+    """
+    Count merged cells in rows 3-12 as (merged, total non-empty cells).
+
+    With `early_exit`, counting stops as soon as the remaining cells can
+    no longer change which side of `threshold` the merged ratio falls on;
+    the merged count is then only good for that decision.
+    """
+    sample = range(2, min(table.n_rows, 12))
+    total = sum(1 for r in sample for c in range(table.row_lengths[r])
+                if table.columns[c][r])
+    limit = threshold * total
+    merged = 0
+    checked = 0
+    for r in sample:
+        for c in range(table.row_lengths[r]):
+            s = table.columns[c][r]
+            if not s:
+                continue
+            checked += 1
+            if ' ' in s and _MERGED_CELL_RE.fullmatch(s):
+                merged += 1
+            # Decided either way: already above, or can no longer get above
+            if early_exit and (merged > limit or merged + (total - checked) <= limit):
+                return merged, total
+    return merged, total
+
+
+def merged_column_score(table, threshold=MERGED_THRESHOLD):
+    """
+    Score how strongly a table shows merged numeric columns.
+
+    Samples rows 3-12 and counts cells made only of two or more numeric
+    tokens (e.g. "1,234 (56) -"), using one compiled pattern per cell.
+    The whole sample is counted, so the confidence does not depend on
+    the order of the rows; has_merged_columns() stops early instead.
+
+    Returns:
+        tuple: (is_merged, confidence) where is_merged matches the
+        merged/total > threshold rule and confidence (0-1) measures how
+        far the sampled ratio sits from the threshold given the number of
+        cells sampled. Low confidence marks borderline tables.
+    """
+    table = as_compact(table)
+    if table.n_rows < 3:
+        return False, 1.0
+    merged, total = _count_merged(table, threshold, early_exit=False)
+    if total == 0:
+        return False, 1.0
+    return merged > threshold * total, _confidence(merged, total, threshold)
+
+
+def _confidence(merged, checked, threshold):
+    """Distance of merged/checked from threshold in standard errors, scaled to 0-1."""
+    ratio = merged / checked
+    stderr = math.sqrt(threshold * (1 - threshold) / checked)
+    return min(1.0, abs(ratio - threshold) / stderr / DECISIVE_Z)
+
 
 def has_merged_columns(table):
     """Check if a table has cells containing multiple merged numeric values."""
-    if not table or len(table) < 3:
+    table = as_compact(table)
+    if table.n_rows < 3:
         return False
-    merged = 0
-    checked = 0
-    for row in table[2:min(len(table), 12)]:
-        for cell in row:
-            if cell:
-                s = str(cell).strip()
-                if not s:
-                    continue
-                checked += 1
-                parts = s.split()
-                if len(parts) >= 2:
-                    nums = sum(1 for p in parts
-                               if p == '-' or
-                               p.replace(',','').replace('(','').replace(')','')
-                                .replace('.','').replace('-','').isdigit())
-                    if nums == len(parts) and nums >= 2:
-                        merged += 1
-    return checked > 0 and (merged / checked) > 0.25
-
-
-def build_table_from_words(page, bbox):
+    merged, total = _count_merged(table, MERGED_THRESHOLD, early_exit=True)
+    return merged > MERGED_THRESHOLD * total
+
+
+def extract_grid_words(page):
+    """Words used to build word-based grids, with their chars attached."""
+    return page.extract_words(x_tolerance=3, y_tolerance=3, return_chars=True)
+
+
+def build_table_from_words(page, bbox, words=None):
     """
     Build a table directly from word (x,y) positions within a bounding box.
     
     Instead of relying on pdfplumber's column detection (which misses
     sub-columns without drawn vertical lines), this reads every word's
     exact position and clusters them into rows and columns.
+
+    Pass `words` (from extract_grid_words) to reuse one word extraction
+    for several tables on the same page.
+    """
+    result = build_grid_from_words(page, bbox, words)
+    return result[0] if result else None
+
+
+def build_grid_from_words(page, bbox, words=None, col_centers=None):
+    """
+    Build a word-based table grid and tag its header from font metadata.
+
+    The font tagging reads the chars attached to the same words that
+    build the grid, so it costs no second pass over the page. Header
+    rows are laid out phrase by phrase, so a heading centered over
+    several sub-columns lands in one cell and is reported as a span.
+
+    Pass `col_centers` (from a layout template) to skip column detection
+    and fill the cells straight away.
+
+    Returns:
+        tuple or None: (table, header, col_centers) where header is None
+        or {'rows': int, 'spans': [(row, start_col, end_col), ...]}
     """
     x0, top, x1, bottom = bbox
     margin = 2
 
-    words = page.extract_words(x_tolerance=3, y_tolerance=3)
+    if words is None:
+        words = extract_grid_words(page)
     tw = [w for w in words
           if w['x0'] >= x0 - margin and w['x1'] <= x1 + margin
           and w['top'] >= top - margin and w['bottom'] <= bottom + margin]
@@ -74,40 +174,41 @@ def build_table_from_words(page, bbox):
         return None
 
     # --- Step 2: Find column positions from DATA rows ---
-    # Data rows have clean single-value cells, so their x-positions
-    # accurately define where columns are. Skip first 3 rows (headers).
-    data_x_positions = []
-    for rg in row_groups[3:]:
-        for w in rg:
-            cx = (w['x0'] + w['x1']) / 2
-            data_x_positions.append(cx)
-
-    # If not enough data rows, use all rows
-    if len(data_x_positions) < 5:
+    if col_centers is None:
+        # Data rows have clean single-value cells, so their x-positions
+        # accurately define where columns are. Skip first 3 rows (headers).
         data_x_positions = []
-        for rg in row_groups:
+        for rg in row_groups[3:]:
             for w in rg:
                 cx = (w['x0'] + w['x1']) / 2
                 data_x_positions.append(cx)
 
-    if not data_x_positions:
-        return None
+        # If not enough data rows, use all rows
+        if len(data_x_positions) < 5:
+            data_x_positions = []
+            for rg in row_groups:
+                for w in rg:
+                    cx = (w['x0'] + w['x1']) / 2
+                    data_x_positions.append(cx)
 
-    # Cluster x-centers to find column positions
-    data_x_positions.sort()
-    col_centers = []
-    current = [data_x_positions[0]]
-    for x in data_x_positions[1:]:
-        if x - current[-1] <= 20:  # 20pt tolerance for same column
-            current.append(x)
-        else:
+        if not data_x_positions:
+            return None
+
+        # Cluster x-centers to find column positions
+        data_x_positions.sort()
+        col_centers = []
+        current = [data_x_positions[0]]
+        for x in data_x_positions[1:]:
+            if x - current[-1] <= 20:  # 20pt tolerance for same column
+                current.append(x)
+            else:
+                col_centers.append(sum(current) / len(current))
+                current = [x]
+        if current:
             col_centers.append(sum(current) / len(current))
-            current = [x]
-    if current:
-        col_centers.append(sum(current) / len(current))
 
-    if len(col_centers) < 2:
-        return None
+        if len(col_centers) < 2:
+            return None
 
     # --- Step 3: Build the table grid ---
     num_cols = len(col_centers)
@@ -132,65 +233,494 @@ def build_table_from_words(page, bbox):
                 row[best_col] = w['text']
         table.append(row)
 
-    return table
+    # --- Step 4: Tag header rows from the words' fonts ---
+    row_chars = [[ch for w in rg for ch in w.get('chars', ())] for rg in row_groups]
+    header_rows = header_rows_from_fonts(row_chars, CompactTable.from_rows(table))
+    if not header_rows:
+        return table, None, col_centers
+
+    spans = []
+    for r in range(header_rows):
+        table[r], row_spans = layout_header_row(row_groups[r], col_centers)
+        spans.extend((r, start, end) for start, end in row_spans)
+
+    return table, {'rows': header_rows, 'spans': spans}, col_centers
 
 
-def extract_tables_from_pdf(pdf_path):
+def tables_from_template(page, template):
     """
-    Extract all tables from a PDF file.
-    
+    Fill a page's tables from a layout template's bboxes and column centers.
+
+    The template is keyed on the rulings only, while a table's bbox also
+    depends on how many text rows it had. A page whose ruled area holds
+    words above or below a cached bbox (a longer table on the same
+    layout) therefore does not match, rather than being cut off.
+
+    Returns:
+        list or None: Same layout as extract_page_tables, or None when a
+        table no longer fills from the cached geometry
+    """
+    words = extract_grid_words(page)
+    regions = candidate_regions(page, TABLE_SETTINGS['edge_min_length'])
+    page_tables = []
+    for entry in template['tables']:
+        bbox = tuple(entry['bbox'])
+        if _words_outside_bbox(words, bbox, regions):
+            return None
+        result = build_grid_from_words(page, bbox, words, entry['col_centers'])
+        if not result or len(result[0]) == 0:
+            return None
+        page_tables.append({
+            'table': CompactTable.from_rows(result[0]),
+            'bbox': bbox,
+            'col_xs': None,
+            'header': result[1],
+            'col_centers': result[2],
+        })
+    return page_tables
+
+
+def _words_outside_bbox(words, bbox, regions):
+    """Whether a ruled region around `bbox` holds words above or below it."""
+    x0, top, x1, bottom = bbox
+    for r_x0, r_top, r_x1, r_bottom in regions:
+        if r_x1 <= x0 or r_x0 >= x1 or r_bottom <= top or r_top >= bottom:
+            continue
+        for w in words:
+            middle = (w['top'] + w['bottom']) / 2
+            if (x0 <= (w['x0'] + w['x1']) / 2 <= x1 and r_top <= middle <= r_bottom
+                    and not top <= middle <= bottom):
+                return True
+    return False
+
+
+def extract_page_tables(page, templates=None, stats=None, errors=None, borderless=False,
+                        budget=None):
+    """
+    Extract the tables of one page.
+
     Uses line-based extraction by default. When merged columns are detected,
     falls back to building the table directly from word coordinates.
+
+    With a layout template store, a page whose ruling geometry matches a
+    stored template is filled straight from the cached table bboxes and
+    column centers, skipping table finding and column detection. Pages
+    extracted in full add their template to the store.
+
+    With `borderless`, a page without vertical rulings is read by the
+    whitespace projection engine (see src.projection) instead of yielding
+    no tables.
+
+    With a time budget, the optional expensive steps (word rebuilds of
+    merged tables, borderless reading) are left out once the pages still
+    to come no longer fit before the deadline at the pace so far, or the
+    step itself no longer fits. Tables whose rebuild was left out keep
+    the line-based cells and are flagged under 'degraded'.
+
+    Args:
+        page: pdfplumber Page
+        templates (dict, optional): Layout template store
+            (see src.templates)
+        stats (dict, optional): Incremented under 'template_hits'
+        errors (list, optional): Receives a record for each table whose
+            extraction, header tagging or rebuild failed (see
+            src.errors.record_error). A failed table is dropped and a
+            failed tagging or rebuild keeps the plain table.
+        borderless (bool): Find tables on pages without rulings
+        budget (TimeBudget, optional): Deadline of the extraction
+            (see src.budget)
+
+    Returns:
+        list: One dict per table with 'table', 'bbox', 'col_xs', 'header'
+        and 'col_centers' (None for ruled and borderless tables), plus
+        'degraded' (the skipped steps) on tables cut short by the budget
     """
-    print(f"Reading PDF file: {pdf_path}")
-    all_tables = []
+    layout_key = layout_fingerprint(page) if templates is not None else None
+    if layout_key and layout_key in templates:
+        try:
+            page_tables = tables_from_template(page, templates[layout_key])
+        except Exception as e:
+            # A broken template falls back to full extraction
+            record_error(errors, 'template', e, page=page.page_number)
+            page_tables = None
+        if page_tables is not None:
+            if stats is not None:
+                stats['template_hits'] = stats.get('template_hits', 0) + 1
+            return page_tables
 
+    page_tables = _extract_page_tables(page, errors, borderless, budget)
+    if layout_key:
+        template = make_template(page_tables)
+        if template:
+            templates[layout_key] = template
+    return page_tables
+
+
+def _extract_page_tables(page, errors=None, borderless=False, budget=None):
+    """Full extraction of one page (see extract_page_tables)."""
+    # Pages without a pair of vertical rulings cannot hold a ruled table
+    regions = candidate_regions(page, TABLE_SETTINGS['edge_min_length'])
+    if not regions:
+        if not borderless:
+            return []
+        if budget is None:
+            return _borderless_tables(page, errors)
+        if not (budget.on_pace() and budget.allows('borderless')):
+            budget.skip('borderless')
+            return []
+        start = time.perf_counter()
+        page_tables = _borderless_tables(page, errors)
+        budget.record('borderless', time.perf_counter() - start)
+        return page_tables
+
+    # First pass: normal line-based extraction, run once per candidate
+    # region. Cell text is read from a view holding only the table's
+    # chars. A table that fails to extract is dropped without losing the
+    # rest of the page.
+    found, tables = [], []
+    chars = page.chars
+    for idx, ft in enumerate(find_tables(page, TABLE_SETTINGS, regions), start=1):
+        try:
+            ft.page = table_view(page, ft.bbox, chars)
+            tables.append(CompactTable.from_rows(ft.extract()))
+            found.append(ft)
+        except Exception as e:
+            record_error(errors, 'table', e, page=page.page_number, index_on_page=idx)
+
+    if not tables:
+        return []
+
+    col_xs = [[c.bbox[0] for c in ft.columns] for ft in found]
+    col_centers = [None] * len(found)
+
+    # Tag header rows from font metadata of the chars that table
+    # finding already parsed
+    headers = [None] * len(found)
     try:
-        with pdfplumber.open(pdf_path) as pdf:
-            print(f"Total pages in PDF: {len(pdf.pages)}")
-
-            for page_num, page in enumerate(pdf.pages, start=1):
-                # First pass: normal line-based extraction
-                tables = page.extract_tables(TABLE_SETTINGS)
-
-                if not tables:
-                    continue
-
-                # Check if any table has merged columns
-                page_has_merged = any(has_merged_columns(t) for t in tables)
-
-                if page_has_merged:
-                    # Rebuild tables using word positions
-                    found = page.find_tables(TABLE_SETTINGS)
-                    if found:
-                        rebuilt_tables = []
-                        for ft in found:
-                            rebuilt = build_table_from_words(page, ft.bbox)
-                            if rebuilt and len(rebuilt) > 0:
-                                # Only use rebuilt if it has more columns
-                                old_cols = max(len(r) for r in ft.extract()) if ft.extract() else 0
-                                new_cols = max(len(r) for r in rebuilt)
-                                if new_cols > old_cols:
-                                    rebuilt_tables.append(rebuilt)
-                                else:
-                                    rebuilt_tables.append(ft.extract())
-                            else:
-                                rebuilt_tables.append(ft.extract())
-                        if rebuilt_tables:
-                            tables = rebuilt_tables
-
-                for idx, table in enumerate(tables, start=1):
-                    all_tables.append({
-                        'table': table,
-                        'page': page_num,
-                        'index_on_page': idx
-                    })
-
-    except FileNotFoundError:
-        print(f"Error: PDF file not found: {pdf_path}")
-        sys.exit(1)
+        buckets = bucket_table_chars(page.chars, found)
+        for i, (ft, table, row_chars) in enumerate(zip(found, tables, buckets)):
+            header_rows = header_rows_from_fonts(row_chars, table)
+            if header_rows:
+                headers[i] = {
+                    'rows': header_rows,
+                    'spans': spans_from_cells(ft, table, header_rows),
+                }
     except Exception as e:
-        print(f"Error reading PDF file: {e}")
-        sys.exit(1)
+        # Untagged tables fall back to the writer's content heuristics
+        headers = [None] * len(found)
+        record_error(errors, 'header', e, page=page.page_number)
+
+    # Check if any table has merged columns; borderline scores are
+    # not worth the cost of rebuilding the page from words
+    page_has_merged = False
+    for t in tables:
+        is_merged, confidence = merged_column_score(t)
+        if is_merged and confidence >= REBUILD_MIN_CONFIDENCE:
+            page_has_merged = True
+            break
+
+    degraded = [None] * len(found)
+    if (page_has_merged and budget is not None
+            and not (budget.on_pace() and budget.allows('rebuild'))):
+        # Out of time: keep the line-based cells of the merged tables
+        page_has_merged = False
+        budget.skip('rebuild')
+        for i, t in enumerate(tables):
+            is_merged, confidence = merged_column_score(t)
+            if is_merged and confidence >= REBUILD_MIN_CONFIDENCE:
+                degraded[i] = ['rebuild']
+
+    if page_has_merged:
+        start = time.perf_counter()
+        # Rebuild tables using word positions (extracted once per page)
+        words = extract_grid_words(page)
+        for i, ft in enumerate(found):
+            try:
+                result = build_grid_from_words(page, ft.bbox, words)
+            except Exception as e:
+                # Keep the line-based table
+                record_error(errors, 'rebuild', e, page=page.page_number, index_on_page=i + 1)
+                continue
+            if result and len(result[0]) > 0:
+                rebuilt = CompactTable.from_rows(result[0])
+                # Only use rebuilt if it has more columns
+                if rebuilt.n_cols > tables[i].n_cols:
+                    tables[i] = rebuilt
+                    headers[i] = result[1]
+                    # Word-built columns have no ruled x-positions
+                    col_xs[i] = None
+                    col_centers[i] = result[2]
+        if budget is not None:
+            budget.record('rebuild', time.perf_counter() - start)
+
+    page_tables = [
+        {'table': table, 'bbox': ft.bbox, 'col_xs': xs, 'header': header,
+         'col_centers': centers}
+        for ft, table, xs, header, centers in zip(found, tables, col_xs, headers, col_centers)
+    ]
+    for found_table, skipped in zip(page_tables, degraded):
+        if skipped:
+            found_table['degraded'] = skipped
+    return page_tables
+
+
+def _borderless_tables(page, errors=None):
+    """Tables of a page without rulings, from whitespace projections."""
+    try:
+        found = projection_tables(extract_grid_words(page))
+    except Exception as e:
+        record_error(errors, 'borderless', e, page=page.page_number)
+        return []
+    # Column centers stay unset: these pages have no ruling layout to
+    # key a template on
+    return [
+        {'table': t['table'], 'bbox': t['bbox'], 'col_xs': None, 'header': t['header'],
+         'col_centers': None}
+        for t in found
+    ]
+
+
+def iter_tables_from_pdf(pdf_path, page_range=None, dedupe_pages=True, stats=None,
+                         templates=None, errors=None, journal=None, dedupe_chars=True,
+                         borderless=False, backend='pdfplumber', deadline=None):
+    """
+    Yield tables page by page as they are extracted.
+
+    Each table carries its bounding box and column x-positions so that
+    later stages (such as continuation stitching) can compare geometry.
+
+    Args:
+        pdf_path: Path, bytes, memory map or binary file-like object
+            (see src.pdf_source.open_pdf)
+        page_range (tuple, optional): 1-based inclusive (first, last) pages
+        dedupe_pages (bool): Skip extraction of pages whose text and
+            geometry repeat an earlier page and reuse its tables
+            (see src.fingerprint.page_fingerprint)
+        stats (dict, optional): Incremented under 'duplicate_pages',
+            'duplicate_chars' and 'template_hits'
+        templates (dict, optional): Layout template store shared across
+            documents; new templates are added to it (see src.templates)
+        errors (list, optional): Receives a structured record for every
+            page or table that failed (see src.errors.record_error).
+            Failures are scoped to that page or table; extraction goes on.
+        journal (PageJournal, optional): Checkpoint every completed page
+            to this journal and skip the pages it already holds
+            (see src.journal)
+        dedupe_chars (bool): Collapse overprinted (fake-bold) copies of
+            chars before any word or table work (see src.overprint)
+        borderless (bool): Read tables on pages without rulings from
+            whitespace projections (see src.projection)
+        backend (str): Parser of chars and rulings, 'pdfplumber' or
+            'pdfium' (see src.backends)
+        deadline (float, optional): `time.time()` by which extraction
+            should end. Expensive optional steps are dropped first (see
+            extract_page_tables) once the remaining pages fall behind;
+            a page is only started while the average page so far still
+            fits. Pages left unread are
+            recorded under the 'deadline' stage and the tables gathered
+            so far are yielded as usual. 'skipped_rebuild',
+            'skipped_borderless' and 'deadline_pages' are counted in
+            `stats`.
+
+    Yields:
+        dict: {'table', 'page', 'index_on_page', 'bbox', 'col_xs', 'header',
+              'degraded'} where 'table' is a src.table.CompactTable,
+              'header' is the font-tagged header ({'rows', 'spans'}) or
+              None and 'degraded' lists the steps left out for lack of
+              time (None for complete tables)
+    """
+    print(f"Reading PDF file: {describe_source(pdf_path)}")
+
+    with open_pdf(pdf_path) as pdf, page_loader(pdf_path, backend, errors) as load_page:
+        print(f"Total pages in PDF: {len(pdf.pages)}")
+
+        first_page, pages = 1, pdf.pages
+        if page_range:
+            first_page, last_page = page_range
+            pages = pdf.pages[first_page - 1:last_page]
+            print(f"Extracting pages {first_page}-{first_page + len(pages) - 1}")
+
+        # Page fingerprint -> (first page number, extracted tables)
+        seen_pages = {}
+        budget = TimeBudget(deadline) if deadline is not None else None
+
+        if journal is not None and journal.completed:
+            print(f"Resuming: {len(journal.completed)} page(s) already in the journal")
+
+        for page_num, page in enumerate(pages, start=first_page):
+            if journal is not None and page_num in journal.completed:
+                continue
+            if budget is not None:
+                if not budget.allows('page'):
+                    _stop_at_deadline(budget, page_num, first_page + len(pages) - 1,
+                                      journal, errors)
+                    break
+                # Pages after this one; the current page is already running
+                budget.expect('page', first_page + len(pages) - 1 - page_num)
+            start = time.perf_counter()
+            try:
+                view = load_page(page)
+                if dedupe_chars:
+                    view = dedupe_page_chars(view, stats)
+                key = page_fingerprint(view) if dedupe_pages else None
+                cached = seen_pages.get(key) if key else None
+                if cached:
+                    print(f"  Page {page_num} repeats page {cached[0]}, reusing its tables")
+                    page_tables = cached[1]
+                    if stats is not None:
+                        stats['duplicate_pages'] = stats.get('duplicate_pages', 0) + 1
+                else:
+                    page_tables = extract_page_tables(view, templates, stats, errors, borderless,
+                                                      budget)
+                    if key:
+                        seen_pages[key] = (page_num, page_tables)
+            except Exception as e:
+                record_error(errors, 'page', e, page=page_num)
+                continue
+            finally:
+                # Drop the page's parsed objects; only its tables are kept
+                page.close()
+                if budget is not None:
+                    budget.record('page', time.perf_counter() - start)
+
+            if journal is not None:
+                journal.record_page(page_num, page_tables)
+
+            for idx, found in enumerate(page_tables, start=1):
+                yield {
+                    'table': found['table'],
+                    'page': page_num,
+                    'index_on_page': idx,
+                    'bbox': found['bbox'],
+                    'col_xs': found['col_xs'],
+                    'header': found['header'],
+                    'degraded': found.get('degraded'),
+                }
+
+        if budget is not None and stats is not None:
+            for step, count in budget.skipped.items():
+                key = 'deadline_pages' if step == 'page' else f'skipped_{step}'
+                stats[key] = stats.get(key, 0) + count
 
-    return all_tables
+
+def _stop_at_deadline(budget, page_num, last_page, journal, errors):
+    """Record the pages left unread when the time budget runs out."""
+    unread = [n for n in range(page_num, last_page + 1)
+              if journal is None or n not in journal.completed]
+    budget.skip('page', len(unread))
+    message = f"time budget exhausted, {len(unread)} page(s) not extracted"
+    record_error(errors, 'deadline', TimeoutError(message), pages=f"{page_num}-{last_page}")
+
+
+def extract_tables_from_pdf(pdf_path, page_range=None, stitch=True,
+                            dedupe_pages=True, collapse_duplicates=False, stats=None,
+                            templates=None, errors=None, dedupe_chars=True,
+                            borderless=False, backend='pdfplumber', deadline=None):
+    """
+    Extract all tables from a PDF file.
+
+    Args:
+        pdf_path: Path to the PDF file, or its bytes, a memory map or a
+            binary file-like object
+        page_range (tuple, optional): 1-based inclusive (first, last) pages
+            to extract. Page numbers in the results stay absolute, so the
+            output of several ranges can be concatenated in page order.
+        stitch (bool): Merge tables that continue across pages into one
+            logical table (see src.stitching)
+        dedupe_pages (bool): Reuse the tables of repeated pages instead of
+            extracting them again
+        collapse_duplicates (bool): Keep only the first copy of tables
+            whose content repeats (see src.fingerprint)
+        stats (dict, optional): Receives 'duplicate_pages',
+            'duplicate_tables', 'duplicate_chars' and 'template_hits' counts
+        templates (dict, optional): Layout template store of recurring
+            filings (see src.templates.load_templates)
+        errors (list, optional): Receives a structured record for every
+            page or table that failed; the tables of all other pages are
+            still returned
+        dedupe_chars (bool): Drop overprinted copies of chars first
+        borderless (bool): Also find tables on pages without rulings
+        backend (str): 'pdfplumber' or 'pdfium' page parsing
+        deadline (float, optional): `time.time()` by which to return the
+            tables gathered so far; cut-short tables are flagged under
+            'degraded' and unread pages recorded in `errors`
+            (see src.budget.deadline_after)
+
+    Returns:
+        list: List of tables with metadata
+
+    Raises:
+        FileNotFoundError: The PDF file does not exist
+        Exception: The document itself cannot be opened or parsed
+    """
+    tables = iter_tables_from_pdf(pdf_path, page_range, dedupe_pages, stats,
+                                  templates, errors, dedupe_chars=dedupe_chars,
+                                  borderless=borderless, backend=backend,
+                                  deadline=deadline)
+    if stitch:
+        tables = stitch_continuations(tables)
+    if collapse_duplicates:
+        tables = collapse_duplicate_tables(tables, stats)
+    return list(tables)
+
+
+def extraction_options(dedupe_pages=True, dedupe_chars=True, borderless=False,
+                       backend='pdfplumber', templates=None):
+    """
+    The options of a run that change which tables a page yields.
+
+    Recorded in the journal header, so a resumed run does not add pages
+    read under other settings (see src.journal.PageJournal).
+
+    Returns:
+        dict: JSON-serializable options
+    """
+    return {'dedupe_pages': dedupe_pages, 'dedupe_chars': dedupe_chars,
+            'borderless': borderless, 'backend': backend, 'templates': templates is not None}
+
+
+def extract_tables_to_journal(pdf_path, journal_path, resume=False, page_range=None,
+                              dedupe_pages=True, stats=None, templates=None, errors=None,
+                              dedupe_chars=True, borderless=False, backend='pdfplumber',
+                              deadline=None):
+    """
+    Extract a PDF page by page into a checkpoint journal.
+
+    Each completed page is written to the journal as soon as it is done,
+    so nothing is kept in memory and a crashed run can continue with
+    `resume=True` from where it stopped, provided it uses the same
+    options (see extraction_options). Read the result back with
+    journal_tables().
+
+    Returns:
+        int: Number of tables in the journal (before stitching)
+
+    Raises:
+        FileNotFoundError: The PDF file does not exist
+        Exception: The document itself cannot be opened or parsed
+    """
+    options = extraction_options(dedupe_pages, dedupe_chars, borderless, backend, templates)
+    with PageJournal(journal_path, pdf_path, resume=resume, options=options) as journal:
+        for _ in iter_tables_from_pdf(pdf_path, page_range, dedupe_pages, stats,
+                                      templates, errors, journal, dedupe_chars, borderless,
+                                      backend, deadline):
+            pass
+        return journal.table_count
+
+
+def journal_tables(journal_path, stitch=True, collapse_duplicates=False, stats=None):
+    """
+    Stream the tables of a journal in page order, ready for the writer.
+
+    Only the page being read (and an open continuing table) is held in
+    memory.
+
+    Returns:
+        iterator: Table dicts as returned by extract_tables_from_pdf
+    """
+    tables = iter_journal_tables(journal_path)
+    if stitch:
+        tables = stitch_continuations(tables)
+    if collapse_duplicates:
+        tables = collapse_duplicate_tables(tables, stats)
+    return tables
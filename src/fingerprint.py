@@ -0,0 +1,79 @@
+
+import hashlib
+
+# Coordinates are rounded to this many points before hashing, so
+# re-rendered copies of the same page template still match
+GEOMETRY_PRECISION = 1
+
+
+def _digest(parts):
+    h = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        h.update(repr(part).encode('utf-8'))
+    return h.hexdigest()
+
+
+def page_fingerprint(page):
+    """
+    Content fingerprint of a page: its text and its ruling geometry.
+
+    Chars (text, position, font) and rects/lines (position) are hashed
+    together with the page size. Two pages with the same fingerprint
+    produce the same tables, so the second one can reuse the first one's
+    extraction result. The page's objects are parsed once here and reused
+    by the following table finding.
+
+    Returns:
+        str: Hex digest
+    """
+    def r(v):
+        return round(v, GEOMETRY_PRECISION)
+
+    parts = [(r(page.width), r(page.height))]
+    parts.extend((ch['text'], r(ch['x0']), r(ch['top']), ch.get('fontname'), r(ch.get('size') or 0))
+                 for ch in page.chars)
+    parts.extend((r(o['x0']), r(o['top']), r(o['x1']), r(o['bottom']))
+                 for o in page.rects + page.lines)
+    return _digest(parts)
+
+
+def table_fingerprint(table):
+    """
+    Content fingerprint of a CompactTable (cell texts and row lengths).
+
+    Returns:
+        str: Hex digest
+    """
+    return _digest([table.row_lengths, *table.columns])
+
+
+def collapse_duplicate_tables(tables, stats=None):
+    """
+    Drop tables whose content repeats an earlier table of the document.
+
+    The first copy is kept and carries a 'duplicate_pages' list, to
+    which the pages of later copies are added as they are found. When
+    tables are streamed, that is after the first copy has been yielded,
+    so consumers read the list once the stream is exhausted (the writer
+    notes it in the sheet when the workbook is saved).
+
+    Args:
+        tables (iterable): Table dicts in page order
+        stats (dict, optional): Incremented under 'duplicate_tables'
+
+    Yields:
+        dict: The first copy of each distinct table
+    """
+    # Fingerprint -> the first copy's 'duplicate_pages' list; only the
+    # lists are kept, not the tables
+    seen = {}
+    for table_data in tables:
+        key = table_fingerprint(table_data['table'])
+        pages = seen.get(key)
+        if pages is None:
+            table_data['duplicate_pages'] = seen[key] = []
+            yield table_data
+            continue
+        pages.append(table_data['page'])
+        if stats is not None:
+            stats['duplicate_tables'] = stats.get('duplicate_tables', 0) + 1
@@ -0,0 +1,164 @@
+
+import re
+from bisect import bisect_right
+from collections import Counter
+
+# Font names that mark bold faces ("Arial-BoldMT", "Calibri,Bold", ...)
+BOLD_FONT_RE = re.compile(r'bold|black|heavy|semibold|demi|,b$', re.IGNORECASE)
+# Points above the body size that make text a heading
+SIZE_DELTA = 0.75
+# Share of a row's chars that must be emphasized for a header row
+MIN_EMPHASIS_RATIO = 0.6
+# Font-tagged headers may be deeper than the content heuristic allows
+MAX_FONT_HEADER_ROWS = 6
+
+
+def is_bold(fontname):
+    """True when a PDF font name denotes a bold face."""
+    return bool(fontname and BOLD_FONT_RE.search(fontname))
+
+
+def bucket_table_chars(chars, found):
+    """
+    Group page chars by table and row in one pass over the page's chars.
+
+    Args:
+        chars (list): pdfplumber char dicts of the page (already parsed
+            by table finding, so this costs no extra page parsing)
+        found (list): pdfplumber Table objects of the page
+
+    Returns:
+        list: For each table, a list of per-row char lists
+    """
+    layouts = []
+    for ft in found:
+        rows = list(ft.rows)
+        layouts.append((ft.bbox, [r.bbox[1] for r in rows], [r.bbox[3] for r in rows]))
+    buckets = [[[] for _ in tops] for _, tops, _ in layouts]
+
+    for ch in chars:
+        cx = (ch['x0'] + ch['x1']) / 2
+        cy = (ch['top'] + ch['bottom']) / 2
+        for t, ((x0, top, x1, bottom), tops, bottoms) in enumerate(layouts):
+            if not (x0 <= cx <= x1 and top <= cy <= bottom):
+                continue
+            r = bisect_right(tops, cy) - 1
+            if r >= 0 and cy <= bottoms[r]:
+                buckets[t][r].append(ch)
+            break
+
+    return buckets
+
+
+def header_rows_from_fonts(row_chars, table):
+    """
+    Count the leading header rows of a table from font metadata.
+
+    The table's body font is its most common (fontname, size). A char is
+    emphasized when it uses another font face, a bold face the body does
+    not use, or a size at least SIZE_DELTA larger. Header rows are the
+    leading rows whose chars are mostly emphasized (empty rows in between
+    are allowed). Trailing candidates holding only a first-column label
+    are section headings, not column headers, and are dropped.
+
+    Args:
+        row_chars (list): Per-row lists of char dicts with 'fontname'/'size'
+        table (CompactTable): The table the rows belong to
+
+    Returns:
+        int or None: Header row count, or None when fonts give no signal
+        (no chars, or every row looks the same)
+    """
+    counts = Counter((ch.get('fontname'), round(ch.get('size') or 0, 1))
+                     for chars in row_chars for ch in chars)
+    if not counts:
+        return None
+    (body_font, body_size), _ = counts.most_common(1)[0]
+    body_bold = is_bold(body_font)
+
+    def emphasized(ch):
+        font = ch.get('fontname')
+        size = ch.get('size') or 0
+        return (size >= body_size + SIZE_DELTA or font != body_font
+                or (is_bold(font) and not body_bold))
+
+    header = 0
+    for r, chars in enumerate(row_chars[:MAX_FONT_HEADER_ROWS + 1]):
+        if not chars:
+            continue
+        ratio = sum(1 for ch in chars if emphasized(ch)) / len(chars)
+        if ratio < MIN_EMPHASIS_RATIO:
+            break
+        header = r + 1
+    else:
+        # Never reached a body row: no contrast between header and data
+        return None
+
+    # Drop trailing section labels ("Sources of Funds")
+    while header > 1 and header <= table.n_rows and table.row_mask(header - 1) in (0, 1):
+        header -= 1
+
+    if header == 0:
+        return None
+    return min(header, MAX_FONT_HEADER_ROWS)
+
+
+def spans_from_cells(found_table, table, header_rows):
+    """
+    Spanning header cells from the table's cell geometry.
+
+    pdfplumber reports a cell that spans several grid columns as one cell
+    followed by None entries in the row. Only header cells with text are
+    returned.
+
+    Returns:
+        list: (row, start_col, end_col) tuples, 0-based and inclusive
+    """
+    spans = []
+    for r, row in enumerate(list(found_table.rows)[:header_rows]):
+        cells = list(row.cells)
+        c = 0
+        while c < len(cells):
+            end = c
+            while end + 1 < len(cells) and cells[end + 1] is None:
+                end += 1
+            if cells[c] is not None and end > c and table.text(r, c):
+                spans.append((r, c, end))
+            c = end + 1
+    return spans
+
+
+def layout_header_row(words, col_centers, gap=None):
+    """
+    Place a header row's words into grid cells, keeping phrases together.
+
+    Words closer than `gap` are joined into one phrase. A phrase whose
+    extent covers several column centers is placed in the first covered
+    column and reported as a span instead of being split word by word.
+
+    Returns:
+        tuple: (cells, spans) where cells is the row's cell texts and
+        spans is a list of (start_col, end_col) pairs
+    """
+    cells = ['' for _ in col_centers]
+    spans = []
+    phrases = []
+    for w in sorted(words, key=lambda w: w['x0']):
+        limit = gap if gap is not None else (w['bottom'] - w['top']) * 0.6
+        if phrases and w['x0'] - phrases[-1]['x1'] <= limit:
+            phrases[-1]['text'] += ' ' + w['text']
+            phrases[-1]['x1'] = w['x1']
+        else:
+            phrases.append({'text': w['text'], 'x0': w['x0'], 'x1': w['x1']})
+
+    for p in phrases:
+        covered = [i for i, cc in enumerate(col_centers) if p['x0'] <= cc <= p['x1']]
+        if len(covered) >= 2:
+            col = covered[0]
+            spans.append((covered[0], covered[-1]))
+        else:
+            cx = (p['x0'] + p['x1']) / 2
+            col = min(range(len(col_centers)), key=lambda i: abs(cx - col_centers[i]))
+        cells[col] = f"{cells[col]} {p['text']}" if cells[col] else p['text']
+
+    return cells, spans
@@ -0,0 +1,163 @@
+
+import json
+import os
+from src.table import CompactTable
+
+JOURNAL_VERSION = 1
+
+
+def journal_path_for(output_path):
+    """Default journal location next to the output workbook."""
+    return os.path.splitext(output_path)[0] + '.journal.jsonl'
+
+
+def _source_info(source):
+    """Identity of a PDF file, used to reject journals of another file."""
+    if not isinstance(source, (str, os.PathLike)) or not os.path.exists(source):
+        return None
+    st = os.stat(source)
+    return {'path': os.path.abspath(source), 'size': st.st_size, 'mtime': int(st.st_mtime)}
+
+
+def _describe_changes(old, new):
+    """'key: old -> new' for every option that differs."""
+    old, new = old or {}, new or {}
+    return ', '.join(f"{key}: {old.get(key)} -> {new.get(key)}"
+                     for key in sorted(set(old) | set(new)) if old.get(key) != new.get(key))
+
+
+def _encode_table(found):
+    header = found.get('header')
+    return {
+        'rows': found['table'].to_rows(),
+        'bbox': list(found['bbox']) if found.get('bbox') else None,
+        'col_xs': found.get('col_xs'),
+        'header': {'rows': header['rows'], 'spans': [list(s) for s in header['spans']]}
+                  if header else None,
+        'degraded': found.get('degraded'),
+    }
+
+
+def _decode_table(entry, page_num, index_on_page):
+    header = entry['header']
+    return {
+        'table': CompactTable.from_rows(entry['rows']),
+        'page': page_num,
+        'index_on_page': index_on_page,
+        'bbox': tuple(entry['bbox']) if entry['bbox'] else None,
+        'col_xs': entry['col_xs'],
+        'header': {'rows': header['rows'], 'spans': [tuple(s) for s in header['spans']]}
+                  if header else None,
+        'degraded': entry.get('degraded'),
+    }
+
+
+class PageJournal:
+    """
+    Append-only JSONL checkpoint of per-page extraction results.
+
+    The first line identifies the source PDF and the extraction options;
+    every following line holds one completed page and its tables. Each
+    page is flushed to disk as soon as it is recorded, so a crash loses
+    at most the page in flight. Reopening with `resume=True` keeps the
+    recorded pages (a torn last line from a crash is dropped) and
+    `completed` tells the extractor which pages to skip. A journal of
+    another file, or one extracted with other options, is started over,
+    so pages read under different settings never end up in one workbook.
+    """
+
+    def __init__(self, path, source=None, resume=False, options=None):
+        self.path = path
+        self.completed = set()
+        self.table_count = 0
+        info = _source_info(source) if source is not None else None
+
+        if resume and os.path.exists(path):
+            problem = self._load(info, options)
+            if problem is None:
+                self._file = open(path, 'a', encoding='utf-8')
+                return
+            print(f"Journal {path} {problem}; starting over")
+
+        output_dir = os.path.dirname(path)
+        if output_dir:
+            os.makedirs(output_dir, exist_ok=True)
+        self._file = open(path, 'w', encoding='utf-8')
+        self._append({'journal': JOURNAL_VERSION, 'source': info, 'options': options})
+
+    def _load(self, info, options):
+        """Read completed pages; returns why the journal is unusable, or None."""
+        valid_end = 0
+        with open(self.path, 'rb') as f:
+            for n, line in enumerate(f):
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    break  # torn write at the crash point
+                if n == 0:
+                    if entry.get('journal') != JOURNAL_VERSION or entry.get('source') != info:
+                        return "belongs to another document"
+                    if entry.get('options') != options:
+                        return (f"was extracted with other options "
+                                f"({_describe_changes(entry.get('options'), options)})")
+                else:
+                    self.completed.add(entry['page'])
+                    self.table_count += len(entry['tables'])
+                valid_end = f.tell()
+        if valid_end == 0:
+            return "is empty"
+        with open(self.path, 'r+b') as f:
+            f.truncate(valid_end)
+        return None
+
+    def _append(self, entry):
+        self._file.write(json.dumps(entry, separators=(',', ':')) + '\n')
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def record_page(self, page_num, page_tables):
+        """Checkpoint one completed page (pages without tables included)."""
+        self._append({'page': page_num, 'tables': [_encode_table(t) for t in page_tables]})
+        self.completed.add(page_num)
+        self.table_count += len(page_tables)
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def iter_journal_tables(path):
+    """
+    Yield the journaled tables in page order, one page in memory at a time.
+
+    Pages are indexed by file offset first, so pages appended out of
+    order (retried after a resume) still come back sorted.
+
+    Yields:
+        dict: Table dicts as produced by src.extractor.iter_tables_from_pdf
+    """
+    offsets = {}
+    with open(path, 'rb') as f:
+        f.readline()  # source line
+        while True:
+            offset = f.tell()
+            line = f.readline()
+            if not line:
+                break
+            try:
+                page_num = json.loads(line)['page']
+            except ValueError:
+                break
+            offsets[page_num] = offset
+
+        for page_num in sorted(offsets):
+            f.seek(offsets[page_num])
+            entry = json.loads(f.readline())
+            for idx, table in enumerate(entry['tables'], start=1):
+                yield _decode_table(table, page_num, idx)
@@ -0,0 +1,211 @@
+
+from pdfplumber import utils
+from pdfplumber.table import (Table, TableFinder, TableSettings, cells_to_tables,
+                              edges_to_intersections, intersections_to_cells, merge_edges,
+                              words_to_edges_h)
+
+try:
+    import numpy as np
+except ImportError:  # optional: pdfplumber's own cell search is used instead
+    np = None
+
+# Below this many (vertical x horizontal) edge pairs pdfplumber's cell
+# search is already cheap and the array setup would not pay off
+LATTICE_MIN_PAIRS = 100
+
+
+def lattice_cells(edges, x_tolerance, y_tolerance):
+    """
+    Grid cells of merged table edges, computed with array operations.
+
+    Produces exactly the cells of pdfplumber's edges_to_intersections +
+    intersections_to_cells, in the same order: for every intersection
+    (top-left corner) the cell with the nearest bottom edge, then the
+    nearest right edge, whose four sides are each covered by one edge.
+    Instead of comparing intersections pairwise, the intersections are
+    laid out on the grid of distinct edge positions; which grid points
+    share an edge becomes a boolean matrix per column and per row, and
+    the cell search for a whole grid row is one masked argmax.
+
+    Args:
+        edges (list): Merged edges as returned by TableFinder.get_edges
+        x_tolerance (float): The settings' intersection_x_tolerance
+        y_tolerance (float): The settings' intersection_y_tolerance
+
+    Returns:
+        list: (x0, top, x1, bottom) cell bboxes
+    """
+    v_edges = [e for e in edges if e['orientation'] == 'v']
+    h_edges = [e for e in edges if e['orientation'] == 'h']
+    if not v_edges or not h_edges:
+        return []
+
+    v_x = np.array([e['x0'] for e in v_edges])
+    v_top = np.array([e['top'] for e in v_edges])
+    v_bottom = np.array([e['bottom'] for e in v_edges])
+    h_y = np.array([e['top'] for e in h_edges])
+    h_x0 = np.array([e['x0'] for e in h_edges])
+    h_x1 = np.array([e['x1'] for e in h_edges])
+
+    xs, v_col = np.unique(v_x, return_inverse=True)
+    ys, h_row = np.unique(h_y, return_inverse=True)
+    nx, ny = len(xs), len(ys)
+
+    # Which edges reach which grid lines (pdfplumber's comparisons, verbatim)
+    v_reach = (v_top[:, None] <= ys[None, :] + y_tolerance) & \
+              (v_bottom[:, None] >= ys[None, :] - y_tolerance)
+    h_reach = (xs[None, :] >= h_x0[:, None] - x_tolerance) & \
+              (xs[None, :] <= h_x1[:, None] + x_tolerance)
+
+    # Intersections: a vertical edge and a horizontal edge that reach each other
+    touches = v_reach[:, h_row] & h_reach[:, v_col].T
+    present = np.zeros((ny, nx), dtype=bool)
+    v_idx, h_idx = np.nonzero(touches)
+    present[h_row[h_idx], v_col[v_idx]] = True
+
+    # down[x, y1, y2]: one vertical edge at column x spans rows y1..y2;
+    # across[y, x1, x2]: one horizontal edge at row y spans columns x1..x2
+    down = np.zeros((nx, ny, ny), dtype=bool)
+    for col in range(nx):
+        reach = v_reach[v_col == col].astype(np.int32)
+        down[col] = (reach.T @ reach) > 0
+    across = np.zeros((ny, nx, nx), dtype=bool)
+    for row in range(ny):
+        reach = h_reach[h_row == row].astype(np.int32)
+        across[row] = (reach.T @ reach) > 0
+
+    right_of = np.triu(np.ones((nx, nx), dtype=bool), 1)
+    found = []
+    for row in range(ny - 1):
+        below = slice(row + 1, ny)
+        # Indexed [corner column, bottom row, right column]
+        bottom_ok = present[below].T & down[:, row, below]
+        right_ok = present[row][None, :] & across[row] & right_of
+        corner_ok = present[below] & down[:, row, below].T
+        mask = (bottom_ok[:, :, None] & right_ok[:, None, :] & corner_ok[None, :, :]
+                & across[below].transpose(1, 0, 2))
+        mask &= present[row][:, None, None]
+
+        flat = mask.reshape(nx, -1)
+        first = flat.argmax(axis=1)
+        for col in np.nonzero(flat.any(axis=1))[0]:
+            b, r = divmod(int(first[col]), nx)
+            found.append((xs[col], ys[row], xs[r], ys[row + 1 + b]))
+
+    # pdfplumber lists cells by their top-left corner, column-major
+    found.sort(key=lambda c: (c[0], c[1]))
+    return [tuple(float(v) for v in cell) for cell in found]
+
+
+class LatticeTableFinder(TableFinder):
+    """
+    pdfplumber's TableFinder with the cell search done by lattice_cells.
+
+    Edge extraction and merging are pdfplumber's own, so the edges, cells
+    and tables are the same as page.find_tables() with the same settings.
+    Pages with few edges keep pdfplumber's cell search.
+    """
+
+    def __init__(self, page, settings=None):
+        self.page = page
+        self.settings = TableSettings.resolve(settings)
+        self.edges = self.get_edges()
+        n_v = sum(1 for e in self.edges if e['orientation'] == 'v')
+        x_tol = self.settings.intersection_x_tolerance
+        y_tol = self.settings.intersection_y_tolerance
+        if np is None or n_v * (len(self.edges) - n_v) < LATTICE_MIN_PAIRS:
+            self.intersections = edges_to_intersections(self.edges, x_tol, y_tol)
+            self.cells = intersections_to_cells(self.intersections)
+        else:
+            self.intersections = None
+            self.cells = lattice_cells(self.edges, x_tol, y_tol)
+        self.tables = [Table(self.page, group) for group in cells_to_tables(self.cells)]
+
+
+class RegionTableFinder(LatticeTableFinder):
+    """
+    LatticeTableFinder limited to one candidate region of a page.
+
+    Only the text lines overlapping the region are grouped into words
+    and row edges, and only the region's rulings reach the cell search,
+    so text and rulings elsewhere on the page are left out. The
+    vertical rulings are merged once for the whole page (`v_edges`), as
+    pdfplumber snaps rulings of different tables to a common x. Row
+    edges of the text strategy span the text extent of the whole page;
+    they are stretched to it (`text_x`), so they reach the same rulings
+    as they would on the full page.
+    """
+
+    def __init__(self, page, settings, region, chars, v_edges, text_x):
+        self.region = region
+        self.region_chars = chars
+        self.v_edges = v_edges
+        self.text_x = text_x
+        super().__init__(page, settings)
+
+    def get_edges(self):
+        settings = self.settings
+        x0, top, x1, bottom = self.region
+        v = [e for e in self.v_edges
+             if x0 <= e['x0'] <= x1 and e['bottom'] >= top and e['top'] <= bottom]
+        chars = [c for c in self.region_chars if c['bottom'] >= top and c['top'] <= bottom]
+        words = utils.extract_words(chars, **(settings.text_settings or {}))
+        h = words_to_edges_h(words, word_threshold=settings.min_words_horizontal)
+        for e in h:
+            e['x0'], e['x1'] = self.text_x
+            e['width'] = e['x1'] - e['x0']
+        return v + _merge(h, settings)
+
+
+def _merge(edges, settings):
+    """pdfplumber's snapping, joining and length filter of table edges."""
+    edges = merge_edges(edges,
+                        snap_x_tolerance=settings.snap_x_tolerance,
+                        snap_y_tolerance=settings.snap_y_tolerance,
+                        join_x_tolerance=settings.join_x_tolerance,
+                        join_y_tolerance=settings.join_y_tolerance)
+    return utils.filter_edges(edges, min_length=settings.edge_min_length)
+
+
+def _text_extent(chars):
+    """Leftmost and rightmost x of the page's words, from their chars."""
+    xs = [(c['x0'], c['x1']) for c in chars if not c['text'].isspace()]
+    if not xs:
+        return None
+    return min(x[0] for x in xs), max(x[1] for x in xs)
+
+
+def find_tables(page, settings, regions=None):
+    """
+    Drop-in for page.find_tables(settings) using LatticeTableFinder.
+
+    With `regions` (see src.regions.candidate_regions), tables are found
+    once per region by a RegionTableFinder. Every cell is bounded by
+    rulings of a single region, so this finds the tables of the full
+    page, in the same order. Settings other than ruled columns and
+    single-word text rows are always run on the full page.
+
+    Returns:
+        list: pdfplumber Table objects
+    """
+    if regions is None:
+        return LatticeTableFinder(page, settings).tables
+    settings = TableSettings.resolve(settings)
+    if (settings.vertical_strategy != 'lines' or settings.horizontal_strategy != 'text'
+            or settings.min_words_horizontal != 1 or settings.explicit_vertical_lines
+            or settings.explicit_horizontal_lines):
+        return LatticeTableFinder(page, settings).tables
+
+    chars = page.chars
+    text_x = _text_extent(chars)
+    if text_x is None:
+        return []
+    v_edges = _merge(utils.filter_edges(page.edges, 'v',
+                                        min_length=settings.edge_min_length_prefilter),
+                     settings)
+    tables = []
+    for region in regions:
+        tables.extend(RegionTableFinder(page, settings, region, chars, v_edges, text_x).tables)
+    # pdfplumber's order: by the topmost, then leftmost cell corner
+    tables.sort(key=lambda t: min((c[1], c[0]) for c in t.cells))
+    return tables
@@ -0,0 +1,111 @@
+
+import re
+from functools import lru_cache
+
+# Cell texts that mean "nil" in financial statements
+DASHES = frozenset({'-', '–', '—', '−'})
+
+# Accounting-format number: optional parentheses (negative), sign,
+# western (1,234,567) or Indian lakh (12,34,567) grouping, decimals and
+# a trailing percent sign.
+NUMBER_RE = re.compile(r"""
+    ^(?P<open>\(\s*)?
+    (?P<sign>[-−–])?
+    (?P<int>\d{1,3}(?:,\d{3})+|\d{1,2}(?:,\d{2})+,\d{3}|\d+)?
+    (?P<frac>\.\d+)?
+    (?P<pct>\s*%)?
+    (?(open)\s*\))$
+    """, re.VERBOSE)
+
+DASH_MODES = ('zero', 'null', 'text')
+
+
+def _number_format(int_text, decimals, parens, pct):
+    """
+    Excel number format that displays a value the way its source text did.
+
+    Plain digits keep no grouping (a year stays 2025), western grouping
+    uses Excel's own separator and Indian lakh grouping, which Excel has
+    no separator for, is spelled out with literal commas at the places
+    of the source text. Parentheses and percent signs are kept.
+    """
+    if ',' not in int_text:
+        fmt = '0'
+    elif re.fullmatch(r'\d{1,3}(?:,\d{3})+', int_text):
+        fmt = '#,##0'
+    else:
+        # 12,34,567 -> ##\,##\,##0
+        fmt = re.sub(r'\d', '#', int_text[:-1]).replace(',', '\\,') + '0'
+    fmt += ('.' + '0' * decimals if decimals else '') + ('%' if pct else '')
+    return f'{fmt};({fmt})' if parens else fmt
+
+
+@lru_cache(maxsize=4096)
+def parse_number(text, dash='zero'):
+    """
+    Parse one accounting-format cell text.
+
+    Handles parentheses negatives, leading signs, thousands separators
+    (western and Indian lakh grouping), decimals and percentages. Dashes
+    become 0 or None depending on `dash` ('zero', 'null' or 'text').
+
+    Args:
+        text (str): Stripped cell text
+        dash (str): How to treat a lone dash
+
+    Returns:
+        tuple or None: (value, number_format) for numeric cells, where
+        value may be None for dashes typed as null; None when the text
+        is not a number and should stay a string.
+    """
+    if not text:
+        return None
+    if text in DASHES:
+        if dash == 'zero':
+            return 0, '#,##0;(#,##0);"-"'
+        if dash == 'null':
+            return None, 'General'
+        return None
+
+    m = NUMBER_RE.match(text)
+    if not m or not (m.group('int') or m.group('frac')):
+        return None
+
+    digits = (m.group('int') or '0').replace(',', '')
+    # Codes with leading zeros ("007") and long identifiers stay text
+    if (len(digits) > 1 and digits[0] == '0') or len(digits) > 15:
+        return None
+    frac = m.group('frac') or ''
+    value = float(digits + frac) if frac else int(digits)
+    parens = m.group('open') is not None
+    if parens or m.group('sign'):
+        value = -value
+    pct = m.group('pct') is not None
+    if pct:
+        value = value / 100
+    decimals = len(frac) - 1 if frac else 0
+    return value, _number_format(m.group('int') or '0', decimals, parens, pct)
+
+
+def is_numeric_text(text):
+    """True when `text` is a number or a dash in accounting format."""
+    return parse_number(text) is not None
+
+
+def type_column(column, dash='zero'):
+    """
+    Type a whole column of stripped cell texts in one pass.
+
+    Args:
+        column (sequence): Cell texts (None for missing cells)
+        dash (str): How to treat lone dashes ('zero', 'null' or 'text')
+
+    Returns:
+        tuple: (values, formats) tuples aligned with `column`. formats[i]
+        is None where the cell stays text; otherwise values[i] is the
+        parsed number and formats[i] its Excel number format.
+    """
+    parsed = [parse_number(v, dash) if v else None for v in column]
+    values = tuple(p[0] if p else v for p, v in zip(parsed, column))
+    formats = tuple(p[1] if p else None for p in parsed)
+    return values, formats
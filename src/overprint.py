@@ -0,0 +1,97 @@
+
+from collections import defaultdict
+
+# Copies of a glyph drawn within this many points of each other are one char
+OVERPRINT_TOLERANCE = 1
+# ... and only when they overlap by more than half the glyph's width, so
+# narrow letters in small print ("ll" in 4pt text) are not mistaken for copies
+OVERPRINT_MAX_SHIFT = 0.5
+
+
+def _chain_clusters(items, value, tolerance):
+    """
+    Group items whose sorted values are within reach of the previous one.
+
+    `tolerance(item)` is the reach from an item to the next.
+    """
+    items = sorted(items, key=value)
+    group = [items[0]]
+    for item in items[1:]:
+        if value(item) <= value(group[-1]) + tolerance(group[-1]):
+            group.append(item)
+        else:
+            yield group
+            group = [item]
+    yield group
+
+
+def dedupe_chars(chars, tolerance=OVERPRINT_TOLERANCE):
+    """
+    Drop overprinted copies of chars.
+
+    Some filings fake bold text by drawing every glyph two or three times
+    at (almost) the same position. Chars with the same text, font, size
+    and orientation whose positions cluster within `tolerance` are
+    collapsed to the top-left one, as in pdfplumber's dedupe_chars
+    (without its quadratic reordering). In addition, copies must overlap
+    by more than OVERPRINT_MAX_SHIFT of their width: at 1pt, pdfplumber's
+    rule also merges real neighbouring letters in small print.
+
+    Args:
+        chars (list): pdfplumber char dicts
+        tolerance (float): Largest offset between copies, in points
+
+    Returns:
+        list: Remaining chars in their original order (the input list
+        itself when nothing was removed)
+    """
+    glyphs = defaultdict(list)
+    for i, ch in enumerate(chars):
+        glyphs[(ch.get('upright'), ch['text'], ch.get('fontname'), ch.get('size'))].append(i)
+
+    def top(i):
+        return chars[i]['doctop']
+
+    def left(i):
+        return chars[i]['x0']
+
+    def same_line(i):
+        return tolerance
+
+    def overlapping(i):
+        return min(tolerance, (chars[i]['x1'] - chars[i]['x0']) * OVERPRINT_MAX_SHIFT)
+
+    keep = []
+    for indices in glyphs.values():
+        if len(indices) == 1:
+            keep.extend(indices)
+            continue
+        for row in _chain_clusters(indices, top, same_line):
+            for copies in _chain_clusters(row, left, overlapping):
+                keep.append(min(copies, key=lambda i: (top(i), left(i), i)))
+
+    if len(keep) == len(chars):
+        return chars
+    return [chars[i] for i in sorted(keep)]
+
+
+def dedupe_page_chars(page, stats=None):
+    """
+    The page without overprinted chars, ready for word and table work.
+
+    Args:
+        page: pdfplumber page
+        stats (dict, optional): Incremented under 'duplicate_chars'
+
+    Returns:
+        The page itself when it has no overprinted chars, otherwise a
+        filtered view of it
+    """
+    chars = page.chars
+    kept = dedupe_chars(chars)
+    if kept is chars:
+        return page
+    if stats is not None:
+        stats['duplicate_chars'] = stats.get('duplicate_chars', 0) + len(chars) - len(kept)
+    kept_ids = {id(ch) for ch in kept}
+    return page.filter(lambda obj: obj['object_type'] != 'char' or id(obj) in kept_ids)
@@ -0,0 +1,153 @@
+
+import mmap
+import os
+import shutil
+import struct
+import sys
+import tempfile
+from array import array
+from itertools import accumulate
+from src.table import CompactTable, as_compact
+
+# n_rows, n_cols, number of distinct strings, index of None among them
+_HEADER = struct.Struct('=IIII')
+_NO_NONE = 0xFFFFFFFF
+
+
+def _id_type(n_strings):
+    """Smallest array typecode able to index `n_strings` strings."""
+    return 'B' if n_strings <= 0xFF else 'H' if n_strings <= 0xFFFF else 'I'
+
+
+def make_spill_dir():
+    """
+    Create a private directory for packed results.
+
+    On Linux it lives in /dev/shm, so spill files are shared memory that
+    never touches the disk; elsewhere the temp directory is used.
+    """
+    parent = '/dev/shm' if os.path.isdir('/dev/shm') else None
+    return tempfile.mkdtemp(prefix='pdf-tables-', dir=parent)
+
+
+def remove_spill_dir(spill_dir):
+    """Delete a spill directory and any files left in it."""
+    shutil.rmtree(spill_dir, ignore_errors=True)
+
+
+def pack_table(table):
+    """
+    Pack a table into one contiguous buffer.
+
+    Layout (native byte order, both ends run on the same machine): a
+    header, the row lengths, one string index per cell (column-major, as
+    narrow as the number of distinct strings allows), the end offset of every distinct string and
+    the UTF-8 text of the distinct strings joined together. Repeated
+    cells (blank cells, dashes, units) are stored once, and offsets
+    count characters, so the reader decodes the blob once and cuts each
+    distinct string out of it once.
+
+    Returns:
+        bytes: The packed table
+    """
+    table = as_compact(table)
+    ids = {}
+    cell_ids = [ids.setdefault(v, len(ids)) for col in table.columns for v in col]
+    texts = [v or '' for v in ids]
+    ends = array('I', accumulate(map(len, texts)))
+    header = _HEADER.pack(table.n_rows, table.n_cols, len(ids), ids.get(None, _NO_NONE))
+    return b''.join((header, array('I', table.row_lengths).tobytes(),
+                     array(_id_type(len(ids)), cell_ids).tobytes(),
+                     ends.tobytes(), ''.join(texts).encode('utf-8')))
+
+
+def unpack_table(buffer, offset=0, size=None):
+    """
+    Rebuild a CompactTable from a buffer written by pack_table.
+
+    Args:
+        buffer: bytes, mmap or memoryview holding the packed table
+        offset (int): Where the table starts in `buffer`
+        size (int, optional): Packed size; defaults to the rest of `buffer`
+
+    Returns:
+        CompactTable: The table, cells interned as on construction
+    """
+    view = memoryview(buffer)
+    end = len(view) if size is None else offset + size
+    n_rows, n_cols, n_strings, none_id = _HEADER.unpack_from(view, offset)
+    pos = offset + _HEADER.size
+
+    arrays = []
+    for typecode, count in (('I', n_rows), (_id_type(n_strings), n_rows * n_cols),
+                            ('I', n_strings)):
+        values = array(typecode)
+        nbytes = values.itemsize * count
+        values.frombytes(view[pos:pos + nbytes])
+        arrays.append(values)
+        pos += nbytes
+    row_lengths, cell_ids, ends = arrays
+    text = str(view[pos:end], 'utf-8')
+    view.release()
+
+    starts = array('I', [0])
+    starts.extend(ends[:-1])
+    strings = list(map(sys.intern, map(text.__getitem__, map(slice, starts, ends))))
+    if none_id != _NO_NONE:
+        strings[none_id] = None
+    cells = list(map(strings.__getitem__, cell_ids))
+    columns = [tuple(cells[c * n_rows:(c + 1) * n_rows]) for c in range(n_cols)]
+    return CompactTable(columns, tuple(row_lengths))
+
+
+class PackedTables:
+    """
+    Table dicts packed into one spill file, passed between processes.
+
+    Only this handle (the file path and the small per-table metadata:
+    page, bbox, header ...) is pickled when it crosses a process
+    boundary; the cells stay in the file. Iterating maps the file and
+    rebuilds one table at a time, so the receiver holds no cell objects
+    until it actually reads a table. `release()` deletes the file.
+    """
+
+    def __init__(self, tables, spill_dir):
+        self.path = None
+        self.entries = []
+        offset = 0
+        fd, path = tempfile.mkstemp(suffix='.tables', dir=spill_dir)
+        with os.fdopen(fd, 'wb') as f:
+            for found in tables:
+                packed = pack_table(found['table'])
+                f.write(packed)
+                meta = {k: v for k, v in found.items() if k != 'table'}
+                self.entries.append((meta, offset, len(packed)))
+                offset += len(packed)
+        if offset:
+            self.path = path
+        else:
+            os.remove(path)  # nothing to map
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __iter__(self):
+        if self.path is None:
+            return
+        with open(self.path, 'rb') as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            for meta, offset, size in self.entries:
+                yield {'table': unpack_table(mapped, offset, size), **meta}
+        finally:
+            mapped.close()
+
+    def release(self):
+        """Delete the spill file; the handle is empty afterwards."""
+        if self.path is not None:
+            try:
+                os.remove(self.path)
+            except FileNotFoundError:
+                pass
+        self.path = None
+        self.entries = []
@@ -0,0 +1,85 @@
+
+import io
+import mmap
+import os
+import pathlib
+import pdfplumber
+
+# Per-process cache of read-only document mappings, keyed by real path,
+# so every shard a worker runs on the same file maps it only once.
+# Long-lived workers see many documents; only the most recent are kept.
+_SHARED_MAPS = {}
+MAX_SHARED_MAPS = 4
+
+
+def map_pdf(path):
+    """
+    Map a PDF file read-only into memory.
+
+    All processes that map the same file share its page-cache pages, so
+    nothing is copied into process memory when pages are parsed.
+
+    Returns:
+        mmap.mmap: Read-only mapping of the whole file
+    """
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            raise ValueError(f"PDF file is empty: {path}")
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def shared_pdf_map(path):
+    """Return this process's shared read-only mapping of `path`, creating it once."""
+    key = os.path.realpath(path)
+    mapped = _SHARED_MAPS.get(key)
+    if mapped is None or mapped.closed:
+        while len(_SHARED_MAPS) >= MAX_SHARED_MAPS:
+            oldest = _SHARED_MAPS.pop(next(iter(_SHARED_MAPS)))
+            if not oldest.closed:
+                oldest.close()
+        mapped = _SHARED_MAPS[key] = map_pdf(key)
+    return mapped
+
+
+def release_shared_maps():
+    """Close every cached mapping in this process."""
+    for mapped in _SHARED_MAPS.values():
+        if not mapped.closed:
+            mapped.close()
+    _SHARED_MAPS.clear()
+
+
+def describe_source(source):
+    """Short human-readable name of a PDF source for progress output."""
+    if isinstance(source, (str, pathlib.Path)):
+        return str(source)
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return f"<in-memory PDF, {len(source)} bytes>"
+    if isinstance(source, mmap.mmap):
+        return f"<memory-mapped PDF, {len(source)} bytes>"
+    return getattr(source, 'name', None) or f"<{type(source).__name__} stream>"
+
+
+def open_pdf(source):
+    """
+    Open a PDF from any supported source.
+
+    Args:
+        source: A path (str or Path), raw bytes / bytearray / memoryview,
+            a memory map, or a binary file-like object with read/seek
+
+    Returns:
+        pdfplumber.PDF: The opened document (use as a context manager).
+        Streams passed in by the caller are not closed with it.
+    """
+    if isinstance(source, (str, pathlib.Path)):
+        return pdfplumber.open(source)
+    if isinstance(source, bytes):
+        # BytesIO shares an immutable bytes buffer instead of copying it
+        return pdfplumber.open(io.BytesIO(source))
+    if isinstance(source, (bytearray, memoryview)):
+        return pdfplumber.open(io.BytesIO(bytes(source)))
+    if hasattr(source, 'read') and hasattr(source, 'seek'):
+        source.seek(0)
+        return pdfplumber.open(source)
+    raise TypeError(f"Unsupported PDF source: {type(source).__name__}")
@@ -0,0 +1,70 @@
+
+import atexit
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from src.styles import shared_styles
+
+# Modules imported once by the forkserver before any worker is forked,
+# so that it has the whole engine in memory before the first fork
+PRELOAD_MODULES = ['src.extractor', 'src.shards', 'src.writer', 'src.pool']
+
+# Live pools by (name, size), kept between jobs
+_POOLS = {}
+
+
+def warm_context():
+    """
+    Multiprocessing context whose workers start with the engine loaded.
+
+    With the 'forkserver' start method a single server process imports
+    PRELOAD_MODULES once; every worker is then forked from it and shares
+    those pages copy-on-write, so a new worker costs a fork instead of
+    an interpreter start plus the pdfplumber/openpyxl imports. The
+    server is single-threaded, so forking from it is safe even while the
+    caller runs pool manager threads. Platforms without forkserver fall
+    back to 'spawn'.
+    """
+    if 'forkserver' not in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context('spawn')
+    context = multiprocessing.get_context('forkserver')
+    # Only takes effect when the server starts, i.e. for the first pool
+    context.set_forkserver_preload(PRELOAD_MODULES)
+    return context
+
+
+def warm_pool(workers, name='default'):
+    """
+    Return a persistent pool of warm worker processes.
+
+    Pools are created on first use and kept for the life of the process,
+    so later jobs (the next batch, the next request of a service) reuse
+    running workers. A pool whose worker died is replaced.
+
+    Args:
+        workers (int): Number of worker processes
+        name (str): Keeps pools of different stages (e.g. extraction
+            and workbook writing) apart
+
+    Returns:
+        ProcessPoolExecutor: The pool; do not shut it down, use
+        shutdown_pools()
+    """
+    key = (name, workers)
+    pool = _POOLS.get(key)
+    if pool is None or pool._broken or pool._shutdown_thread:
+        pool = _POOLS[key] = ProcessPoolExecutor(max_workers=workers,
+                                                 mp_context=warm_context())
+    return pool
+
+
+def shutdown_pools():
+    """Stop every persistent pool (also runs at interpreter exit)."""
+    for pool in _POOLS.values():
+        pool.shutdown(cancel_futures=True)
+    _POOLS.clear()
+
+
+atexit.register(shutdown_pools)
+
+# Built here too, so forked workers inherit the style objects
+shared_styles()
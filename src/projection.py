@@ -0,0 +1,262 @@
+
+import math
+from bisect import bisect_right
+from itertools import accumulate
+from src.headers import header_rows_from_fonts, layout_header_row
+from src.numeric import is_numeric_text
+from src.table import CompactTable
+
+# Narrowest white gap (points) between two columns; words closer than
+# this on one line belong to the same phrase
+MIN_GUTTER = 8
+# Share of a table's rows whose text may cross a column gutter (long
+# labels running into the first value column)
+GUTTER_NOISE = 0.1
+# A borderless table needs this many lines with numbers ...
+MIN_TABLE_ROWS = 3
+# ... in at least this many columns (label column included)
+MIN_COLUMNS = 2
+# Multi-phrase lines right above a table are taken as its header
+MAX_HEADER_LINES = 3
+# A vertical gap of more than this many line heights ends a table
+MAX_LINE_GAP = 2.0
+# Label-only lines (section headings) allowed between two table lines
+MAX_LABEL_LINES = 2
+
+
+def projection(spans, start, end):
+    """
+    Occupancy histogram of 1pt bins over [start, end).
+
+    Built from a difference array and one prefix sum, so the cost is one
+    pass over the spans plus one over the bins.
+
+    Args:
+        spans (iterable): (lo, hi) intervals
+        start, end (int): Histogram range
+
+    Returns:
+        list: Number of spans covering each bin
+    """
+    diff = [0] * (end - start + 1)
+    for lo, hi in spans:
+        diff[max(0, math.floor(lo) - start)] += 1
+        diff[min(end - start, math.ceil(hi) - start)] -= 1
+    return list(accumulate(diff))[:-1]
+
+
+def occupied_runs(counts, limit=0):
+    """(first, last + 1) bin ranges whose count exceeds `limit`."""
+    runs = []
+    first = None
+    for i, n in enumerate(counts):
+        if n > limit and first is None:
+            first = i
+        elif n <= limit and first is not None:
+            runs.append((first, i))
+            first = None
+    if first is not None:
+        runs.append((first, len(counts)))
+    return runs
+
+
+def text_lines(words):
+    """
+    Group words into lines from the page's y-projection.
+
+    Returns:
+        list: {'top', 'bottom', 'words', 'phrases'} dicts, top to bottom;
+        'phrases' are runs of words separated by less than MIN_GUTTER
+    """
+    if not words:
+        return []
+    start = math.floor(min(w['top'] for w in words))
+    end = math.ceil(max(w['bottom'] for w in words)) + 1
+    bands = occupied_runs(projection(((w['top'], w['bottom']) for w in words), start, end))
+
+    lines = [{'top': start + a, 'bottom': start + b, 'words': []} for a, b in bands]
+    tops = [line['top'] for line in lines]
+    for w in words:
+        cy = (w['top'] + w['bottom']) / 2
+        i = max(0, bisect_right(tops, cy) - 1)
+        lines[i]['words'].append(w)
+
+    for line in lines:
+        line['words'].sort(key=lambda w: w['x0'])
+        phrases = []
+        for w in line['words']:
+            if phrases and w['x0'] - phrases[-1]['x1'] < MIN_GUTTER:
+                phrases[-1]['words'].append(w)
+                phrases[-1]['x1'] = max(phrases[-1]['x1'], w['x1'])
+            else:
+                phrases.append({'x0': w['x0'], 'x1': w['x1'], 'words': [w]})
+        for p in phrases:
+            p['text'] = ' '.join(w['text'] for w in p['words'])
+        line['phrases'] = phrases
+    return lines
+
+
+def is_tabular(line):
+    """A line with a label or value followed by at least one number."""
+    phrases = line['phrases']
+    return len(phrases) >= 2 and any(
+        is_numeric_text(p['text']) or all(is_numeric_text(w['text']) for w in p['words'])
+        for p in phrases[1:])
+
+
+def table_blocks(lines):
+    """
+    Runs of tabular lines, with the label lines between them.
+
+    Returns:
+        list: (first, last) inclusive line indexes of each block with at
+        least MIN_TABLE_ROWS tabular lines
+    """
+    blocks = []
+    first = last = None
+    tabular = 0
+
+    def close():
+        if first is not None and tabular >= MIN_TABLE_ROWS:
+            blocks.append((first, last))
+
+    for i, line in enumerate(lines):
+        if not is_tabular(line):
+            continue
+        if first is not None:
+            between = lines[last + 1:i]
+            height = line['bottom'] - line['top']
+            gap = line['top'] - lines[i - 1]['bottom']
+            if (len(between) > MAX_LABEL_LINES or gap > MAX_LINE_GAP * height
+                    or any(len(l['phrases']) > 1 for l in between)):
+                close()
+                first, tabular = None, 0
+        if first is None:
+            first = i
+        last = i
+        tabular += 1
+    close()
+    return blocks
+
+
+def header_lines(lines, first):
+    """Number of multi-phrase lines directly above line `first`."""
+    n = 0
+    while n < MAX_HEADER_LINES and first - n - 1 >= 0:
+        line = lines[first - n - 1]
+        below = lines[first - n]
+        if (len(line['phrases']) < 2
+                or below['top'] - line['bottom'] > MAX_LINE_GAP * (line['bottom'] - line['top'])):
+            break
+        n += 1
+    return n
+
+
+def column_bands(body):
+    """
+    Column extents of a block from its x-projection.
+
+    Only tabular lines vote; a gutter is a run of bins crossed by at most
+    GUTTER_NOISE of them.
+
+    Returns:
+        list: (x0, x1) column bands, left to right
+    """
+    phrases = [p for line in body if is_tabular(line) for p in line['phrases']]
+    start = math.floor(min(p['x0'] for p in phrases))
+    end = math.ceil(max(p['x1'] for p in phrases)) + 1
+    counts = projection(((p['x0'], p['x1']) for p in phrases), start, end)
+    limit = int(GUTTER_NOISE * sum(1 for line in body if is_tabular(line)))
+
+    bands = []
+    for a, b in occupied_runs(counts, limit):
+        if bands and start + a - bands[-1][1] < MIN_GUTTER / 2:
+            bands[-1] = (bands[-1][0], start + b)
+        else:
+            bands.append((start + a, start + b))
+    return bands
+
+
+def _band_of(x0, x1, bands):
+    """Index of the band overlapping [x0, x1] most (nearest when none)."""
+    overlaps = [min(x1, b1) - max(x0, b0) for b0, b1 in bands]
+    best = max(range(len(bands)), key=lambda i: overlaps[i])
+    if overlaps[best] > 0:
+        return best
+    cx = (x0 + x1) / 2
+    return min(range(len(bands)), key=lambda i: abs(cx - (bands[i][0] + bands[i][1]) / 2))
+
+
+def fill_row(line, bands):
+    """
+    Cell texts of one line.
+
+    Numbers go to the column they sit in; a text phrase stays in one
+    cell, the column of its first word, even when a long label runs into
+    the next column.
+    """
+    cells = ['' for _ in bands]
+    for p in line['phrases']:
+        words = p['words']
+        if len(words) > 1 and all(is_numeric_text(w['text']) for w in words):
+            # Numbers of adjacent columns set closer than a gutter
+            pieces = [(w['x0'], w['x1'], w['text']) for w in words]
+        elif is_numeric_text(p['text']):
+            pieces = [(p['x0'], p['x1'], p['text'])]
+        else:
+            pieces = [(words[0]['x0'], words[0]['x1'], p['text'])]
+        for x0, x1, text in pieces:
+            col = _band_of(x0, x1, bands)
+            cells[col] = f"{cells[col]} {text}" if cells[col] else text
+    return cells
+
+
+def projection_tables(words):
+    """
+    Find borderless tables in a page's words from whitespace projections.
+
+    Lines come from the y-projection of the words. Runs of lines holding
+    numbers after a label form a table, together with the multi-phrase
+    header lines right above them; its columns are the occupied runs of
+    the x-projection of those lines, separated by white gutters. Cells
+    are filled from the same word index; no table finding runs.
+
+    Args:
+        words (list): Words from src.extractor.extract_grid_words
+
+    Returns:
+        list: {'table', 'bbox', 'header', 'col_centers'} dicts, top to
+        bottom; 'header' as in build_grid_from_words
+    """
+    lines = text_lines(words)
+    found = []
+    for first, last in table_blocks(lines):
+        bands = column_bands(lines[first:last + 1])
+        if len(bands) < MIN_COLUMNS:
+            continue
+        n_header = header_lines(lines, first)
+        rows = lines[first - n_header:last + 1]
+        table = [fill_row(line, bands) for line in rows]
+        col_centers = [(b0 + b1) / 2 for b0, b1 in bands]
+
+        # Font contrast decides the header depth; without any, the
+        # multi-phrase lines above the numbers are the header
+        row_chars = [[ch for w in line['words'] for ch in w.get('chars', ())] for line in rows]
+        header_rows = header_rows_from_fonts(row_chars, CompactTable.from_rows(table)) or n_header
+        header = None
+        if header_rows:
+            spans = []
+            for r in range(header_rows):
+                table[r], row_spans = layout_header_row(rows[r]['words'], col_centers)
+                spans.extend((r, start, end) for start, end in row_spans)
+            header = {'rows': header_rows, 'spans': spans}
+
+        row_words = [w for line in rows for w in line['words']]
+        found.append({
+            'table': CompactTable.from_rows(table),
+            'bbox': (min(w['x0'] for w in row_words), rows[0]['top'],
+                     max(w['x1'] for w in row_words), rows[-1]['bottom']),
+            'header': header,
+            'col_centers': col_centers,
+        })
+    return found
@@ -0,0 +1,89 @@
+
+# Vertical rulings closer than this (points, top to bottom) are grouped
+# into one candidate region
+REGION_JOIN_GAP = 30
+# Tolerances of table finding; a table found on the full page never
+# reaches further than this beyond the vertical rulings it is built on
+REGION_X_PADDING = 3
+REGION_Y_PADDING = 13
+# Chars whose middle lies in a table may stick out of it by this much
+CHAR_PADDING = 20
+
+
+def candidate_regions(page, min_height=10, join_gap=REGION_JOIN_GAP):
+    """
+    Page areas that can hold a table, from the vertical rulings only.
+
+    Table finding uses ruled lines for columns, so every table cell is
+    bounded by two vertical rulings. Rulings are grouped top to bottom
+    into regions; a region needs rulings at two x-positions at least.
+    Text, curves and images are never looked at, so this costs a small
+    fraction of table finding.
+
+    Args:
+        page: pdfplumber page
+        min_height (float): Shortest region that can hold a table row
+            (the table settings' edge_min_length)
+        join_gap (float): Largest vertical gap inside one region
+
+    Returns:
+        list: (x0, top, x1, bottom) region bboxes, padded by the table
+        finding tolerances and clipped to the page, top to bottom
+    """
+    rulings = sorted(
+        (e for e in page.edges if e['orientation'] == 'v'),
+        key=lambda e: e['top'])
+
+    groups = []
+    for e in rulings:
+        if groups and e['top'] <= groups[-1]['bottom'] + join_gap:
+            g = groups[-1]
+            g['bottom'] = max(g['bottom'], e['bottom'])
+            g['xs'].add(round(e['x0']))
+        else:
+            groups.append({'top': e['top'], 'bottom': e['bottom'], 'xs': {round(e['x0'])}})
+
+    px0, ptop, px1, pbottom = page.bbox
+    regions = []
+    for g in groups:
+        if len(g['xs']) < 2 or g['bottom'] - g['top'] < min_height:
+            continue
+        regions.append((
+            max(px0, min(g['xs']) - REGION_X_PADDING - 1),
+            max(ptop, g['top'] - REGION_Y_PADDING),
+            min(px1, max(g['xs']) + REGION_X_PADDING + 1),
+            min(pbottom, g['bottom'] + REGION_Y_PADDING),
+        ))
+    return regions
+
+
+class TableView:
+    """The part of a page a pdfplumber Table reads its cell text from."""
+
+    def __init__(self, chars):
+        self.chars = chars
+
+
+def table_view(page, bbox, chars=None):
+    """
+    View of the page holding only the chars a table's cells can hold.
+
+    Cell text is matched by char midpoints, so the view keeps every char
+    lying within the table bbox padded by CHAR_PADDING; the heavy per-row
+    char scans then see the table's chars instead of the whole page.
+    Only the chars are filtered: cropping the page would clip every
+    other object on it too, which costs more than the scans it saves.
+
+    Args:
+        page: pdfplumber page
+        bbox (tuple): The table's (x0, top, x1, bottom)
+        chars (list, optional): The page's chars, when already at hand
+    """
+    px0, ptop, px1, pbottom = page.bbox
+    x0, top, x1, bottom = bbox
+    x0, top = max(px0, x0 - CHAR_PADDING), max(ptop, top - CHAR_PADDING)
+    x1, bottom = min(px1, x1 + CHAR_PADDING), min(pbottom, bottom + CHAR_PADDING)
+    if chars is None:
+        chars = page.chars
+    return TableView([c for c in chars if c['x0'] >= x0 and c['x1'] <= x1
+                      and c['top'] >= top and c['bottom'] <= bottom])
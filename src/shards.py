@@ -0,0 +1,161 @@
+
+import math
+import time
+from src.extractor import extract_tables_from_pdf
+from src.fingerprint import collapse_duplicate_tables
+from src.packing import PackedTables
+from src.pdf_source import shared_pdf_map
+from src.stitching import stitch_continuations
+
+# Documents shorter than this run as a single task
+MIN_PAGES_TO_SHARD = 60
+# Target size of one page-range shard
+PAGES_PER_SHARD = 30
+
+
+def plan_shards(pdf_path, page_count, pages_per_shard=PAGES_PER_SHARD,
+                min_pages=MIN_PAGES_TO_SHARD, page_costs=None):
+    """
+    Split one document into page-range shards.
+
+    Small documents become a single shard covering every page. Large ones
+    are cut into roughly equal ranges of about `pages_per_shard` pages so
+    a pool can work on them side by side. With estimated page costs the
+    same number of shards is cut at equal estimated cost instead, so a
+    run of dense statement pages does not make one shard the straggler.
+
+    Args:
+        pdf_path (str): Path to the PDF file
+        page_count (int): Number of pages in the document
+        pages_per_shard (int): Target number of pages per shard
+        min_pages (int): Documents with fewer pages are not split
+        page_costs (list, optional): Estimated seconds of every page
+            (see src.estimate.estimate_document)
+
+    Returns:
+        list: Shard dicts with 'pdf_path', 'shard', 'shard_count'
+              and 'page_range' (1-based inclusive first/last page), and
+              'estimate' (seconds) when page costs were given
+    """
+    if page_count <= 0:
+        return []
+
+    if page_count < min_pages or pages_per_shard <= 0:
+        shard_count = 1
+    else:
+        shard_count = math.ceil(page_count / pages_per_shard)
+
+    if page_costs is not None and len(page_costs) == page_count:
+        ranges = _cost_ranges(page_costs, shard_count)
+    else:
+        # Spread pages evenly so the last shard is not a short straggler
+        base, extra = divmod(page_count, shard_count)
+        ranges = []
+        first = 1
+        for idx in range(shard_count):
+            size = base + (1 if idx < extra else 0)
+            ranges.append((first, first + size - 1))
+            first += size
+
+    shards = []
+    for idx, page_range in enumerate(ranges):
+        shard = {
+            'pdf_path': pdf_path,
+            'shard': idx,
+            'shard_count': shard_count,
+            'page_range': page_range,
+        }
+        if page_costs is not None and len(page_costs) == page_count:
+            shard['estimate'] = sum(page_costs[page_range[0] - 1:page_range[1]])
+        shards.append(shard)
+
+    return shards
+
+
+def _cost_ranges(page_costs, shard_count):
+    """Cut pages into `shard_count` non-empty ranges of about equal cost."""
+    total = sum(page_costs)
+    ranges = []
+    first = 1
+    spent = 0.0
+    for page_num, cost in enumerate(page_costs, start=1):
+        spent += cost
+        if len(ranges) == shard_count - 1:
+            break
+        # Every later shard still needs at least one page
+        pages_left = len(page_costs) - page_num
+        shards_left = shard_count - len(ranges) - 1
+        due = spent >= total * (len(ranges) + 1) / shard_count
+        if pages_left >= shards_left and (due or pages_left == shards_left):
+            ranges.append((first, page_num))
+            first = page_num + 1
+    ranges.append((first, len(page_costs)))
+    return ranges
+
+
+def extract_shard(shard):
+    """
+    Extract the tables of one shard.
+
+    Module-level so it can be sent to worker processes. The document is
+    read through this process's shared read-only mapping, so shards of
+    the same file never re-read it from disk.
+
+    A 'templates' entry on the shard is used as the layout template
+    store; templates learned on the way are added to it, so they travel
+    back to the parent with the returned shard. Page- and table-scoped
+    failures and extraction counts are returned the same way under
+    'errors' and 'stats'. A true 'borderless' entry also reads tables on
+    pages without rulings, a 'backend' entry picks the page parser and a
+    'deadline' entry (a `time.time()` value shared by the whole batch)
+    bounds the extraction time.
+
+    With a 'spill_dir' entry the tables are packed into a spill file in
+    that directory and returned as a PackedTables handle, so only the
+    handle is pickled back to the parent instead of every cell. The CPU
+    seconds spent are returned under 'cpu_seconds'.
+
+    Returns:
+        tuple: (shard, tables)
+    """
+    # Stitching runs once over the merged result so that tables
+    # continuing across a shard boundary are joined too
+    start = time.process_time()
+    shard['errors'] = []
+    shard['stats'] = {}
+    tables = extract_tables_from_pdf(shared_pdf_map(shard['pdf_path']),
+                                     page_range=shard['page_range'],
+                                     stitch=False,
+                                     stats=shard['stats'],
+                                     templates=shard.get('templates'),
+                                     errors=shard['errors'],
+                                     borderless=shard.get('borderless', False),
+                                     backend=shard.get('backend', 'pdfplumber'),
+                                     deadline=shard.get('deadline'))
+    if shard.get('spill_dir'):
+        tables = PackedTables(tables, shard['spill_dir'])
+    shard['cpu_seconds'] = time.process_time() - start
+    return shard, tables
+
+
+def merge_shard_results(results, collapse_duplicates=False):
+    """
+    Stitch partial shard results back into one table list in page order.
+
+    Tables that continue across pages (including across shard boundaries)
+    are merged into one logical table.
+
+    Args:
+        results (list): (shard, tables) tuples in any completion order;
+            tables may be PackedTables, read one table at a time
+        collapse_duplicates (bool): Keep only the first copy of tables
+            whose content repeats anywhere in the document
+
+    Returns:
+        list: Tables of the whole document, ordered by page
+    """
+    ordered = sorted(results, key=lambda r: r[0]['page_range'][0])
+    tables = stitch_continuations(t for _, tables in ordered for t in tables)
+    if collapse_duplicates:
+        tables = collapse_duplicate_tables(tables)
+    return list(tables)
@@ -0,0 +1,134 @@
+
+from src.numeric import is_numeric_text
+from src.table import CompactTable, as_compact
+
+# Maximum drift (points) between matching column x-positions
+COLUMN_X_TOLERANCE = 5
+# How many leading rows of a fragment may repeat the table header
+MAX_REPEATED_HEADER_ROWS = 4
+
+
+def _row_key(table, r):
+    """Normalized row content used to compare header rows."""
+    return tuple(table.text(r, c) for c in range(table.row_lengths[r]))
+
+
+def _looks_like_data_row(table, r):
+    """True when most non-empty cells after the label column are numbers."""
+    values = [v for v in table.row(r)[1:] if v]
+    if not values:
+        return False
+    numeric = sum(1 for v in values if is_numeric_text(v))
+    return numeric * 2 >= len(values)
+
+
+def _same_columns(open_xs, next_xs):
+    """Compare column x-positions; unknown positions never veto a match."""
+    if open_xs is None or next_xs is None:
+        return True
+    if len(open_xs) != len(next_xs):
+        return False
+    return all(abs(a - b) <= COLUMN_X_TOLERANCE for a, b in zip(open_xs, next_xs))
+
+
+def repeated_header_rows(open_table, fragment):
+    """
+    Count the leading rows of `fragment` that repeat the header of `open_table`.
+
+    Rows without any content are matched too, but at least one matching
+    row must carry text for the header to count as repeated.
+    """
+    limit = min(MAX_REPEATED_HEADER_ROWS, open_table.n_rows, fragment.n_rows)
+    count = 0
+    has_text = False
+    for i in range(limit):
+        key = _row_key(fragment, i)
+        if key != _row_key(open_table, i):
+            break
+        count += 1
+        has_text = has_text or any(key)
+    return count if has_text else 0
+
+
+def is_continuation(open_data, next_data):
+    """
+    Decide whether `next_data` continues the table in `open_data`.
+
+    A continuation starts the page right after the open table's last page,
+    has the same column count and x-positions, and either repeats the
+    header rows or starts directly with data rows.
+
+    Returns:
+        int or None: Number of repeated header rows to drop, or None when
+        `next_data` starts a new table
+    """
+    if next_data['page'] != open_data.get('page_end', open_data['page']) + 1:
+        return None
+    if next_data.get('index_on_page', 1) != 1:
+        return None
+
+    open_table = as_compact(open_data['table'])
+    fragment = as_compact(next_data['table'])
+    if not open_table or not fragment:
+        return None
+    if open_table.n_cols != fragment.n_cols:
+        return None
+    if not _same_columns(open_data.get('col_xs'), next_data.get('col_xs')):
+        return None
+
+    repeated = repeated_header_rows(open_table, fragment)
+    if repeated:
+        return repeated
+    if (_looks_like_data_row(fragment, 0)
+            and _looks_like_data_row(open_table, open_table.n_rows - 1)):
+        return 0
+    return None
+
+
+def stitch_continuations(tables):
+    """
+    Merge tables that continue across pages into one logical table.
+
+    Streaming stage: consumes an iterable of table dicts in page order and
+    yields merged tables, keeping only the currently open table in memory.
+    Repeated header rows of continuation fragments are dropped. Merged
+    tables keep the first fragment's 'page' and gain 'page_end'.
+
+    Args:
+        tables (iterable): Table dicts in page order
+
+    Yields:
+        dict: Table dicts with continuations merged
+    """
+    open_data = None
+    # Fragments of the open table, concatenated once when it is closed
+    pieces = []
+
+    for data in tables:
+        if open_data is not None:
+            skip = is_continuation(open_data, data)
+            if skip is not None:
+                fragment = as_compact(data['table'])
+                pieces.append(fragment.slice_rows(skip))
+                open_data['page_end'] = data['page']
+                if data.get('degraded'):
+                    # One cut-short fragment makes the whole table degraded
+                    steps = set(open_data.get('degraded') or ()) | set(data['degraded'])
+                    open_data['degraded'] = sorted(steps)
+                # Later fragments are compared against the header of the
+                # first one and the last row of the newest one
+                open_data['table'] = CompactTable.concat([pieces[0], pieces[-1]])
+                continue
+            yield _close(open_data, pieces)
+
+        # Copy so merging never mutates the caller's dicts
+        open_data = dict(data)
+        pieces = [as_compact(data['table'])]
+
+    if open_data is not None:
+        yield _close(open_data, pieces)
+
+
+def _close(open_data, pieces):
+    open_data['table'] = pieces[0] if len(pieces) == 1 else CompactTable.concat(pieces)
+    return open_data
@@ -1,5 +1,6 @@
 
 from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
+from openpyxl.styles.cell_style import StyleArray
 
 # Color scheme constants
 HEADER_BG_COLOR = '1F4E79'  # Dark blue
@@ -8,6 +9,9 @@ ROW_EVEN_COLOR = 'FFFFFF'    # White
 ROW_ODD_COLOR = 'F5F5F5'     # Light gray
 BORDER_COLOR = '000000'      # Black
 
+# Built once per process by shared_styles()
+_SHARED_STYLES = None
+
 def create_styles():
     """Create and return style objects for Excel formatting."""
     
@@ -71,3 +75,76 @@ def create_styles():
         'gray_fill': gray_fill,
         'border': thin_border
     }
+
+
+def shared_styles():
+    """
+    Style objects from create_styles(), built once per process.
+
+    The styles are only read while writing, so every workbook of a
+    process can use the same objects; a preloaded worker pool (see
+    src.pool) builds them before its workers are forked.
+    """
+    global _SHARED_STYLES
+    if _SHARED_STYLES is None:
+        _SHARED_STYLES = create_styles()
+    return _SHARED_STYLES
+
+
+def row_styles(styles):
+    """
+    The style objects of each row kind.
+
+    Args:
+        styles (dict): Style objects from create_styles()
+
+    Returns:
+        dict: {'header', 'data_gray', 'data_white'} -> {'font', 'fill',
+        'border', 'alignment'}
+    """
+    def kind(font, fill, alignment):
+        return {'font': font, 'fill': fill, 'border': styles['border'], 'alignment': alignment}
+
+    return {
+        'header': kind(styles['header_font'], styles['header_fill'], styles['header_alignment']),
+        'data_gray': kind(styles['cell_font'], styles['gray_fill'], styles['cell_alignment']),
+        'data_white': kind(styles['cell_font'], styles['white_fill'], styles['cell_alignment']),
+    }
+
+
+def create_style_pool(wb, styles):
+    """
+    Register each row kind's combined style with the workbook once.
+
+    Assigning cell.font/.fill/... hashes the style object and looks it
+    up in the workbook's style tables on every assignment. Here each
+    combination is resolved to its style IDs up front, so cells only
+    receive a copy of a ready StyleArray (via cell._style).
+
+    The style tables are openpyxl internals (tested with openpyxl 3.1).
+    A workbook without them gets no pool; its cells are then styled
+    through the public attributes (see row_styles).
+
+    Args:
+        wb: openpyxl Workbook the cells belong to
+        styles (dict): Style objects from create_styles()
+
+    Returns:
+        dict or None: {'header', 'data_gray', 'data_white'} -> StyleArray,
+        or None when the workbook has no style tables to register with
+    """
+    tables = [getattr(wb, name, None)
+              for name in ('_fonts', '_fills', '_borders', '_alignments', '_number_formats')]
+    if not all(hasattr(table, 'add') for table in tables):
+        return None
+    fonts, fills, borders, alignments, _ = tables
+
+    def combine(kind):
+        style = StyleArray()
+        style.fontId = fonts.add(kind['font'])
+        style.fillId = fills.add(kind['fill'])
+        style.borderId = borders.add(kind['border'])
+        style.alignmentId = alignments.add(kind['alignment'])
+        return style
+
+    return {name: combine(kind) for name, kind in row_styles(styles).items()}
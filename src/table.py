@@ -0,0 +1,171 @@
+
+import sys
+from src.numeric import is_numeric_text, type_column
+
+
+def _clean(cell):
+    """Strip and intern one raw cell value; None stays None."""
+    if cell is None:
+        return None
+    s = cell.strip() if isinstance(cell, str) else str(cell).strip()
+    return sys.intern(s)
+
+
+class CompactTable:
+    """
+    Compact, column-major table passed from the extractor to the writer.
+
+    Cells are stripped and interned once on construction, so the
+    heuristics and the writer never re-run `str(cell).strip()`. None
+    (no cell) and '' (empty cell) are kept apart, and the original row
+    lengths are remembered so ragged rows round-trip unchanged.
+
+    Rows can still be read like the old list-of-lists representation
+    (`table[i][j]`, `len(table)`, `for row in table`). Per-column stats
+    are computed lazily and cached.
+    """
+
+    __slots__ = ('n_rows', 'n_cols', 'columns', 'row_lengths',
+                 '_col_widths', '_numeric_ratios', '_typed', '_row_masks')
+
+    def __init__(self, columns, row_lengths):
+        self.columns = columns
+        self.row_lengths = row_lengths
+        self.n_rows = len(row_lengths)
+        self.n_cols = len(columns)
+        self._col_widths = None
+        self._numeric_ratios = None
+        self._typed = {}
+        self._row_masks = {}
+
+    @classmethod
+    def from_rows(cls, rows):
+        """Build a CompactTable from a list of rows of raw cell values."""
+        rows = [r or () for r in rows or ()]
+        row_lengths = tuple(len(r) for r in rows)
+        n_cols = max(row_lengths, default=0)
+        columns = []
+        for c in range(n_cols):
+            columns.append(tuple(_clean(r[c]) if c < len(r) else None for r in rows))
+        return cls(columns, row_lengths)
+
+    @classmethod
+    def concat(cls, tables):
+        """Stack several tables vertically into a new CompactTable."""
+        tables = [t for t in tables if t.n_rows]
+        n_cols = max((t.n_cols for t in tables), default=0)
+        columns = []
+        for c in range(n_cols):
+            col = []
+            for t in tables:
+                col.extend(t.columns[c] if c < t.n_cols else (None,) * t.n_rows)
+            columns.append(tuple(col))
+        row_lengths = tuple(n for t in tables for n in t.row_lengths)
+        return cls(columns, row_lengths)
+
+    # ── Row access ───────────────────────────────────────────────
+
+    def __len__(self):
+        return self.n_rows
+
+    def __bool__(self):
+        return self.n_rows > 0
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.row(i) for i in range(*index.indices(self.n_rows))]
+        if index < 0:
+            index += self.n_rows
+        return self.row(index)
+
+    def __iter__(self):
+        for r in range(self.n_rows):
+            yield self.row(r)
+
+    def __eq__(self, other):
+        if isinstance(other, CompactTable):
+            return self.row_lengths == other.row_lengths and self.columns == other.columns
+        return NotImplemented
+
+    def __repr__(self):
+        return f"CompactTable({self.n_rows} rows × {self.n_cols} cols)"
+
+    def row(self, r):
+        """Return row `r` as a tuple of its original length."""
+        if r < 0 or r >= self.n_rows:
+            raise IndexError('row index out of range')
+        return tuple(self.columns[c][r] for c in range(self.row_lengths[r]))
+
+    def slice_rows(self, start, stop=None):
+        """Return a new CompactTable holding rows [start:stop]."""
+        return CompactTable([col[start:stop] for col in self.columns],
+                            self.row_lengths[start:stop])
+
+    def text(self, r, c):
+        """Stripped text of a cell; '' for None or out-of-range cells."""
+        if c >= self.n_cols or r >= self.n_rows:
+            return ''
+        return self.columns[c][r] or ''
+
+    def row_mask(self, r):
+        """
+        Occupancy bitmap of row `r`: bit c is set when cell (r, c) has text.
+
+        Cached, so header analysis can combine rows with bitwise
+        operations instead of re-reading cells.
+        """
+        mask = self._row_masks.get(r)
+        if mask is None:
+            mask = 0
+            for c in range(self.row_lengths[r]):
+                if self.columns[c][r]:
+                    mask |= 1 << c
+            self._row_masks[r] = mask
+        return mask
+
+    def to_rows(self):
+        """Return the table as a list of lists."""
+        return [list(row) for row in self]
+
+    # ── Cached column stats ──────────────────────────────────────
+
+    def col_width(self, c):
+        """Longest cell text in column `c` (newlines count as one char)."""
+        if self._col_widths is None:
+            self._col_widths = tuple(
+                max((len(v) for v in col if v), default=0) for col in self.columns)
+        return self._col_widths[c] if c < self.n_cols else 0
+
+    def numeric_ratio(self, c):
+        """Share of non-empty cells in column `c` that look numeric."""
+        if self._numeric_ratios is None:
+            ratios = []
+            for col in self.columns:
+                values = [v for v in col if v]
+                numeric = sum(1 for v in values if is_numeric_text(v))
+                ratios.append(numeric / len(values) if values else 0.0)
+            self._numeric_ratios = tuple(ratios)
+        return self._numeric_ratios[c] if c < self.n_cols else 0.0
+
+    def typed_column(self, c, dash='zero'):
+        """
+        Return column `c` with accounting-format numbers parsed once.
+
+        Columns without any numeric cells are returned untyped without
+        parsing. See src.numeric.type_column for the result layout.
+        """
+        key = (c, dash)
+        if key not in self._typed:
+            column = self.columns[c]
+            if self.numeric_ratio(c) == 0.0:
+                self._typed[key] = (column, (None,) * self.n_rows)
+            else:
+                self._typed[key] = type_column(column, dash)
+        return self._typed[key]
+
+
+def as_compact(table):
+    """Return `table` as a CompactTable, converting lists of rows if needed."""
+    if isinstance(table, CompactTable):
+        return table
+    return CompactTable.from_rows(table)
@@ -0,0 +1,89 @@
+
+import hashlib
+import json
+import os
+
+# Bump when the stored template layout changes; older stores are ignored
+TEMPLATE_VERSION = 1
+# Ruling geometry is rounded to this many points before hashing
+LAYOUT_PRECISION = 0
+# Pages with fewer ruling objects have no recognizable layout
+MIN_LAYOUT_EDGES = 4
+
+
+def layout_fingerprint(page):
+    """
+    Fingerprint of a page's ruling geometry (rects and lines), ignoring text.
+
+    Recurring filings keep the same ruled layout from one quarter to the
+    next while the figures change, so this key matches the same page of
+    later documents.
+
+    Returns:
+        str or None: Hex digest, or None when the page has too few
+        rulings to tell its layout apart from other pages
+    """
+    edges = sorted(
+        (round(o['x0'], LAYOUT_PRECISION), round(o['top'], LAYOUT_PRECISION),
+         round(o['x1'], LAYOUT_PRECISION), round(o['bottom'], LAYOUT_PRECISION))
+        for o in page.rects + page.lines)
+    if len(edges) < MIN_LAYOUT_EDGES:
+        return None
+    h = hashlib.blake2b(digest_size=16)
+    h.update(repr((round(page.width), round(page.height), edges)).encode('utf-8'))
+    return h.hexdigest()
+
+
+def make_template(page_tables):
+    """
+    Template of a page whose tables were all built from word positions.
+
+    Only those pages are worth caching: their resolved table bboxes and
+    column centers replace table finding, merged-column scoring and
+    column clustering on a matching page. Pages with ruled tables still
+    need table finding to fill their cells and get no template.
+
+    Args:
+        page_tables (list): Result of extract_page_tables for the page
+
+    Returns:
+        dict or None: {'tables': [{'bbox', 'col_centers'}, ...]}
+    """
+    if not page_tables or any(t.get('col_centers') is None for t in page_tables):
+        return None
+    return {'tables': [{'bbox': list(t['bbox']), 'col_centers': list(t['col_centers'])}
+                       for t in page_tables]}
+
+
+def load_templates(path):
+    """
+    Load a template store from disk.
+
+    A missing, unreadable or outdated store yields an empty one, since
+    templates are only a cache.
+
+    Returns:
+        dict: layout fingerprint -> template
+    """
+    if not path or not os.path.exists(path):
+        return {}
+    try:
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Warning: ignoring unreadable template store {path}: {e}")
+        return {}
+    if data.get('version') != TEMPLATE_VERSION:
+        return {}
+    return data.get('templates', {})
+
+
+def save_templates(path, templates):
+    """Write a template store to disk atomically."""
+    output_dir = os.path.dirname(path)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({'version': TEMPLATE_VERSION, 'templates': templates}, f)
+    os.replace(tmp_path, path)
@@ -0,0 +1,322 @@
+
+import json
+import os
+import pickle
+import shutil
+import socket
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+# A claim not renewed for this long is taken to be abandoned. Keep it
+# well above the attribute cache time of the shared mount (NFS caches
+# mtimes for a few seconds) and above any pause between heartbeats.
+LEASE_SECONDS = 60
+# A task abandoned this many times (e.g. it keeps crashing its node)
+# is moved to failed/ instead of being handed out again
+MAX_ATTEMPTS = 3
+# Idle nodes look for claimable or abandoned work this often
+POLL_SECONDS = 1.0
+
+_STATES = ('pending', 'claimed', 'done', 'failed', 'results', 'output', 'tmp')
+
+
+def default_node_name():
+    """Name of this process in the queue: host name and process id."""
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+class WorkQueue:
+    """
+    Task queue kept in a directory shared by every node (e.g. over NFS).
+
+    There is no broker: every transition is a rename() within the queue
+    directory, which is atomic on a local file system and on NFS, so of
+    several nodes racing for the same file exactly one wins and the
+    others get FileNotFoundError. A task lives in one subdirectory at a
+    time, with its attempt number (and owner) in the file name:
+
+        pending/<id>~<attempt>            waiting to be claimed
+        claimed/<id>~<attempt>~<node>     held by <node> under a lease
+        done/<id>~<attempt>               finished; result in results/
+        failed/<id>~<attempt>             abandoned MAX_ATTEMPTS times
+
+    Files a handler produces besides its result (e.g. spill files) go in
+    the claim's own directory, output/<id>~<attempt>. It is removed with
+    the claim when the lease is lost or expires, so the output of a node
+    that died does not pile up, and with the result once a consuming
+    task has read it (see put).
+
+    The lease is the mtime of the claimed file. Its owner renews it with
+    heartbeats; once it is older than the lease, any node puts the task
+    back in pending/ with the next attempt number. A task is only
+    completed by renaming the owner's own claimed file, so a node that
+    lost its lease (it stalled, or was cut off from the mount) cannot
+    complete it next to the node that took it over.
+
+    Ages are measured against the mtime of a file this node touches on
+    the shared mount, i.e. against the file server's clock, so nodes
+    with skewed clocks still agree on expired leases.
+
+    Task definitions are JSON files; results are pickled, so every node
+    must run the same version of the code.
+    """
+
+    def __init__(self, root, node=None, lease_seconds=LEASE_SECONDS):
+        self.root = root
+        self.node = node or default_node_name()
+        self.lease_seconds = lease_seconds
+        for state in _STATES:
+            os.makedirs(os.path.join(root, state), exist_ok=True)
+        # Parsed task files by file name; a task file never changes
+        self._tasks = {}
+
+    def _path(self, state, name):
+        return os.path.join(self.root, state, name)
+
+    def _names(self, state):
+        return sorted(os.listdir(os.path.join(self.root, state)))
+
+    def _ids(self, state):
+        return {name.split('~')[0] for name in self._names(state)}
+
+    def _write_new(self, state, name, data):
+        """Write a file under a temporary name, then rename it into place."""
+        fd, tmp = tempfile.mkstemp(dir=os.path.join(self.root, 'tmp'), prefix=self.node)
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.rename(tmp, self._path(state, name))
+
+    def _now(self):
+        """Current time of the file server holding the queue."""
+        clock = os.path.join(self.root, 'tmp', f"clock-{self.node}")
+        with open(clock, 'a'):
+            pass
+        os.utime(clock)
+        return os.stat(clock).st_mtime
+
+    def put(self, task_id, task, after=(), consumes=False):
+        """
+        Add a task.
+
+        Args:
+            task_id (str): Unique id; must not contain '~'
+            task (dict): JSON-serializable task definition
+            after (iterable): Ids of tasks that must be finished (done
+                or failed) before this one can be claimed
+            consumes (bool): This task is the only reader of the results
+                of the `after` tasks; they are deleted, output included,
+                once it completes
+        """
+        if '~' in task_id:
+            raise ValueError(f"Task id must not contain '~': {task_id}")
+        entry = {'id': task_id, 'after': list(after), 'consumes': consumes, 'task': task}
+        self._write_new('pending', f"{task_id}~0", json.dumps(entry).encode('utf-8'))
+
+    def _task(self, state, name):
+        if name not in self._tasks:
+            with open(self._path(state, name), encoding='utf-8') as f:
+                self._tasks[name] = json.load(f)
+        return self._tasks[name]
+
+    def claim(self):
+        """
+        Take the next task whose prerequisites are finished.
+
+        Returns:
+            dict or None: The claim ({'id', 'attempt', 'task', 'path'}),
+            or None when nothing can be claimed right now
+        """
+        finished = None
+        for name in self._names('pending'):
+            try:
+                entry = self._task('pending', name)
+            except FileNotFoundError:
+                continue  # claimed by another node meanwhile
+            if entry['after']:
+                if finished is None:
+                    finished = self._ids('done') | self._ids('failed')
+                if not finished.issuperset(entry['after']):
+                    continue
+            path = self._path('claimed', f"{name}~{self.node}")
+            try:
+                os.rename(self._path('pending', name), path)
+            except FileNotFoundError:
+                continue  # another node won the race
+            # A rename keeps the mtime of the pending file; start the lease now
+            os.utime(path)
+            self._tasks.pop(name, None)
+            return {'id': entry['id'], 'attempt': int(name.split('~')[1]),
+                    'task': entry['task'], 'path': path,
+                    'consumed': entry['after'] if entry.get('consumes') else []}
+        return None
+
+    def heartbeat(self, claim):
+        """Renew the lease of a claim; False once it has been lost."""
+        try:
+            os.utime(claim['path'])
+            return True
+        except FileNotFoundError:
+            return False
+
+    @contextmanager
+    def holding(self, claim):
+        """Keep renewing the lease of a claim from a background thread."""
+        stop = threading.Event()
+
+        def renew():
+            while not stop.wait(self.lease_seconds / 4):
+                if not self.heartbeat(claim):
+                    return
+
+        thread = threading.Thread(target=renew, daemon=True)
+        thread.start()
+        try:
+            yield claim
+        finally:
+            stop.set()
+            thread.join()
+
+    def output_dir(self, claim):
+        """Directory for the files a claim produces; created on demand."""
+        path = self._path('output', f"{claim['id']}~{claim['attempt']}")
+        os.makedirs(path, exist_ok=True)
+        return path
+
+    def complete(self, claim, result):
+        """
+        Store the result of a claimed task and mark it done.
+
+        The results of the tasks it consumes are deleted afterwards.
+
+        Returns:
+            bool: False when the lease was lost; the result and output
+            are then dropped, as the task belongs to another node now
+        """
+        name = f"{claim['id']}~{claim['attempt']}"
+        self._write_new('results', name, pickle.dumps(result, pickle.HIGHEST_PROTOCOL))
+        try:
+            os.rename(claim['path'], self._path('done', name))
+        except FileNotFoundError:
+            os.remove(self._path('results', name))
+            shutil.rmtree(self._path('output', name), ignore_errors=True)
+            return False
+        for task_id in claim.get('consumed', ()):
+            self.forget(task_id)
+        return True
+
+    def _done_name(self, task_id):
+        for name in self._names('done'):
+            if name.split('~')[0] == task_id:
+                return name
+        raise KeyError(task_id)
+
+    def result(self, task_id):
+        """
+        Result of a finished task.
+
+        Raises:
+            KeyError: The task is not done (pending, running or failed),
+                or its result was consumed already
+        """
+        try:
+            with open(self._path('results', self._done_name(task_id)), 'rb') as f:
+                return pickle.load(f)
+        except FileNotFoundError:
+            raise KeyError(task_id) from None
+
+    def result_dir(self, task_id):
+        """Output directory of a finished task (see output_dir)."""
+        return self._path('output', self._done_name(task_id))
+
+    def forget(self, task_id):
+        """Delete the result and output of a finished task, if any."""
+        try:
+            name = self._done_name(task_id)
+        except KeyError:
+            return  # failed, or never finished
+        try:
+            os.remove(self._path('results', name))
+        except FileNotFoundError:
+            pass
+        shutil.rmtree(self._path('output', name), ignore_errors=True)
+
+    def recover(self):
+        """
+        Put tasks whose lease expired back in the queue.
+
+        Returns:
+            list: Ids of the tasks recovered (or failed for good)
+        """
+        now = self._now()
+        recovered = []
+        for name in self._names('claimed'):
+            try:
+                age = now - os.stat(self._path('claimed', name)).st_mtime
+            except FileNotFoundError:
+                continue  # completed meanwhile
+            if age <= self.lease_seconds:
+                continue
+            task_id, attempt, _ = name.split('~', 2)
+            output = self._path('output', f"{task_id}~{attempt}")
+            attempt = int(attempt) + 1
+            if attempt >= MAX_ATTEMPTS:
+                target = self._path('failed', f"{task_id}~{attempt}")
+            else:
+                target = self._path('pending', f"{task_id}~{attempt}")
+            try:
+                os.rename(self._path('claimed', name), target)
+            except FileNotFoundError:
+                continue  # completed, or recovered by another node
+            # Whatever the abandoned claim produced is not needed any more
+            shutil.rmtree(output, ignore_errors=True)
+            print(f"  Recovered {task_id} abandoned by {name.split('~', 2)[2]} "
+                  f"({age:.0f}s without heartbeat)")
+            recovered.append(task_id)
+        return recovered
+
+    def status(self):
+        """Number of tasks in each state."""
+        return {state: len(self._names(state))
+                for state in ('pending', 'claimed', 'done', 'failed')}
+
+    def finished(self):
+        """Whether no task is pending or held any more."""
+        return not self._names('pending') and not self._names('claimed')
+
+    def run(self, handler, poll_seconds=POLL_SECONDS):
+        """
+        Work on tasks until the queue is finished.
+
+        Claims a task, calls `handler(task, queue, claim)` under a
+        renewed lease and stores what it returns as the task's result.
+        An exception from the handler is stored as the result too (it
+        would fail the same way on any node). Abandoned claims are
+        recovered before every claim, so they go back into line ahead
+        of later tasks.
+
+        Returns:
+            int: Number of tasks this node completed
+        """
+        completed = 0
+        while True:
+            self.recover()
+            claim = self.claim()
+            if claim is None:
+                if self.finished():
+                    return completed
+                time.sleep(poll_seconds)
+                continue
+            with self.holding(claim):
+                try:
+                    result = handler(claim['task'], self, claim)
+                except Exception as e:
+                    result = e
+            if isinstance(result, Exception):
+                try:
+                    pickle.dumps(result)
+                except Exception:
+                    result = RuntimeError(f"{type(result).__name__}: {result}")
+            if self.complete(claim, result):
+                completed += 1
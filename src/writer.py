@@ -1,18 +1,32 @@
 
+import json
 import os
-import sys
+from concurrent.futures import ProcessPoolExecutor
+from copy import copy
 from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles.numbers import BUILTIN_FORMATS_MAX_SIZE, BUILTIN_FORMATS_REVERSE
 from openpyxl.utils import get_column_letter
-from src.styles import create_styles
+from openpyxl.worksheet.cell_range import CellRange
+from src.errors import record_error
+from src.styles import create_style_pool, row_styles, shared_styles
+from src.table import as_compact
 
 
-def analyze_column_structure(table):
+def analyze_column_structure(table, header=None):
     """
     Analyze table structure to detect hierarchical/merged column headers.
     
-    Detects when a header cell spans multiple columns by looking for cells
-    with content that have empty neighbors in the same row but content in
-    subsequent rows below those empty cells.
+    When the extractor tagged the header from font metadata (`header`),
+    its row count is used as is, together with its spanning cells when
+    it found any. Otherwise header rows and spans are guessed from
+    content: a cell with content spans its empty neighbors in the same
+    row when the rows below have content under those empty cells.
+    
+    Args:
+        table: CompactTable or list of rows
+        header (dict, optional): {'rows': int, 'spans': [(row, start_col,
+            end_col), ...]} with 0-based inclusive spans
     
     Returns:
         dict: {
@@ -20,7 +34,27 @@ def analyze_column_structure(table):
             'column_groups': list of dicts with row, start_col, end_col, label
         }
     """
-    if not table or len(table) < 2:
+    table = as_compact(table)
+    if header and header.get('rows'):
+        result = _analyze_content(table) if not header.get('spans') else {'column_groups': []}
+        result['header_rows'] = header['rows']
+        for row, start, end in header.get('spans') or ():
+            result['column_groups'].append({
+                'row': row + 1,
+                'start_col': start + 1,
+                'end_col': end + 1,
+                'label': table.text(row, start)
+            })
+        # Content-guessed groups only count inside the tagged header
+        result['column_groups'] = [g for g in result['column_groups']
+                                   if g['row'] <= header['rows']]
+        return result
+    return _analyze_content(table)
+
+
+def _analyze_content(table):
+    """Guess header rows and spans from the empty-cell pattern of the first rows."""
+    if table.n_rows < 2:
         return {'header_rows': 1, 'column_groups': []}
     
     result = {
@@ -28,45 +62,30 @@ def analyze_column_structure(table):
         'column_groups': []
     }
     
-    # Analyze first 3 rows for header patterns
-    max_analysis_rows = min(3, len(table))
+    # Analyze first 3 rows for header patterns. Each row is reduced to an
+    # occupancy bitmap once, so spans come from bit tests instead of
+    # re-reading the rows below for every empty cell.
+    max_analysis_rows = min(3, table.n_rows)
     
     for row_idx in range(max_analysis_rows):
-        row = table[row_idx]
-        if not row:
+        row_len = table.row_lengths[row_idx]
+        if not row_len:
             continue
         
+        here = table.row_mask(row_idx)
+        below = 0
+        for below_row_idx in range(row_idx + 1, min(row_idx + 3, table.n_rows)):
+            below |= table.row_mask(below_row_idx)
+        # Cells a header can span: empty in this row, content below
+        spannable = below & ~here
+        
         col_idx = 0
-        while col_idx < len(row):
-            cell_value = str(row[col_idx]).strip() if row[col_idx] else ''
-            
-            if cell_value:
-                # Check if this cell spans multiple columns by looking ahead
-                span = 1
+        while col_idx < row_len:
+            if here >> col_idx & 1:
                 next_col = col_idx + 1
-                
-                while next_col < len(row):
-                    next_cell_value = str(row[next_col]).strip() if row[next_col] else ''
-                    
-                    if not next_cell_value:  # Empty in current row
-                        # Check if there's content in rows below this empty cell
-                        has_below_content = False
-                        for below_row_idx in range(row_idx + 1, min(row_idx + 3, len(table))):
-                            if below_row_idx < len(table):
-                                below_row = table[below_row_idx]
-                                if next_col < len(below_row) and below_row[next_col]:
-                                    below_val = str(below_row[next_col]).strip()
-                                    if below_val:
-                                        has_below_content = True
-                                        break
-                        
-                        if has_below_content:
-                            span += 1
-                            next_col += 1
-                        else:
-                            break
-                    else:
-                        break
+                while next_col < row_len and spannable >> next_col & 1:
+                    next_col += 1
+                span = next_col - col_idx
                 
                 if span > 1:
                     # This is a merged header spanning multiple columns
@@ -74,7 +93,7 @@ def analyze_column_structure(table):
                         'row': row_idx + 1,  # 1-based for Excel
                         'start_col': col_idx + 1,
                         'end_col': col_idx + span,
-                        'label': cell_value
+                        'label': table.text(row_idx, col_idx)
                     })
                     # Update header row count
                     result['header_rows'] = max(result['header_rows'], row_idx + 2)
@@ -89,132 +108,345 @@ def analyze_column_structure(table):
     return result
 
 
-def create_excel_from_tables(tables, output_path):
+def _number_format_id(wb, number_format):
+    """Style id of a number format, registered with the workbook if custom."""
+    if number_format in BUILTIN_FORMATS_REVERSE:
+        return BUILTIN_FORMATS_REVERSE[number_format]
+    return wb._number_formats.add(number_format) + BUILTIN_FORMATS_MAX_SIZE
+
+
+def write_table_sheet(ws, table_data, styles, typed=True, dash='zero'):
+    """
+    Write one extracted table into a worksheet with headers and styling.
+
+    The worksheet is a write-only one: the styled rows of the table are
+    built first and then appended, so a table that fails to write leaves
+    the sheet empty, and written rows are streamed to disk instead of
+    staying in memory until the workbook is saved.
+
+    Args:
+        ws: The empty openpyxl write-only worksheet to fill
+        table_data (dict): Table with metadata (see src.extractor)
+        styles (dict): Styles from src.styles.create_styles
+        typed (bool): Write data-row numbers as native Excel numbers
+        dash (str): How typed cells treat a lone dash
+
+    Returns:
+        str: One-line summary of the written sheet
+    """
+    table = as_compact(table_data['table'])
+    page_num = table_data['page']
+    
+    # Analyze column structure for merged headers
+    structure = analyze_column_structure(table, table_data.get('header'))
+    header_rows = structure['header_rows']
+    column_groups = structure['column_groups']
+    
+    # The written area ends at the last row and column holding a value
+    max_row = max_col = 1
+    for col_idx, column in enumerate(table.columns, start=1):
+        for row_idx, cell_value in enumerate(column, start=1):
+            if cell_value is not None:
+                max_row = max(max_row, row_idx)
+                max_col = max(max_col, col_idx)
+    
+    # Cells are already stripped. Header rows always stay text; data
+    # rows use the typed column values.
+    columns = []
+    for c in range(max_col):
+        column = table.columns[c] if c < table.n_cols else ()
+        if typed and c < table.n_cols:
+            values, formats = table.typed_column(c, dash)
+        else:
+            values, formats = column, None
+        columns.append((column, values, formats))
+    
+    # Styling comes from pooled style arrays. Each (row kind, number
+    # format) combination is resolved once; typed cells get the number
+    # format they are written with. Without a pool, cells are styled
+    # one attribute at a time.
+    pool = create_style_pool(ws.parent, styles)
+    kinds = row_styles(styles) if pool is None else None
+    variants = {}
+    rows = []
+    for row in range(max_row):
+        # Header rows, then alternating row colors for data rows
+        if row < header_rows:
+            kind = 'header'
+        elif (row + 1 - header_rows) % 2 == 0:
+            kind = 'data_gray'
+        else:
+            kind = 'data_white'
+        cells = []
+        for column, values, formats in columns:
+            value = column[row] if row < len(column) else None
+            number_format = None
+            if formats and row >= header_rows and value is not None and formats[row]:
+                value, number_format = values[row], formats[row]
+            cell = WriteOnlyCell(ws, value=value)
+            if pool is None:
+                for name, style in kinds[kind].items():
+                    setattr(cell, name, style)
+                if number_format:
+                    cell.number_format = number_format
+                cells.append(cell)
+                continue
+            style = variants.get((kind, number_format))
+            if style is None:
+                style = variants[(kind, number_format)] = copy(pool[kind])
+                if number_format:
+                    style.numFmtId = _number_format_id(ws.parent, number_format)
+            cell._style = copy(style)
+            cells.append(cell)
+        rows.append(cells)
+    
+    # Merged cells for grouped column headers
+    for group in column_groups:
+        try:
+            ws.merged_cells.add(CellRange(
+                min_row=group['row'], min_col=group['start_col'],
+                max_row=group['row'], max_col=group['end_col']))
+        except Exception:
+            pass  # Skip invalid merges
+    
+    # Auto-adjust column widths from the table's cached column stats
+    for col in range(1, max_col + 1):
+        column_letter = get_column_letter(col)
+        max_length = table.col_width(col - 1)
+        
+        adjusted_width = min(max_length + 2, 50)
+        adjusted_width = max(adjusted_width, 10)
+        ws.column_dimensions[column_letter].width = adjusted_width
+    
+    # Freeze header rows
+    if max_row > header_rows:
+        ws.freeze_panes = f'A{header_rows + 1}'
+    
+    for cells in rows:
+        ws.append(cells)
+    
+    merged_info = f", {len(column_groups)} merged group(s)" if column_groups else ""
+    if table_data.get('duplicate_pages'):
+        merged_info += f", repeated on page(s) {', '.join(map(str, table_data['duplicate_pages']))}"
+    page_info = f"pages {page_num}-{table_data['page_end']}" if table_data.get('page_end') else f"page {page_num}"
+    return f"{max_row} rows × {max_col} columns (from {page_info}){merged_info}"
+
+
+def _discard_sheets(wb):
+    """Close the write-only sheets of an unsaved workbook and delete their temp files."""
+    for ws in wb.worksheets:
+        if not ws.closed:
+            ws.close()
+            ws._writer.cleanup()
+
+
+def create_excel_from_tables(tables, output_path, typed=True, dash='zero', errors=None,
+                             first_sheet=1, sheets=None):
     """
     Create an Excel workbook from extracted tables with merged column support.
     
     Args:
         tables (list): List of tables with metadata
         output_path (str): Path to save the Excel file
+        typed (bool): Write accounting-format numbers in data rows as native
+            Excel numbers with a matching number format (see src.numeric)
+        dash (str): How typed cells treat a lone dash: 'zero' (shown as
+            '-'), 'null' (empty cell) or 'text'
+        errors (list, optional): Receives a structured record for every
+            table that could not be written (see src.errors.record_error)
+        first_sheet (int): Number of the first 'Table_N' sheet, so the
+            parts of a sharded output keep document-wide sheet names
+        sheets (list, optional): Receives {'sheet', 'page', 'page_end'}
+            for every written sheet
         
     Returns:
         str: Path to the created Excel file
+
+    Raises:
+        ValueError: No table could be written
+        PermissionError: The output file is locked (e.g. open in Excel)
+        OSError: The workbook could not be saved
     """
     print(f"\nCreating Excel workbook with smart merged column detection...")
     
-    # Create workbook and remove default sheet
-    wb = Workbook()
-    wb.remove(wb.active)
+    # Write-only workbook: each sheet's rows go to a temporary file as
+    # they are written, so a long table stream (e.g. from the journal)
+    # is never held in memory as a whole
+    wb = Workbook(write_only=True)
     
     # Get styles
-    styles = create_styles()
+    styles = shared_styles()
+    written = 0
+    # (worksheet, 'duplicate_pages' list) of collapsed tables; the lists
+    # may still grow while later tables stream in, so they are noted in
+    # the sheets just before saving
+    repeats = []
     
-    # Process each table
-    for table_idx, table_data in enumerate(tables, start=1):
-        table = table_data['table']
-        page_num = table_data['page']
-        
-        # Create sheet name
+    # Process each table; a table that fails to write is left out and
+    # recorded, the rest of the workbook is still saved
+    for table_idx, table_data in enumerate(tables, start=first_sheet):
         sheet_name = f'Table_{table_idx}'
         ws = wb.create_sheet(title=sheet_name)
-        
-        # Analyze column structure for merged headers
-        structure = analyze_column_structure(table)
-        header_rows = structure['header_rows']
-        column_groups = structure['column_groups']
-        
-        # Write table data
-        if table:
-            for row_idx, row in enumerate(table, start=1):
-                for col_idx, cell_value in enumerate(row, start=1):
-                    if cell_value is not None:
-                        if isinstance(cell_value, str):
-                            cell_value = cell_value.strip()
-                        ws.cell(row=row_idx, column=col_idx, value=cell_value)
-        
-        # Apply formatting
-        max_row = ws.max_row
-        max_col = ws.max_column
-        
-        # Apply merged cells for grouped column headers
-        for group in column_groups:
-            try:
-                ws.merge_cells(
-                    start_row=group['row'],
-                    start_column=group['start_col'],
-                    end_row=group['row'],
-                    end_column=group['end_col']
-                )
-            except Exception:
-                pass  # Skip invalid merges (e.g. overlapping ranges)
-        
-        # Apply styling
-        for row in range(1, max_row + 1):
-            for col in range(1, max_col + 1):
-                cell = ws.cell(row=row, column=col)
-                
-                # Apply basic styles
-                cell.font = styles['cell_font']
-                cell.alignment = styles['cell_alignment']
-                cell.border = styles['border']
-                
-                # Header row styling
-                if row <= header_rows:
-                    cell.font = styles['header_font']
-                    cell.fill = styles['header_fill']
-                    cell.alignment = styles['header_alignment']
-                # Alternating row colors for data rows
-                elif (row - header_rows) % 2 == 0:
-                    cell.fill = styles['gray_fill']
-                else:
-                    cell.fill = styles['white_fill']
-        
-        # Auto-adjust column widths
-        for col in range(1, max_col + 1):
-            column_letter = get_column_letter(col)
-            max_length = 0
-            
-            for row in range(1, max_row + 1):
-                cell = ws.cell(row=row, column=col)
-                try:
-                    if cell.value:
-                        cell_str = str(cell.value).replace('\n', ' ')
-                        max_length = max(max_length, len(cell_str))
-                except Exception:
-                    pass
-            
-            adjusted_width = min(max_length + 2, 50)
-            adjusted_width = max(adjusted_width, 10)
-            ws.column_dimensions[column_letter].width = adjusted_width
-        
-        # Freeze header rows
-        if max_row > header_rows:
-            ws.freeze_panes = f'A{header_rows + 1}'
-        
-        merged_info = f", {len(column_groups)} merged group(s)" if column_groups else ""
-        print(f"  Created {sheet_name}: {max_row} rows × {max_col} columns (from page {page_num}){merged_info}")
+        try:
+            summary = write_table_sheet(ws, table_data, styles, typed, dash)
+        except Exception as e:
+            wb.remove(ws)
+            record_error(errors, 'write', e, page=table_data.get('page'), sheet=sheet_name)
+            continue
+        written += 1
+        if 'duplicate_pages' in table_data:
+            repeats.append((ws, table_data['duplicate_pages']))
+        print(f"  Created {sheet_name}: {summary}")
+        if sheets is not None:
+            sheets.append({'sheet': sheet_name, 'page': table_data['page'],
+                           'page_end': table_data.get('page_end') or table_data['page']})
     
-    # Ensure output directory exists
-    output_dir = os.path.dirname(output_path)
-    if output_dir and not os.path.exists(output_dir):
-        os.makedirs(output_dir)
+    if not written:
+        raise ValueError("No table could be written to the workbook")
+    
+    for ws, pages in repeats:
+        if pages:
+            # Footer below the table, after one blank row
+            ws.append([])
+            ws.append([f"Repeated on page(s) {', '.join(map(str, pages))}"])
     
-    # Save workbook
+    # Ensure output directory exists and save the workbook
     try:
+        output_dir = os.path.dirname(output_path)
+        if output_dir and not os.path.exists(output_dir):
+            os.makedirs(output_dir)
         wb.save(output_path)
-        file_size = os.path.getsize(output_path)
-        file_size_mb = file_size / (1024 * 1024)
-        
-        print(f"\n✓ Excel file created successfully!")
-        print(f"  File: {output_path}")
-        print(f"  Size: {file_size_mb:.2f} MB")
-        print(f"  Total tables: {len(tables)}")
-        
-        return output_path
-        
-    except PermissionError:
-        print(f"Error: Permission denied. Please close the Excel file if it's open: {output_path}")
-        sys.exit(1)
     except Exception as e:
-        print(f"Error saving Excel file: {e}")
-        sys.exit(1)
+        _discard_sheets(wb)
+        if isinstance(e, PermissionError):
+            raise PermissionError(
+                f"Permission denied. Please close the Excel file if it's open: {output_path}") from e
+        raise
+    
+    file_size = os.path.getsize(output_path)
+    file_size_mb = file_size / (1024 * 1024)
+    
+    print(f"\n✓ Excel file created successfully!")
+    print(f"  File: {output_path}")
+    print(f"  Size: {file_size_mb:.2f} MB")
+    print(f"  Total tables: {written}")
+    
+    return output_path
+
+
+def group_tables(tables, tables_per_workbook=None, pages_per_workbook=None):
+    """
+    Split a stream of tables into consecutive workbook-sized groups.
+
+    A new group starts when the current one holds `tables_per_workbook`
+    tables, or when a table starts `pages_per_workbook` or more pages
+    after the group's first page. Only one group is held in memory.
+
+    Yields:
+        list: Table dicts of one workbook
+    """
+    group = []
+    for table_data in tables:
+        if group and (
+                (tables_per_workbook and len(group) >= tables_per_workbook)
+                or (pages_per_workbook
+                    and table_data['page'] - group[0]['page'] >= pages_per_workbook)):
+            yield group
+            group = []
+        group.append(table_data)
+    if group:
+        yield group
+
+
+def _write_part(part):
+    """
+    Write one workbook of a sharded output.
+
+    Module-level so it can run in a worker process.
+
+    Returns:
+        dict: Manifest entry of the part, with its sheets and errors
+    """
+    errors, sheets = [], []
+    try:
+        create_excel_from_tables(part['tables'], part['path'], part['typed'], part['dash'],
+                                 errors, first_sheet=part['first_sheet'], sheets=sheets)
+    except Exception as e:
+        record_error(errors, 'workbook', e, workbook=os.path.basename(part['path']))
+    return {
+        'workbook': os.path.basename(part['path']),
+        'pages': [part['tables'][0]['page'],
+                  max(t.get('page_end') or t['page'] for t in part['tables'])],
+        'sheets': sheets,
+        'errors': errors,
+    }
+
+
+def create_sharded_workbooks(tables, output_path, tables_per_workbook=None,
+                             pages_per_workbook=None, workers=1, typed=True,
+                             dash='zero', errors=None):
+    """
+    Write tables into several workbooks plus a JSON manifest linking them.
+
+    Huge documents otherwise produce one workbook with hundreds of
+    sheets that must be built in memory at once and opens slowly.
+    Parts are named '<stem>_partNNN.xlsx' next to `output_path`, keep
+    document-wide sheet names ('Table_N'), and are listed with their
+    page ranges and sheets in '<stem>.manifest.json'.
+
+    Args:
+        tables (iterable): Tables with metadata, in page order
+        output_path (str): Path the single workbook would have had
+        tables_per_workbook (int, optional): Maximum sheets per part
+        pages_per_workbook (int, optional): Maximum page span per part
+        workers (int): Write parts in this many processes in parallel
+        typed, dash: See create_excel_from_tables
+        errors (list, optional): Receives structured error records
+
+    Returns:
+        str: Path to the manifest
+    """
+    stem, _ = os.path.splitext(output_path)
+    output_dir = os.path.dirname(output_path)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+
+    def parts():
+        first_sheet = 1
+        for n, group in enumerate(group_tables(tables, tables_per_workbook,
+                                               pages_per_workbook), start=1):
+            yield {'path': f"{stem}_part{n:03d}.xlsx", 'tables': group,
+                   'first_sheet': first_sheet, 'typed': typed, 'dash': dash}
+            first_sheet += len(group)
+
+    entries = []
+    if workers <= 1:
+        entries = [_write_part(part) for part in parts()]
+    else:
+        # At most two parts per worker are in flight, so a streamed
+        # input is never held in memory as a whole
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            in_flight = []
+            for part in parts():
+                if len(in_flight) >= workers * 2:
+                    entries.append(in_flight.pop(0).result())
+                in_flight.append(pool.submit(_write_part, part))
+            entries.extend(f.result() for f in in_flight)
+
+    for entry in entries:
+        if errors is not None:
+            errors.extend(entry['errors'])
+        del entry['errors']
+    # Parts that failed as a whole have no file to link to
+    entries = [entry for entry in entries if entry['sheets']]
+
+    if not entries:
+        raise ValueError("No table could be written to the workbooks")
+
+    manifest_path = f"{stem}.manifest.json"
+    with open(manifest_path, 'w', encoding='utf-8') as f:
+        json.dump({'workbooks': entries}, f, indent=2)
+
+    print(f"\n✓ {len(entries)} workbooks written")
+    print(f"  Manifest: {manifest_path}")
+    return manifest_path
@@ -0,0 +1,63 @@
+import io
+from unittest.mock import MagicMock
+
+
+def make_pdf(content, rotate=0):
+    """
+    A PDF drawing `content` (a content stream) in Helvetica on one page,
+    or one page per stream when given a list.
+    """
+    contents = content if isinstance(content, list) else [content]
+    kids = b" ".join(b"%d 0 R" % (4 + 2 * i) for i in range(len(contents)))
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, len(contents)),
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    for i, page_content in enumerate(contents):
+        stream = page_content.encode('latin-1')
+        objects.append(b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Rotate %d "
+                       b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>"
+                       % (rotate, 5 + 2 * i))
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+    out = io.BytesIO()
+    out.write(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(out.tell())
+        out.write(b"%d 0 obj\n%s\nendobj\n" % (number, body))
+    xref = out.tell()
+    out.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+    for offset in offsets:
+        out.write(b"%010d 00000 n \n" % offset)
+    out.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n"
+              % (len(objects) + 1, xref))
+    return out.getvalue()
+
+
+def ruled_table():
+    """Content stream of a 3x3 ruled table with text in every cell."""
+    ops = ["0.5 w"]
+    for x in (100, 250, 400, 550):
+        ops.append(f"{x} 500 m {x} 650 l S")
+    for y in (500, 550, 600, 650):
+        ops.append(f"100 {y} 550 {y} re S")
+    rows = [("Particulars", "Q1 FY26", "Q4 FY25"),
+            ("Revenue", "1,234.50", "1,100.00"),
+            ("Expenses", "800.00", "(12.40)")]
+    for r, row in enumerate(rows):
+        for c, text in enumerate(row):
+            ops.append(f"BT /F1 10 Tf {110 + 150 * c} {630 - 50 * r} Td ({text}) Tj ET")
+    return "\n".join(ops)
+
+
+def ruled_page(**attrs):
+    """
+    Mock page with a pair of vertical rulings, so table finding runs.
+
+    Keyword arguments set or override further page attributes.
+    """
+    attrs.setdefault('bbox', (0, 0, 595, 842))
+    attrs.setdefault('edges', [{'orientation': 'v', 'x0': x, 'x1': x, 'top': 100, 'bottom': 300}
+                               for x in (50, 550)])
+    return MagicMock(**attrs)
@@ -0,0 +1,116 @@
+import io
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+import pdfplumber
+from src import backends
+from src.extractor import extract_tables_from_pdf
+from src.pdf_source import map_pdf
+from tests.helpers import make_pdf, ruled_table
+
+
+def parse(pdf_bytes, backend):
+    with pdfplumber.open(io.BytesIO(pdf_bytes)) as pdf, \
+            backends.page_loader(pdf_bytes, backend) as load_page:
+        page = load_page(pdf.pages[0])
+        return {
+            'words': [(w['text'], w['x0'], w['top']) for w in page.extract_words()],
+            'edges': sorted((str(e['orientation']), round(e['x0'], 2), round(e['top'], 2),
+                             round(e['x1'], 2), round(e['bottom'], 2)) for e in page.edges),
+            'kinds': {k: len(page.objects.get(k, [])) for k in ('rect', 'line', 'curve')},
+        }
+
+
+@unittest.skipIf(backends.pdfium is None, "pypdfium2 is not installed")
+class TestPdfiumBackend(unittest.TestCase):
+
+    def test_words_match_pdfplumber(self):
+        pdf = make_pdf(ruled_table())
+        reference, pdfium = parse(pdf, 'pdfplumber'), parse(pdf, 'pdfium')
+
+        self.assertEqual([w[0] for w in pdfium['words']], [w[0] for w in reference['words']])
+        for (_, x0, top), (_, ref_x0, ref_top) in zip(pdfium['words'], reference['words']):
+            self.assertAlmostEqual(x0, ref_x0, delta=0.1)
+            # Helvetica is not embedded; pdfium's substitute has another descent
+            self.assertAlmostEqual(top, ref_top, delta=1.5)
+
+    def test_rulings_match_pdfplumber(self):
+        pdf = make_pdf(ruled_table())
+        reference, pdfium = parse(pdf, 'pdfplumber'), parse(pdf, 'pdfium')
+
+        self.assertEqual(pdfium['kinds'], reference['kinds'])
+        self.assertEqual(pdfium['kinds'], {'rect': 4, 'line': 4, 'curve': 0})
+        self.assertEqual(pdfium['edges'], reference['edges'])
+
+    def test_subpaths_and_curves(self):
+        pdf = make_pdf("100 100 m 200 100 l 100 120 m 200 120 l S\n"
+                       "300 300 m 350 300 l 350 350 l f\n"
+                       "100 400 m 150 450 200 450 250 400 c S\n"
+                       "100 700 m 200 700 l n")
+        reference, pdfium = parse(pdf, 'pdfplumber'), parse(pdf, 'pdfium')
+
+        # Two lines from one path, two curves, and the clipping-only path is skipped
+        self.assertEqual(pdfium['kinds'], {'rect': 0, 'line': 2, 'curve': 2})
+        self.assertEqual(pdfium['kinds'], reference['kinds'])
+
+    def test_tables_match_pdfplumber(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'table.pdf')
+            with open(path, 'wb') as f:
+                f.write(make_pdf(ruled_table()))
+            reference = extract_tables_from_pdf(path)
+            tables = extract_tables_from_pdf(path, backend='pdfium')
+
+        self.assertEqual(len(tables), 1)
+        self.assertEqual(tables[0]['table'].to_rows(), reference[0]['table'].to_rows())
+        self.assertIn(['1,234.50'], tables[0]['table'].to_rows())
+
+    def test_memory_mapped_source(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'table.pdf')
+            with open(path, 'wb') as f:
+                f.write(make_pdf(ruled_table()))
+            mapped = map_pdf(path)
+            try:
+                document = backends.open_pdfium(mapped)
+                self.assertEqual(len(document), 1)
+                document.close()
+            finally:
+                mapped.close()
+
+    def test_rotated_page_uses_pdfplumber(self):
+        pdf = make_pdf(ruled_table(), rotate=90)
+        with patch.object(backends, 'load_pdfium_objects') as load:
+            parse(pdf, 'pdfium')
+        load.assert_not_called()
+
+
+class TestPageLoader(unittest.TestCase):
+
+    def test_unknown_backend(self):
+        with self.assertRaises(ValueError):
+            with backends.page_loader(b'', 'pymupdf'):
+                pass
+
+    def test_without_pdfium_uses_pdfplumber(self):
+        pdf = make_pdf(ruled_table())
+        with patch.object(backends, 'pdfium', None):
+            words = parse(pdf, 'pdfium')['words']
+
+        self.assertEqual(words, parse(pdf, 'pdfplumber')['words'])
+
+    @unittest.skipIf(backends.pdfium is None, "pypdfium2 is not installed")
+    def test_pdfium_failure_falls_back(self):
+        pdf = make_pdf(ruled_table())
+        errors = []
+        with patch.object(backends, 'load_pdfium_objects', side_effect=RuntimeError('bad page')):
+            with pdfplumber.open(io.BytesIO(pdf)) as doc, \
+                    backends.page_loader(pdf, 'pdfium', errors) as load_page:
+                page = load_page(doc.pages[0])
+                self.assertTrue(page.chars)
+
+        self.assertEqual(errors[0]['stage'], 'backend')
+
+if __name__ == '__main__':
+    unittest.main()
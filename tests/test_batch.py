@@ -0,0 +1,88 @@
+import os
+import tempfile
+import unittest
+from openpyxl import load_workbook
+from batch_extract_tables import write_document
+from src.packing import PackedTables, make_spill_dir, remove_spill_dir
+from src.table import CompactTable
+
+class TestWriteDocument(unittest.TestCase):
+
+    def test_written_workbook_is_reported(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            job = {'pdf_path': 'report.pdf', 'output_path': os.path.join(tmp, 'report.xlsx'),
+                   'results': [({'page_range': (1, 1)},
+                                [{'table': CompactTable.from_rows([['Item', 'Value'], ['a', '1']]),
+                                  'page': 1}])],
+                   'errors': []}
+
+            result = write_document(job)
+
+            self.assertTrue(os.path.exists(job['output_path']))
+        self.assertIsNone(result['error'])
+        self.assertEqual(result['table_count'], 1)
+
+    def test_packed_shards_are_stitched_written_and_released(self):
+        spill_dir = make_spill_dir()
+        try:
+            # The table continues from the first shard's last page into the second
+            first = PackedTables([{'table': CompactTable.from_rows([['Item', 'Value'], ['a', '1']]),
+                                   'page': 2, 'bbox': (50, 700, 550, 780)}], spill_dir)
+            second = PackedTables([{'table': CompactTable.from_rows([['b', '2']]),
+                                    'page': 3, 'bbox': (50, 40, 550, 80)}], spill_dir)
+            with tempfile.TemporaryDirectory() as tmp:
+                job = {'pdf_path': 'report.pdf', 'output_path': os.path.join(tmp, 'report.xlsx'),
+                       'results': [({'page_range': (3, 4)}, second),
+                                   ({'page_range': (1, 2)}, first)],
+                       'errors': []}
+
+                result = write_document(job)
+
+                rows = [[c.value for c in row]
+                        for row in load_workbook(job['output_path'])['Table_1'].iter_rows()]
+            self.assertEqual(result['table_count'], 1)
+            self.assertEqual(rows, [['Item', 'Value'], ['a', 1], ['b', 2]])
+            self.assertEqual(os.listdir(spill_dir), [])
+        finally:
+            remove_spill_dir(spill_dir)
+
+    def test_failed_workbook_is_returned_not_raised(self):
+        job = {'pdf_path': 'report.pdf', 'output_path': '/nonexistent/dir/\0/report.xlsx',
+               'results': [({'page_range': (1, 1)},
+                            [{'table': CompactTable.from_rows([['Item', 'Value']]), 'page': 1}])],
+               'errors': []}
+
+        result = write_document(job)
+
+        self.assertIsNotNone(result['error'])
+
+    def test_failed_workbook_keeps_the_spill_files(self):
+        spill_dir = make_spill_dir()
+        try:
+            tables = PackedTables([{'table': CompactTable.from_rows([['Item', 'Value']]),
+                                    'page': 1}], spill_dir)
+            job = {'pdf_path': 'report.pdf', 'output_path': '/nonexistent/dir/\0/report.xlsx',
+                   'results': [({'page_range': (1, 1)}, tables)], 'errors': []}
+
+            result = write_document(job)
+
+            self.assertIsNotNone(result['error'])
+            self.assertEqual(len(os.listdir(spill_dir)), 1)
+            # The document can be written again from the same handles
+            with tempfile.TemporaryDirectory() as tmp:
+                job['output_path'] = os.path.join(tmp, 'report.xlsx')
+                self.assertIsNone(write_document(job)['error'])
+            self.assertEqual(os.listdir(spill_dir), [])
+        finally:
+            remove_spill_dir(spill_dir)
+
+    def test_document_without_tables_is_reported(self):
+        job = {'pdf_path': 'report.pdf', 'output_path': 'unused.xlsx',
+               'results': [({'page_range': (1, 1)}, [])], 'errors': []}
+
+        result = write_document(job)
+
+        self.assertEqual(str(result['error']), "No tables found")
+
+if __name__ == '__main__':
+    unittest.main()
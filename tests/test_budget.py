@@ -0,0 +1,44 @@
+import time
+import unittest
+from src.budget import TimeBudget, deadline_after
+
+
+class TestTimeBudget(unittest.TestCase):
+
+    def test_first_run_is_allowed_while_time_is_left(self):
+        budget = TimeBudget(time.time() + 5)
+
+        self.assertTrue(budget.allows('rebuild'))
+        self.assertFalse(TimeBudget(time.time() - 1).allows('rebuild'))
+
+    def test_step_is_refused_when_its_average_does_not_fit(self):
+        budget = TimeBudget(time.time() + 5)
+        budget.record('rebuild', 4)
+        budget.record('rebuild', 8)
+
+        self.assertEqual(budget.average('rebuild'), 6)
+        self.assertFalse(budget.allows('rebuild'))
+        self.assertTrue(budget.allows('page'))
+
+    def test_on_pace_counts_expected_runs(self):
+        budget = TimeBudget(time.time() + 5)
+        budget.record('page', 1)
+
+        budget.expect('page', 3)
+        self.assertTrue(budget.on_pace())
+        budget.expect('page', 10)
+        self.assertFalse(budget.on_pace())
+
+    def test_skips_are_counted(self):
+        budget = TimeBudget(time.time() + 5)
+        budget.skip('rebuild')
+        budget.skip('page', 4)
+
+        self.assertEqual(budget.skipped, {'rebuild': 1, 'page': 4})
+
+    def test_no_budget_means_no_deadline(self):
+        self.assertIsNone(deadline_after(None))
+        self.assertAlmostEqual(deadline_after(10), time.time() + 10, delta=1)
+
+if __name__ == '__main__':
+    unittest.main()
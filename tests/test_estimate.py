@@ -0,0 +1,74 @@
+import io
+import unittest
+import pdfplumber
+from src import estimate
+from src.estimate import (admit_documents, estimate_document, eta_seconds, fit_cost_model,
+                          format_eta, page_features)
+from tests.helpers import make_pdf, ruled_table
+
+
+class TestPreScan(unittest.TestCase):
+
+    def test_operators_are_counted(self):
+        with pdfplumber.open(io.BytesIO(make_pdf(ruled_table()))) as pdf:
+            features = page_features(pdf.pages[0])
+
+        self.assertEqual(features['text_ops'], 9)
+        self.assertEqual(features['rects'], 4)
+        self.assertEqual(features['segments'], 4)
+        self.assertEqual(features['xobjects'], 0)
+        self.assertGreater(features['kbytes'], 0)
+
+    def test_denser_pages_cost_more(self):
+        sparse = {'kbytes': 5, 'text_ops': 40, 'rects': 0, 'segments': 10, 'xobjects': 0}
+        dense = {'kbytes': 200, 'text_ops': 2000, 'rects': 800, 'segments': 10, 'xobjects': 0}
+
+        result = estimate_document([sparse, dense, None])
+
+        self.assertEqual(result['pages'], 3)
+        self.assertLess(result['page_costs'][0], result['page_costs'][1])
+        self.assertAlmostEqual(result['seconds'], sum(result['page_costs']))
+        for backend in estimate.COST_MODEL:
+            self.assertGreater(estimate_document([dense], backend)['seconds'], 0)
+
+
+class TestPlanning(unittest.TestCase):
+
+    def test_eta_format(self):
+        self.assertEqual(format_eta(1), '~5s')
+        self.assertEqual(format_eta(44), '~45s')
+        self.assertEqual(format_eta(120), '~2 min')
+        self.assertEqual(format_eta(104), '~1 min 45s')
+
+    def test_eta_follows_measured_work(self):
+        self.assertEqual(eta_seconds(100, workers=4), 25)
+        # The finished work took twice as long as estimated
+        self.assertAlmostEqual(eta_seconds(50, 4, done_estimate=1000, done_seconds=2000),
+                               25, delta=0.5)
+        # A tiny finished document hardly moves the estimate
+        self.assertAlmostEqual(eta_seconds(100, 4, done_estimate=0.2, done_seconds=2), 29, delta=1)
+
+    def test_cheapest_documents_are_admitted(self):
+        admitted, rejected = admit_documents({'a.pdf': 30, 'b.pdf': 5, 'c.pdf': 20}, 20, 2)
+
+        self.assertEqual(admitted, ['b.pdf', 'c.pdf'])
+        self.assertEqual(rejected, ['a.pdf'])
+
+    @unittest.skipIf(estimate.np is None, "numpy is not installed")
+    def test_fit_recovers_page_costs(self):
+        truth = {'page': 0.02, 'kbytes': 0.001, 'text_ops': 0.0002, 'rects': 0.0001,
+                 'segments': 0.0, 'xobjects': 0.0}
+        samples = []
+        for n in range(1, 40):
+            features = {'kbytes': n * 7 % 50, 'text_ops': n * 31 % 900, 'rects': n * 13 % 300,
+                        'segments': n * 17 % 400, 'xobjects': n % 2}
+            seconds = truth['page'] + sum(truth[f] * features[f] for f in estimate.FEATURES)
+            samples.append((features, seconds))
+
+        fitted = fit_cost_model(samples)
+
+        for name, value in truth.items():
+            self.assertAlmostEqual(fitted[name], value, places=6)
+
+if __name__ == '__main__':
+    unittest.main()
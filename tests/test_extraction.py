@@ -1,15 +1,29 @@
 
+import time
 import unittest
 from unittest.mock import MagicMock, patch
-from src.extractor import extract_tables_from_pdf
+from src.extractor import extract_tables_from_pdf, has_merged_columns, merged_column_score
+from src.table import CompactTable
+from tests.helpers import ruled_page
+
+
 
 class TestExtractor(unittest.TestCase):
 
-    @patch('src.extractor.pdfplumber.open')
+    def setUp(self):
+        # Table finding goes through src.lattice; let the mock pages answer
+        patcher = patch('src.extractor.find_tables',
+                        side_effect=lambda page, settings, regions=None: page.find_tables(settings))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    @patch('src.pdf_source.pdfplumber.open')
     def test_extract_tables_success(self, mock_pdf_open):
         # Mock PDF pages
-        mock_page = MagicMock()
-        mock_page.extract_tables.return_value = [[['Header', 'Col2'], ['Row1', 'Data1']]]
+        mock_table = MagicMock(bbox=(50, 100, 550, 300))
+        mock_table.extract.return_value = [['Header', 'Col2'], ['Row1', 'Data1']]
+        mock_page = ruled_page()
+        mock_page.find_tables.return_value = [mock_table]
         
         mock_pdf = MagicMock()
         mock_pdf.pages = [mock_page]
@@ -22,10 +36,10 @@ class TestExtractor(unittest.TestCase):
         self.assertEqual(result[0]['index_on_page'], 1)
         self.assertEqual(result[0]['table'][0][0], 'Header')
 
-    @patch('src.extractor.pdfplumber.open')
+    @patch('src.pdf_source.pdfplumber.open')
     def test_extract_no_tables(self, mock_pdf_open):
         mock_page = MagicMock()
-        mock_page.extract_tables.return_value = []
+        mock_page.find_tables.return_value = []
         
         mock_pdf = MagicMock()
         mock_pdf.pages = [mock_page]
@@ -35,5 +49,169 @@ class TestExtractor(unittest.TestCase):
         
         self.assertEqual(len(result), 0)
 
+    @patch('src.pdf_source.pdfplumber.open')
+    def test_extract_from_bytes(self, mock_pdf_open):
+        mock_pdf = MagicMock()
+        mock_pdf.pages = []
+        mock_pdf_open.return_value.__enter__.return_value = mock_pdf
+
+        result = extract_tables_from_pdf(b'%PDF-1.4 dummy')
+
+        self.assertEqual(result, [])
+        stream = mock_pdf_open.call_args[0][0]
+        self.assertEqual(stream.read(), b'%PDF-1.4 dummy')
+
+    @patch('src.pdf_source.pdfplumber.open')
+    def test_repeated_page_reuses_tables(self, mock_pdf_open):
+        def make_page():
+            page = ruled_page(width=595, height=842, chars=[], rects=[], lines=[])
+            table = MagicMock(bbox=(50, 100, 550, 300))
+            table.extract.return_value = [['Boilerplate', 'Note'], ['Row1', 'Text']]
+            page.find_tables.return_value = [table]
+            return page
+
+        pages = [make_page(), make_page()]
+        mock_pdf = MagicMock()
+        mock_pdf.pages = pages
+        mock_pdf_open.return_value.__enter__.return_value = mock_pdf
+
+        stats = {}
+        result = extract_tables_from_pdf('dummy.pdf', stitch=False, stats=stats)
+
+        self.assertEqual([t['page'] for t in result], [1, 2])
+        pages[1].find_tables.assert_not_called()
+        self.assertEqual(stats['duplicate_pages'], 1)
+
+    @patch('src.pdf_source.pdfplumber.open')
+    def test_failing_page_is_recorded_and_skipped(self, mock_pdf_open):
+        good_table = MagicMock(bbox=(50, 100, 550, 300))
+        good_table.extract.return_value = [['Header', 'Col2'], ['Row1', 'Data1']]
+        good_page = ruled_page()
+        good_page.find_tables.return_value = [good_table]
+        bad_page = ruled_page()
+        bad_page.find_tables.side_effect = ValueError('broken content stream')
+
+        mock_pdf = MagicMock()
+        mock_pdf.pages = [bad_page, good_page]
+        mock_pdf_open.return_value.__enter__.return_value = mock_pdf
+
+        errors = []
+        result = extract_tables_from_pdf('dummy.pdf', dedupe_pages=False, errors=errors)
+
+        self.assertEqual([t['page'] for t in result], [2])
+        self.assertEqual(len(errors), 1)
+        self.assertEqual(errors[0]['page'], 1)
+        self.assertEqual(errors[0]['error'], 'ValueError')
+
+    @patch('src.pdf_source.pdfplumber.open')
+    def test_page_without_rulings_skips_table_finding(self, mock_pdf_open):
+        page = MagicMock(bbox=(0, 0, 595, 842), edges=[])
+        mock_pdf = MagicMock()
+        mock_pdf.pages = [page]
+        mock_pdf_open.return_value.__enter__.return_value = mock_pdf
+
+        self.assertEqual(extract_tables_from_pdf('dummy.pdf'), [])
+        page.find_tables.assert_not_called()
+
+    @patch('src.extractor.projection_tables')
+    @patch('src.extractor.extract_grid_words', return_value=[])
+    @patch('src.pdf_source.pdfplumber.open')
+    def test_borderless_page_uses_projection(self, mock_pdf_open, mock_words, mock_projection):
+        page = MagicMock(bbox=(0, 0, 595, 842), edges=[])
+        mock_pdf = MagicMock()
+        mock_pdf.pages = [page]
+        mock_pdf_open.return_value.__enter__.return_value = mock_pdf
+        mock_projection.return_value = [{
+            'table': CompactTable.from_rows([['Revenue', '1,234']]),
+            'bbox': (50, 100, 400, 200), 'header': None, 'col_centers': [80, 380]}]
+
+        tables = extract_tables_from_pdf('dummy.pdf', borderless=True)
+
+        self.assertEqual(len(tables), 1)
+        self.assertEqual(tables[0]['table'].to_rows(), [['Revenue', '1,234']])
+        self.assertIsNone(tables[0]['col_xs'])
+        page.find_tables.assert_not_called()
+
+    @patch('src.pdf_source.pdfplumber.open')
+    def test_expired_deadline_records_unread_pages(self, mock_pdf_open):
+        pages = [ruled_page(), ruled_page()]
+        mock_pdf = MagicMock()
+        mock_pdf.pages = pages
+        mock_pdf_open.return_value.__enter__.return_value = mock_pdf
+
+        stats, errors = {}, []
+        result = extract_tables_from_pdf('dummy.pdf', stats=stats, errors=errors,
+                                         deadline=time.time() - 1)
+
+        self.assertEqual(result, [])
+        self.assertEqual((errors[0]['stage'], errors[0]['pages']), ('deadline', '1-2'))
+        self.assertEqual(stats['deadline_pages'], 2)
+        pages[0].find_tables.assert_not_called()
+
+    @patch('src.extractor.TimeBudget.on_pace', return_value=False)
+    @patch('src.extractor.extract_grid_words')
+    @patch('src.pdf_source.pdfplumber.open')
+    def test_rebuild_skipped_when_behind_deadline(self, mock_pdf_open, mock_words, _):
+        merged = MagicMock(bbox=(50, 100, 550, 300))
+        merged.extract.return_value = ([['Particulars', 'Linked'], ['', 'Life Pension']]
+                                       + [[f'Item {i}', '1,234 (56)'] for i in range(10)])
+        page = ruled_page()
+        page.find_tables.return_value = [merged]
+        mock_pdf = MagicMock()
+        mock_pdf.pages = [page]
+        mock_pdf_open.return_value.__enter__.return_value = mock_pdf
+
+        stats = {}
+        tables = extract_tables_from_pdf('dummy.pdf', stats=stats, deadline=time.time() + 60)
+
+        self.assertEqual(tables[0]['degraded'], ['rebuild'])
+        self.assertEqual(tables[0]['table'][2][1], '1,234 (56)')
+        self.assertEqual(stats['skipped_rebuild'], 1)
+        mock_words.assert_not_called()
+
+    def test_missing_file_raises(self):
+        with self.assertRaises(FileNotFoundError):
+            extract_tables_from_pdf('/nonexistent/report.pdf')
+
+class TestMergedColumns(unittest.TestCase):
+
+    def test_merged_numeric_cells_detected(self):
+        table = [['Particulars', 'Linked'], ['', 'Life Pension']]
+        table += [[f'Item {i}', '1,234 (56)'] for i in range(10)]
+
+        is_merged, confidence = merged_column_score(table)
+
+        self.assertTrue(is_merged)
+        self.assertTrue(has_merged_columns(table))
+        self.assertEqual(confidence, 1.0)
+
+    def test_clean_table_not_merged(self):
+        table = [['Particulars', 'Q1'], ['', '']]
+        table += [[f'Item {i}', '1,234'] for i in range(10)]
+
+        self.assertEqual(merged_column_score(table), (False, 1.0))
+
+    def test_borderline_table_has_low_confidence(self):
+        # 6 of 20 sampled cells merged: just over the 25% threshold
+        table = [['H', 'H'], ['', '']]
+        table += [['Item', '3']] * 4 + [['Item', '1 2']] * 6
+
+        is_merged, confidence = merged_column_score(table)
+
+        self.assertTrue(is_merged)
+        self.assertLess(confidence, 0.5)
+
+    def test_score_does_not_depend_on_row_order(self):
+        header = [['H', 'H', 'H'], ['', '', '']]
+        clean = [['Item', '3', '4']] * 7
+        merged = [['Item', '1 2', '3 4']] * 3
+
+        first = merged_column_score(header + merged + clean)
+        last = merged_column_score(header + clean + merged)
+
+        self.assertEqual(first, last)
+        self.assertEqual(has_merged_columns(header + merged + clean),
+                         has_merged_columns(header + clean + merged))
+
 if __name__ == '__main__':
     unittest.main()
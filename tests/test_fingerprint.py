@@ -0,0 +1,31 @@
+import unittest
+from src.fingerprint import collapse_duplicate_tables, table_fingerprint
+from src.table import CompactTable
+
+class TestFingerprint(unittest.TestCase):
+
+    def test_table_fingerprint_follows_content(self):
+        first = CompactTable.from_rows([['Note', 'Text'], ['a', '1']])
+        same = CompactTable.from_rows([[' Note ', 'Text'], ['a', '1']])
+        other = CompactTable.from_rows([['Note', 'Text'], ['a', '2']])
+
+        self.assertEqual(table_fingerprint(first), table_fingerprint(same))
+        self.assertNotEqual(table_fingerprint(first), table_fingerprint(other))
+
+    def test_collapse_keeps_first_copy(self):
+        boilerplate = [['Disclaimer', 'Text'], ['a', 'b']]
+        tables = [
+            {'table': CompactTable.from_rows(boilerplate), 'page': 1},
+            {'table': CompactTable.from_rows([['Premium', '10']]), 'page': 2},
+            {'table': CompactTable.from_rows(boilerplate), 'page': 5},
+        ]
+        stats = {}
+
+        result = list(collapse_duplicate_tables(tables, stats))
+
+        self.assertEqual([t['page'] for t in result], [1, 2])
+        self.assertEqual(result[0]['duplicate_pages'], [5])
+        self.assertEqual(stats['duplicate_tables'], 1)
+
+if __name__ == '__main__':
+    unittest.main()
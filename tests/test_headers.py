@@ -0,0 +1,62 @@
+import unittest
+from src.headers import header_rows_from_fonts, layout_header_row, is_bold
+from src.table import CompactTable
+
+
+def chars(n, font='Body', size=8.0):
+    return [{'fontname': font, 'size': size}] * n
+
+class TestFontHeaders(unittest.TestCase):
+
+    def test_emphasized_leading_rows_are_header(self):
+        table = CompactTable.from_rows([
+            ['', 'Q1', 'Q2'],
+            ['Particulars', '2025', '2024'],
+            ['Premium', '10', '20'],
+            ['Claims', '5', '6'],
+        ])
+        row_chars = [chars(4, 'F3'), chars(19, 'F3'), chars(30), chars(30)]
+
+        self.assertEqual(header_rows_from_fonts(row_chars, table), 2)
+
+    def test_larger_size_counts_as_emphasis(self):
+        table = CompactTable.from_rows([['Title', 'x'], ['a', '1'], ['b', '2']])
+        row_chars = [chars(6, size=10.0), chars(12), chars(12)]
+
+        self.assertEqual(header_rows_from_fonts(row_chars, table), 1)
+
+    def test_trailing_section_label_is_not_header(self):
+        table = CompactTable.from_rows([
+            ['Particulars', 'Q1'],
+            ['Sources of Funds', ''],
+            ['Share Capital', '100'],
+        ])
+        row_chars = [chars(13, 'F3'), chars(16, 'F3'), chars(40)]
+
+        self.assertEqual(header_rows_from_fonts(row_chars, table), 1)
+
+    def test_uniform_fonts_give_no_signal(self):
+        table = CompactTable.from_rows([['a', '1'], ['b', '2']])
+
+        self.assertIsNone(header_rows_from_fonts([chars(2), chars(2)], table))
+
+    def test_bold_font_names(self):
+        self.assertTrue(is_bold('ABCDEE+Arial-BoldMT'))
+        self.assertTrue(is_bold('Calibri,Bold'))
+        self.assertFalse(is_bold('CIDFont+F4'))
+
+class TestHeaderLayout(unittest.TestCase):
+
+    def test_phrase_over_several_columns_becomes_span(self):
+        words = [
+            {'text': 'Linked', 'x0': 100, 'x1': 130, 'top': 0, 'bottom': 10},
+            {'text': 'Business', 'x0': 133, 'x1': 175, 'top': 0, 'bottom': 10},
+        ]
+
+        cells, spans = layout_header_row(words, [50, 110, 140, 170, 230])
+
+        self.assertEqual(cells, ['', 'Linked Business', '', '', ''])
+        self.assertEqual(spans, [(1, 3)])
+
+if __name__ == '__main__':
+    unittest.main()
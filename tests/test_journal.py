@@ -0,0 +1,109 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+from src.extractor import extract_tables_to_journal, extraction_options, journal_tables
+from src.journal import PageJournal, iter_journal_tables
+from src.table import CompactTable
+from tests.helpers import ruled_page
+
+
+def page_table(rows, header=None):
+    return {'table': CompactTable.from_rows(rows), 'bbox': (0, 0, 100, 50),
+            'col_xs': [0.0, 50.0], 'header': header}
+
+
+
+class TestPageJournal(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'report.journal.jsonl')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_tables_round_trip_in_page_order(self):
+        header = {'rows': 1, 'spans': [(0, 0, 1)]}
+        with PageJournal(self.path) as journal:
+            journal.record_page(3, [page_table([['Claims', None], ['a', '5']])])
+            journal.record_page(1, [page_table([['Premium', '10']], header)])
+            journal.record_page(2, [])
+
+        tables = list(iter_journal_tables(self.path))
+
+        self.assertEqual([(t['page'], t['index_on_page']) for t in tables], [(1, 1), (3, 1)])
+        self.assertEqual(tables[0]['header'], header)
+        self.assertEqual(tables[1]['table'].to_rows(), [['Claims', None], ['a', '5']])
+
+    def test_resume_keeps_pages_and_drops_torn_line(self):
+        with PageJournal(self.path) as journal:
+            journal.record_page(1, [page_table([['a', '1']])])
+        with open(self.path, 'a') as f:
+            f.write('{"page": 2, "tab')  # crash in the middle of a write
+
+        with PageJournal(self.path, resume=True) as journal:
+            self.assertEqual(journal.completed, {1})
+            self.assertEqual(journal.table_count, 1)
+            journal.record_page(2, [page_table([['b', '2']])])
+
+        self.assertEqual([t['page'] for t in iter_journal_tables(self.path)], [1, 2])
+
+    def test_journal_of_another_file_starts_over(self):
+        pdf_path = os.path.join(self.tmp.name, 'report.pdf')
+        with open(pdf_path, 'wb') as f:
+            f.write(b'%PDF-1.4 first')
+        with PageJournal(self.path, pdf_path) as journal:
+            journal.record_page(1, [])
+        with open(pdf_path, 'wb') as f:
+            f.write(b'%PDF-1.4 a different document')
+
+        with PageJournal(self.path, pdf_path, resume=True) as journal:
+            self.assertEqual(journal.completed, set())
+
+    def test_journal_of_other_options_starts_over(self):
+        with PageJournal(self.path, options=extraction_options(backend='pdfium')) as journal:
+            journal.record_page(1, [page_table([['a', '1']])])
+
+        with patch('builtins.print') as mock_print:
+            with PageJournal(self.path, resume=True, options=extraction_options()) as journal:
+                self.assertEqual(journal.completed, set())
+
+        message = mock_print.call_args[0][0]
+        self.assertIn("backend: pdfium -> pdfplumber", message)
+        self.assertEqual(list(iter_journal_tables(self.path)), [])
+
+    def test_journal_of_same_options_resumes(self):
+        with PageJournal(self.path, options=extraction_options(borderless=True)) as journal:
+            journal.record_page(1, [page_table([['a', '1']])])
+
+        with PageJournal(self.path, resume=True,
+                         options=extraction_options(borderless=True)) as journal:
+            self.assertEqual(journal.completed, {1})
+
+    @patch('src.extractor.find_tables', lambda page, settings, regions=None: page.find_tables(settings))
+    @patch('src.pdf_source.pdfplumber.open')
+    def test_resume_skips_completed_pages(self, mock_pdf_open):
+        pages = []
+        for text in ('First', 'Second'):
+            table = MagicMock(bbox=(50, 100, 550, 300))
+            table.extract.return_value = [[text, 'Value'], ['Row', '1']]
+            page = ruled_page()
+            page.find_tables.return_value = [table]
+            pages.append(page)
+        mock_pdf = MagicMock()
+        mock_pdf.pages = pages
+        mock_pdf_open.return_value.__enter__.return_value = mock_pdf
+        with PageJournal(self.path, options=extraction_options(dedupe_pages=False)) as journal:
+            journal.record_page(1, [page_table([['First', 'Value'], ['Row', '1']])])
+
+        count = extract_tables_to_journal('dummy.pdf', self.path, resume=True,
+                                          dedupe_pages=False)
+
+        pages[0].find_tables.assert_not_called()
+        self.assertEqual(count, 2)
+        tables = list(journal_tables(self.path, stitch=False))
+        self.assertEqual([t['table'][0][0] for t in tables], ['First', 'Second'])
+
+if __name__ == '__main__':
+    unittest.main()
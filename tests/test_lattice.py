@@ -0,0 +1,129 @@
+import io
+import random
+import unittest
+import pdfplumber
+from unittest.mock import MagicMock, patch
+from pdfplumber.table import edges_to_intersections, intersections_to_cells
+from src import lattice
+from src.regions import candidate_regions
+from tests.helpers import make_pdf
+
+
+def v_edge(x, top, bottom):
+    return {'orientation': 'v', 'x0': x, 'x1': x, 'top': top, 'bottom': bottom,
+            'width': 0, 'height': bottom - top}
+
+
+def h_edge(y, x0, x1):
+    return {'orientation': 'h', 'x0': x0, 'x1': x1, 'top': y, 'bottom': y,
+            'width': x1 - x0, 'height': 0}
+
+
+def reference_cells(edges, x_tol=3, y_tol=10):
+    return intersections_to_cells(edges_to_intersections(edges, x_tol, y_tol))
+
+
+def random_grid(rng):
+    """A ruled grid with missing, broken and slightly offset segments."""
+    xs = sorted(rng.sample(range(50, 550, 10), rng.randint(2, 9)))
+    ys = sorted(rng.sample(range(100, 700, 12), rng.randint(2, 14)))
+    edges = []
+    for x in xs:
+        for top, bottom in zip(ys, ys[1:]):
+            if rng.random() < 0.85:
+                edges.append(v_edge(x + rng.choice([0, 0, 0.5]), top, bottom + rng.choice([0, -2, 4])))
+    for y in ys:
+        for x0, x1 in zip(xs, xs[1:]):
+            if rng.random() < 0.85:
+                edges.append(h_edge(y + rng.choice([0, 0, 1.5]), x0 - rng.choice([0, 2]), x1))
+    return edges
+
+
+@unittest.skipIf(lattice.np is None, "NumPy is not installed")
+class TestLatticeCells(unittest.TestCase):
+
+    def test_full_grid(self):
+        edges = [v_edge(x, 100, 300) for x in (50, 150, 250)]
+        edges += [h_edge(y, 50, 250) for y in (100, 200, 300)]
+
+        cells = lattice.lattice_cells(edges, 3, 10)
+
+        self.assertEqual(cells, [(50, 100, 150, 200), (50, 200, 150, 300),
+                                 (150, 100, 250, 200), (150, 200, 250, 300)])
+        self.assertEqual(cells, reference_cells(edges))
+
+    def test_spanning_cell_and_missing_rule(self):
+        # The middle vertical stops after the first row, so the second
+        # row is one cell spanning both columns
+        edges = [v_edge(50, 100, 300), v_edge(150, 100, 200), v_edge(250, 100, 300)]
+        edges += [h_edge(y, 50, 250) for y in (100, 200, 300)]
+
+        self.assertEqual(lattice.lattice_cells(edges, 3, 10), reference_cells(edges))
+        self.assertIn((50, 200, 250, 300), lattice.lattice_cells(edges, 3, 10))
+
+    def test_matches_pdfplumber_on_random_grids(self):
+        rng = random.Random(43)
+        for _ in range(200):
+            edges = random_grid(rng)
+            self.assertEqual(lattice.lattice_cells(edges, 3, 10), reference_cells(edges))
+
+    def test_no_crossing_edges(self):
+        self.assertEqual(lattice.lattice_cells([v_edge(50, 100, 300)], 3, 10), [])
+
+
+class TestLatticeTableFinder(unittest.TestCase):
+
+    def finder(self, edges):
+        with patch.object(lattice.LatticeTableFinder, 'get_edges', return_value=edges):
+            return lattice.LatticeTableFinder(MagicMock(), {'intersection_y_tolerance': 10})
+
+    def test_without_numpy_uses_pdfplumber(self):
+        edges = random_grid(random.Random(7))
+        with patch.object(lattice, 'np', None):
+            finder = self.finder(edges)
+
+        self.assertIsNotNone(finder.intersections)
+        self.assertEqual(finder.cells, reference_cells(edges))
+
+    @unittest.skipIf(lattice.np is None, "NumPy is not installed")
+    def test_dense_page_uses_lattice(self):
+        edges = [v_edge(x, 100, 700) for x in range(50, 550, 50)]
+        edges += [h_edge(y, 50, 500) for y in range(100, 700, 20)]
+
+        finder = self.finder(edges)
+
+        self.assertIsNone(finder.intersections)
+        self.assertEqual(finder.cells, reference_cells(edges))
+        self.assertEqual(len(finder.tables), 1)
+
+def two_tables():
+    """Content stream of a heading and two ruled tables whose rulings differ by 1pt."""
+    ops = ["0.5 w", "BT /F1 12 Tf 40 780 Td (Quarterly results) Tj ET"]
+    for x0, top, bottom in ((100, 500, 700), (101, 150, 350)):
+        for x in (x0, x0 + 200, x0 + 400):
+            ops.append(f"{x} {top} m {x} {bottom} l S")
+        for r, y in enumerate(range(bottom - 30, top, -40)):
+            ops.append(f"BT /F1 10 Tf {x0 + 10} {y} Td (Item {r}) Tj ET")
+            ops.append(f"BT /F1 10 Tf {x0 + 210} {y} Td ({r * 7}.50) Tj ET")
+    return "\n".join(ops)
+
+
+class TestRegionTables(unittest.TestCase):
+
+    def test_regions_find_the_tables_of_the_full_page(self):
+        settings = {"vertical_strategy": "lines", "horizontal_strategy": "text",
+                    "snap_tolerance": 3, "intersection_y_tolerance": 10}
+        with pdfplumber.open(io.BytesIO(make_pdf(two_tables()))) as pdf:
+            page = pdf.pages[0]
+            regions = candidate_regions(page)
+
+            full = lattice.find_tables(page, settings)
+            by_region = lattice.find_tables(page, settings, regions)
+
+            self.assertEqual(len(regions), 2)
+            self.assertEqual(len(full), 2)
+            self.assertEqual([t.cells for t in by_region], [t.cells for t in full])
+            self.assertEqual([t.extract() for t in by_region], [t.extract() for t in full])
+
+if __name__ == '__main__':
+    unittest.main()
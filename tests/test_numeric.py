@@ -0,0 +1,44 @@
+import unittest
+from src.numeric import parse_number, type_column
+
+class TestNumeric(unittest.TestCase):
+
+    def test_accounting_formats(self):
+        self.assertEqual(parse_number('(1,234.56)')[0], -1234.56)
+        self.assertEqual(parse_number('1,23,456.78')[0], 123456.78)
+        self.assertEqual(parse_number('12,34,567')[0], 1234567)
+        self.assertEqual(parse_number('-1,234')[0], -1234)
+        self.assertAlmostEqual(parse_number('1.97%')[0], 0.0197)
+
+    def test_number_formats_keep_decimals_and_parentheses(self):
+        self.assertEqual(parse_number('(1,234.56)')[1], '#,##0.00;(#,##0.00)')
+        self.assertEqual(parse_number('1,234')[1], '#,##0')
+
+    def test_number_formats_follow_the_source_text(self):
+        # No grouping where the source had none
+        self.assertEqual(parse_number('2025')[1], '0')
+        self.assertEqual(parse_number('0.75')[1], '0.00')
+        # Indian lakh grouping is kept with literal separators
+        self.assertEqual(parse_number('12,34,567')[1], r'##\,##\,##0')
+        self.assertEqual(parse_number('(1,23,456.78)')[1], r'#\,##\,##0.00;(#\,##\,##0.00)')
+        # Negative percentages keep their parentheses
+        self.assertEqual(parse_number('(12.5%)'), (-0.125, '0.0%;(0.0%)'))
+        self.assertEqual(parse_number('1.97%')[1], '0.00%')
+
+    def test_dashes(self):
+        self.assertEqual(parse_number('-', 'zero')[0], 0)
+        self.assertEqual(parse_number('–', 'null'), (None, 'General'))
+        self.assertIsNone(parse_number('-', 'text'))
+
+    def test_text_and_codes_stay_text(self):
+        for text in ('Premium', '007', '1,2345', '1,234)', 'L-27'):
+            self.assertIsNone(parse_number(text), text)
+
+    def test_type_column(self):
+        values, formats = type_column(('Amount', '(10)', None, 'n/a'))
+
+        self.assertEqual(values, ('Amount', -10, None, 'n/a'))
+        self.assertEqual(formats, (None, '0;(0)', None, None))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+import unittest
+from unittest.mock import MagicMock
+from src.overprint import dedupe_chars, dedupe_page_chars
+
+
+def char(text, x0, top=100, width=5, fontname='Arial-BoldMT', size=9):
+    return {'object_type': 'char', 'text': text, 'x0': x0, 'x1': x0 + width, 'top': top, 'doctop': top,
+            'bottom': top + size, 'upright': True, 'fontname': fontname, 'size': size}
+
+class TestOverprint(unittest.TestCase):
+
+    def test_fake_bold_copies_collapse(self):
+        chars = [char('T', 10), char('T', 10.3), char('T', 10.6),
+                 char('o', 16), char('o', 16.3), char('o', 16.6),
+                 char('T', 40)]
+
+        kept = dedupe_chars(chars)
+
+        self.assertEqual([(c['text'], c['x0']) for c in kept], [('T', 10), ('o', 16), ('T', 40)])
+
+    def test_narrow_neighbours_in_small_print_are_kept(self):
+        # "ll" in 3.6pt text: the letters are under 1pt apart
+        chars = [char('l', 75.69, width=0.86, size=3.6), char('l', 76.53, width=0.86, size=3.6)]
+
+        self.assertIs(dedupe_chars(chars), chars)
+
+    def test_copies_must_share_font_and_line(self):
+        chars = [char('1', 10), char('1', 10.2, fontname='Arial'), char('1', 10, top=112)]
+
+        self.assertIs(dedupe_chars(chars), chars)
+
+    def test_page_view_and_count(self):
+        chars = [char('A', 10), char('A', 10.4)]
+        page = MagicMock(chars=chars)
+        stats = {}
+
+        view = dedupe_page_chars(page, stats)
+
+        self.assertIs(view, page.filter.return_value)
+        self.assertEqual(stats, {'duplicate_chars': 1})
+        keep = page.filter.call_args[0][0]
+        self.assertTrue(keep(chars[0]))
+        self.assertFalse(keep(chars[1]))
+        self.assertTrue(keep({'object_type': 'rect'}))
+
+    def test_clean_page_is_returned_as_is(self):
+        page = MagicMock(chars=[char('A', 10), char('B', 16)])
+
+        self.assertIs(dedupe_page_chars(page, {}), page)
+        page.filter.assert_not_called()
+
+if __name__ == '__main__':
+    unittest.main()
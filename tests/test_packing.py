@@ -0,0 +1,86 @@
+import os
+import pickle
+import unittest
+from src.packing import (PackedTables, make_spill_dir, pack_table, remove_spill_dir,
+                         unpack_table)
+from src.shards import merge_shard_results, plan_shards
+from src.table import CompactTable
+
+
+def found(rows, page, **meta):
+    return {'table': CompactTable.from_rows(rows), 'page': page, 'index_on_page': 1, **meta}
+
+
+class TestPackTable(unittest.TestCase):
+
+    def test_round_trip_keeps_none_empty_and_ragged_rows(self):
+        table = CompactTable.from_rows([['Particulars', 'Q1 FY26', None],
+                                        ['Revenue', '', '1,234.50'],
+                                        ['Total']])
+
+        self.assertEqual(unpack_table(pack_table(table)), table)
+        self.assertEqual(unpack_table(pack_table(table)).to_rows(), table.to_rows())
+
+    def test_non_ascii_cells(self):
+        table = CompactTable.from_rows([['₹ crore', 'Δ %'], ['Zürich', '(1.2)']])
+
+        self.assertEqual(unpack_table(pack_table(table)).to_rows(), table.to_rows())
+
+    def test_many_distinct_strings(self):
+        table = CompactTable.from_rows([[str(r), f'{r * 1.5:,.2f}', None] for r in range(400)])
+
+        self.assertEqual(unpack_table(pack_table(table)), table)
+
+    def test_empty_table(self):
+        self.assertEqual(unpack_table(pack_table(CompactTable.from_rows([]))).n_rows, 0)
+
+
+class TestPackedTables(unittest.TestCase):
+
+    def setUp(self):
+        self.spill_dir = make_spill_dir()
+
+    def tearDown(self):
+        remove_spill_dir(self.spill_dir)
+
+    def test_handle_pickles_without_cells(self):
+        tables = [found([['Item', 'Value'], ['a', '1']], 3, bbox=(1, 2, 3, 4),
+                        header={'rows': 1, 'spans': [(0, 1)]}),
+                  found([['x'] * 40] * 200, 4)]
+        packed = PackedTables(tables, self.spill_dir)
+
+        received = pickle.loads(pickle.dumps(packed))
+
+        self.assertNotIn(b'Value', pickle.dumps(packed))
+        self.assertEqual(len(received), 2)
+        self.assertEqual(list(received), tables)
+
+    def test_release_deletes_spill_file(self):
+        packed = PackedTables([found([['a']], 1)], self.spill_dir)
+        path = packed.path
+
+        packed.release()
+
+        self.assertFalse(os.path.exists(path))
+        self.assertEqual(list(packed), [])
+
+    def test_no_tables_leaves_no_file(self):
+        packed = PackedTables([], self.spill_dir)
+
+        self.assertIsNone(packed.path)
+        self.assertEqual(os.listdir(self.spill_dir), [])
+
+    def test_merge_reads_packed_shards(self):
+        shards = plan_shards('big.pdf', 90, pages_per_shard=30, min_pages=60)
+        results = [
+            (shards[1], PackedTables([found([['b']], 40)], self.spill_dir)),
+            (shards[0], PackedTables([found([['a']], 3)], self.spill_dir)),
+        ]
+
+        merged = merge_shard_results(results)
+
+        self.assertEqual([t['page'] for t in merged], [3, 40])
+        self.assertEqual(merged[0]['table'].to_rows(), [['a']])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+import os
+import tempfile
+import unittest
+from batch_extract_tables import run_shards
+from src import pdf_source
+from src.packing import make_spill_dir, remove_spill_dir
+from src.pool import shutdown_pools, warm_pool
+from src.shards import plan_shards
+from tests.helpers import make_pdf, ruled_table
+
+
+class TestWarmPool(unittest.TestCase):
+
+    def tearDown(self):
+        shutdown_pools()
+
+    def test_pool_is_kept_between_jobs(self):
+        pool = warm_pool(1, 'test')
+        first = pool.submit(os.getpid).result()
+
+        self.assertIs(warm_pool(1, 'test'), pool)
+        self.assertEqual(warm_pool(1, 'test').submit(os.getpid).result(), first)
+        self.assertIsNot(warm_pool(1, 'other'), pool)
+
+    def test_shut_down_pool_is_replaced(self):
+        pool = warm_pool(1, 'test')
+        shutdown_pools()
+
+        self.assertIsNot(warm_pool(1, 'test'), pool)
+        self.assertTrue(warm_pool(1, 'test').submit(os.getpid).result())
+
+    def test_shards_run_in_warm_pool(self):
+        spill_dir = make_spill_dir()
+        try:
+            with tempfile.TemporaryDirectory() as tmp:
+                path = os.path.join(tmp, 'table.pdf')
+                with open(path, 'wb') as f:
+                    f.write(make_pdf(ruled_table()))
+                shards = plan_shards(path, 1)
+                shards[0]['spill_dir'] = spill_dir
+
+                (shard, tables, error), = run_shards(shards, 2)
+
+                self.assertIsNone(error)
+                self.assertIn(['1,234.50'], list(tables)[0]['table'].to_rows())
+                tables.release()
+        finally:
+            remove_spill_dir(spill_dir)
+
+
+class TestSharedMaps(unittest.TestCase):
+
+    def tearDown(self):
+        pdf_source.release_shared_maps()
+
+    def test_only_recent_documents_stay_mapped(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            maps = []
+            for n in range(pdf_source.MAX_SHARED_MAPS + 1):
+                path = os.path.join(tmp, f'{n}.pdf')
+                with open(path, 'wb') as f:
+                    f.write(make_pdf(ruled_table()))
+                maps.append(pdf_source.shared_pdf_map(path))
+
+            self.assertTrue(maps[0].closed)
+            self.assertFalse(maps[-1].closed)
+            self.assertEqual(len(pdf_source._SHARED_MAPS), pdf_source.MAX_SHARED_MAPS)
+
+if __name__ == '__main__':
+    unittest.main()
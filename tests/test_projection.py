@@ -0,0 +1,87 @@
+import unittest
+from src.projection import projection, projection_tables, text_lines
+
+
+def word(text, x0, top, font='Arial', size=9):
+    width = len(text) * 4.5
+    chars = [{'text': c, 'fontname': font, 'size': size} for c in text]
+    return {'text': text, 'x0': x0, 'x1': x0 + width, 'top': top, 'bottom': top + size,
+            'chars': chars}
+
+
+def label(text, x0, top, **kw):
+    """Words of a label, one space apart."""
+    words = []
+    for part in text.split():
+        words.append(word(part, x0, top, **kw))
+        x0 += len(part) * 4.5 + 3
+    return words
+
+
+def statement(top=100):
+    """A borderless statement: bold header, labels, right-aligned figures."""
+    words = label('Particulars', 50, top, font='Arial-Bold')
+    words += label('Q1 FY26', 300, top, font='Arial-Bold')
+    words += label('Q4 FY25', 400, top, font='Arial-Bold')
+    rows = [('Revenue from operations', ['1,234.50', '1,100.00']),
+            ('Other income', ['12.00', '(3.40)']),
+            ('Expenses', []),
+            ('Total expenses', ['800.00', '-']),
+            ('Profit before tax', ['446.50', '296.60'])]
+    y = top + 15
+    for text, figures in rows:
+        words += label(text, 50, y)
+        for i, figure in enumerate(figures):
+            words.append(word(figure, 340 - len(figure) * 4.5 + i * 100, y))
+        y += 13
+    return words
+
+
+class TestProjection(unittest.TestCase):
+
+    def test_counts_covering_spans(self):
+        self.assertEqual(projection([(0, 3), (2, 5), (2.5, 3.2)], 0, 6), [1, 1, 3, 2, 1, 0])
+
+    def test_lines_and_phrases(self):
+        words = label('Other income', 50, 100) + [word('12.00', 300, 100.5)]
+        lines = text_lines(words + label('Total', 50, 113))
+
+        self.assertEqual(len(lines), 2)
+        self.assertEqual([p['text'] for p in lines[0]['phrases']], ['Other income', '12.00'])
+
+
+class TestProjectionTables(unittest.TestCase):
+
+    def test_borderless_statement(self):
+        found = projection_tables(statement())
+
+        self.assertEqual(len(found), 1)
+        self.assertEqual(found[0]['table'].to_rows(), [
+            ['Particulars', 'Q1 FY26', 'Q4 FY25'],
+            ['Revenue from operations', '1,234.50', '1,100.00'],
+            ['Other income', '12.00', '(3.40)'],
+            ['Expenses', '', ''],
+            ['Total expenses', '800.00', '-'],
+            ['Profit before tax', '446.50', '296.60'],
+        ])
+        self.assertEqual(found[0]['header']['rows'], 1)
+        self.assertEqual(found[0]['bbox'][1], 100)
+
+    def test_separate_tables(self):
+        found = projection_tables(statement(100) + statement(300))
+
+        self.assertEqual([t['bbox'][1] for t in found], [100, 300])
+
+    def test_narrative_text_has_no_tables(self):
+        words = []
+        for i in range(10):
+            words += label('The Board of Directors approved the results on 14 August 2025',
+                           50, 100 + i * 13)
+
+        self.assertEqual(projection_tables(words), [])
+
+    def test_no_words(self):
+        self.assertEqual(projection_tables([]), [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,48 @@
+import unittest
+from unittest.mock import MagicMock
+from src.regions import candidate_regions, table_view
+
+
+def vertical(x, top, bottom):
+    return {'orientation': 'v', 'x0': x, 'x1': x, 'top': top, 'bottom': bottom}
+
+
+def page_with(edges):
+    return MagicMock(bbox=(0, 0, 595, 842), edges=edges)
+
+class TestCandidateRegions(unittest.TestCase):
+
+    def test_rulings_group_into_padded_regions(self):
+        page = page_with([
+            vertical(50, 100, 300), vertical(300, 100, 300), vertical(550, 120, 310),
+            {'orientation': 'h', 'x0': 0, 'x1': 595, 'top': 400, 'bottom': 400},
+            vertical(60, 500, 600), vertical(500, 500, 600),
+        ])
+
+        self.assertEqual(candidate_regions(page), [
+            (46, 87, 554, 323),
+            (56, 487, 504, 613),
+        ])
+
+    def test_single_or_short_rulings_hold_no_table(self):
+        page = page_with([vertical(50, 100, 300), vertical(50, 310, 400),
+                          vertical(300, 700, 705), vertical(400, 700, 705)])
+
+        self.assertEqual(candidate_regions(page), [])
+
+    def test_regions_are_clipped_to_the_page(self):
+        page = page_with([vertical(1, 0, 842), vertical(594, 0, 842)])
+
+        self.assertEqual(candidate_regions(page), [(0, 0, 595, 842)])
+
+    def test_table_view_keeps_the_chars_of_the_padded_bbox(self):
+        chars = [{'x0': x, 'x1': x + 5, 'top': top, 'bottom': top + 10}
+                 for x, top in ((0, 85), (510, 300), (100, 70), (530, 200))]
+        page = MagicMock(bbox=(0, 0, 595, 842), chars=chars)
+
+        view = table_view(page, (10, 100, 500, 300))
+
+        self.assertEqual(view.chars, chars[:2])
+
+if __name__ == '__main__':
+    unittest.main()
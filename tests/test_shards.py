@@ -0,0 +1,43 @@
+import unittest
+from src.shards import plan_shards, merge_shard_results
+
+class TestShards(unittest.TestCase):
+
+    def test_small_document_is_one_shard(self):
+        shards = plan_shards('small.pdf', 12, pages_per_shard=30, min_pages=60)
+
+        self.assertEqual(len(shards), 1)
+        self.assertEqual(shards[0]['page_range'], (1, 12))
+
+    def test_large_document_covers_every_page_once(self):
+        shards = plan_shards('big.pdf', 400, pages_per_shard=30, min_pages=60)
+
+        self.assertEqual(len(shards), 14)
+        self.assertEqual(shards[0]['page_range'][0], 1)
+        self.assertEqual(shards[-1]['page_range'][1], 400)
+        for prev, nxt in zip(shards, shards[1:]):
+            self.assertEqual(prev['page_range'][1] + 1, nxt['page_range'][0])
+
+    def test_page_costs_balance_shards(self):
+        # The first 30 pages are four times as costly as the rest
+        costs = [4.0] * 30 + [1.0] * 60
+        shards = plan_shards('big.pdf', 90, pages_per_shard=30, min_pages=60, page_costs=costs)
+
+        self.assertEqual(len(shards), 3)
+        self.assertEqual([s['page_range'] for s in shards], [(1, 15), (16, 30), (31, 90)])
+        self.assertEqual([s['estimate'] for s in shards], [60.0, 60.0, 60.0])
+
+    def test_merge_restores_page_order(self):
+        shards = plan_shards('big.pdf', 90, pages_per_shard=30, min_pages=60)
+        results = [
+            (shards[2], [{'table': [['c']], 'page': 70, 'index_on_page': 1}]),
+            (shards[0], [{'table': [['a']], 'page': 3, 'index_on_page': 1}]),
+            (shards[1], [{'table': [['b']], 'page': 40, 'index_on_page': 1}]),
+        ]
+
+        merged = merge_shard_results(results)
+
+        self.assertEqual([t['page'] for t in merged], [3, 40, 70])
+
+if __name__ == '__main__':
+    unittest.main()
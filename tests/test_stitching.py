@@ -0,0 +1,74 @@
+import unittest
+from src.stitching import stitch_continuations
+
+HEADER = ['Particulars', 'Q1', 'Q2']
+XS = [20.0, 300.0, 400.0]
+
+
+def fragment(page, rows, index=1, col_xs=XS):
+    return {'table': rows, 'page': page, 'index_on_page': index, 'col_xs': col_xs}
+
+class TestStitching(unittest.TestCase):
+
+    def test_repeated_header_is_merged_and_dropped(self):
+        tables = [
+            fragment(4, [HEADER, ['Premium', '1,200', '1,300']]),
+            fragment(5, [HEADER, ['Claims', '(400)', '(350)']]),
+        ]
+
+        result = list(stitch_continuations(tables))
+
+        self.assertEqual(len(result), 1)
+        self.assertEqual(result[0]['page'], 4)
+        self.assertEqual(result[0]['page_end'], 5)
+        self.assertEqual(len(result[0]['table']), 3)
+        self.assertEqual(result[0]['table'][2][0], 'Claims')
+
+    def test_headerless_data_fragment_is_merged(self):
+        tables = [
+            fragment(4, [HEADER, ['Premium', '1,200', '1,300']]),
+            fragment(5, [['Claims', '400', '-']]),
+        ]
+
+        result = list(stitch_continuations(tables))
+
+        self.assertEqual(len(result), 1)
+        self.assertEqual(len(result[0]['table']), 3)
+
+    def test_degraded_fragment_flags_merged_table(self):
+        tables = [
+            fragment(4, [HEADER, ['Premium', '1,200', '1,300']]),
+            dict(fragment(5, [HEADER, ['Claims', '(400)', '(350)']]), degraded=['rebuild']),
+        ]
+
+        result = list(stitch_continuations(tables))
+
+        self.assertEqual(result[0]['degraded'], ['rebuild'])
+
+    def test_shifted_columns_start_new_table(self):
+        tables = [
+            fragment(4, [HEADER, ['Premium', '1,200', '1,300']]),
+            fragment(5, [HEADER, ['Claims', '400', '350']], col_xs=[60.0, 340.0, 440.0]),
+        ]
+
+        self.assertEqual(len(list(stitch_continuations(tables))), 2)
+
+    def test_non_adjacent_pages_are_not_merged(self):
+        tables = [
+            fragment(4, [HEADER, ['Premium', '1,200', '1,300']]),
+            fragment(6, [HEADER, ['Claims', '400', '350']]),
+        ]
+
+        self.assertEqual(len(list(stitch_continuations(tables))), 2)
+
+    def test_input_tables_are_not_mutated(self):
+        first = fragment(4, [HEADER, ['Premium', '1,200', '1,300']])
+        tables = [first, fragment(5, [HEADER, ['Claims', '400', '350']])]
+
+        list(stitch_continuations(tables))
+
+        self.assertEqual(len(first['table']), 2)
+        self.assertNotIn('page_end', first)
+
+if __name__ == '__main__':
+    unittest.main()
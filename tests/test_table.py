@@ -0,0 +1,42 @@
+import pickle
+import unittest
+from src.table import CompactTable
+
+class TestCompactTable(unittest.TestCase):
+
+    def test_cells_are_stripped_and_ragged_rows_kept(self):
+        table = CompactTable.from_rows([[' Header ', None, 'Q1 '], ['Row1', '']])
+
+        self.assertEqual(len(table), 2)
+        self.assertEqual(table.n_cols, 3)
+        self.assertEqual(table[0], ('Header', None, 'Q1'))
+        self.assertEqual(table[1], ('Row1', ''))
+        self.assertEqual(table.text(1, 2), '')
+
+    def test_column_stats(self):
+        table = CompactTable.from_rows([
+            ['Particulars', 'Amount'],
+            ['Premium', '1,234.56'],
+            ['Claims', '(400)'],
+            ['Other', 'n/a'],
+        ])
+
+        self.assertEqual(table.col_width(0), len('Particulars'))
+        self.assertAlmostEqual(table.numeric_ratio(1), 0.5)
+        self.assertEqual(table.numeric_ratio(0), 0.0)
+
+    def test_concat_and_slice(self):
+        first = CompactTable.from_rows([['H1', 'H2'], ['a', '1']])
+        second = CompactTable.from_rows([['H1', 'H2'], ['b', '2']])
+
+        merged = CompactTable.concat([first, second.slice_rows(1)])
+
+        self.assertEqual(merged.to_rows(), [['H1', 'H2'], ['a', '1'], ['b', '2']])
+
+    def test_pickle_round_trip(self):
+        table = CompactTable.from_rows([['a', None], ['b', 'c']])
+
+        self.assertEqual(pickle.loads(pickle.dumps(table)), table)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+import io
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock
+from src.extractor import extract_page_tables, extract_tables_from_pdf
+from src.templates import layout_fingerprint, load_templates, make_template, save_templates
+from tests.helpers import make_pdf, ruled_page
+
+
+def layout_page(chars=()):
+    """Ruled mock page whose layout fingerprint comes from five rules."""
+    rule = {'x0': 50, 'top': 100, 'x1': 550, 'bottom': 101}
+    return ruled_page(width=595, height=842, chars=list(chars), lines=[],
+                      rects=[dict(rule, top=100 + 20 * i, bottom=101 + 20 * i) for i in range(5)])
+
+
+def merged_statement(rows, first=0):
+    """Content stream of a ruled table whose figure columns hold merged pairs."""
+    ops = ["0.5 w"] + [f"{x} 200 m {x} 700 l S" for x in (100, 250, 400, 460)]
+    lines = [("Particulars", "Current", "Previous")]
+    lines += [(f"Item {i}", f"1,{first + i:03d} ({i + 10})", f"2,{i:03d} ({i + 20})")
+              for i in range(rows)]
+    for r, line in enumerate(lines):
+        for x, text in zip((102, 255, 405), line):
+            ops.append(f"BT /F1 10 Tf {x} {680 - 20 * r} Td ({text}) Tj ET")
+    return "\n".join(ops)
+
+
+def word(text, x0, top):
+    return {'text': text, 'x0': x0, 'x1': x0 + 30, 'top': top, 'bottom': top + 8, 'chars': []}
+
+class TestLayoutTemplates(unittest.TestCase):
+
+    def test_fingerprint_ignores_text(self):
+        first = layout_page([{'text': '1'}])
+        later = layout_page([{'text': '2'}])
+
+        self.assertEqual(layout_fingerprint(first), layout_fingerprint(later))
+        self.assertIsNone(layout_fingerprint(MagicMock(width=595, height=842, rects=[], lines=[])))
+
+    def test_only_word_built_pages_get_a_template(self):
+        word_built = [{'bbox': (0, 0, 10, 10), 'col_centers': [2.0, 8.0]}]
+        ruled = [{'bbox': (0, 0, 10, 10), 'col_centers': None}]
+
+        self.assertEqual(make_template(word_built),
+                         {'tables': [{'bbox': [0, 0, 10, 10], 'col_centers': [2.0, 8.0]}]})
+        self.assertIsNone(make_template(ruled))
+
+    def test_store_round_trip(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'layouts.json')
+            save_templates(path, {'abc': {'tables': []}})
+
+            self.assertEqual(load_templates(path), {'abc': {'tables': []}})
+            self.assertEqual(load_templates(os.path.join(tmp, 'missing.json')), {})
+
+    def test_matching_page_skips_table_finding(self):
+        page = layout_page()
+        page.extract_words.return_value = [
+            word('Fund', 60, 110), word('NAV', 300, 110),
+            word('Equity', 60, 130), word('12.5', 300, 130),
+            word('Debt', 60, 150), word('10.1', 300, 150),
+        ]
+        templates = {layout_fingerprint(page): {'tables': [
+            {'bbox': [50, 100, 550, 200], 'col_centers': [75.0, 315.0]}]}}
+        stats = {}
+
+        result = extract_page_tables(page, templates, stats)
+
+        page.find_tables.assert_not_called()
+        self.assertEqual(result[0]['table'].to_rows(),
+                         [['Fund', 'NAV'], ['Equity', '12.5'], ['Debt', '10.1']])
+        self.assertEqual(stats['template_hits'], 1)
+
+    def test_longer_table_on_same_layout_is_not_cut_off(self):
+        # Same rulings, but the second page's table has more rows
+        pdf = io.BytesIO(make_pdf([merged_statement(5), merged_statement(15, first=100)]))
+        stats = {}
+
+        tables = extract_tables_from_pdf(pdf, stitch=False, templates={}, stats=stats)
+
+        self.assertEqual([t['table'].n_rows for t in tables], [6, 16])
+        self.assertNotIn('template_hits', stats)
+
+    def test_table_of_same_length_still_uses_template(self):
+        pdf = io.BytesIO(make_pdf([merged_statement(5), merged_statement(5, first=100)]))
+        stats = {}
+
+        tables = extract_tables_from_pdf(pdf, stitch=False, templates={}, stats=stats)
+
+        self.assertEqual([t['table'].n_rows for t in tables], [6, 6])
+        self.assertEqual(stats['template_hits'], 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,201 @@
+import os
+import tempfile
+import time
+import unittest
+from openpyxl import load_workbook
+from distributed_extract import submit, work
+from src.pool import shutdown_pools
+from src.workqueue import MAX_ATTEMPTS, WorkQueue
+from tests.helpers import make_pdf, ruled_table
+
+
+def _backdate(path, seconds):
+    past = time.time() - seconds
+    os.utime(path, (past, past))
+
+
+class TestWorkQueue(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_task_is_claimed_once(self):
+        WorkQueue(self.root, 'a').put('t1', {'n': 1})
+
+        claim = WorkQueue(self.root, 'a').claim()
+
+        self.assertEqual(claim['task'], {'n': 1})
+        self.assertIsNone(WorkQueue(self.root, 'b').claim())
+
+    def test_completed_result_is_readable_by_any_node(self):
+        queue = WorkQueue(self.root, 'a')
+        queue.put('t1', {'n': 1})
+
+        self.assertTrue(queue.complete(queue.claim(), {'tables': 3}))
+
+        self.assertEqual(WorkQueue(self.root, 'b').result('t1'), {'tables': 3})
+        self.assertTrue(queue.finished())
+
+    def test_task_waits_for_its_prerequisites(self):
+        queue = WorkQueue(self.root, 'a')
+        queue.put('write', {}, after=['shard'])
+        queue.put('shard', {})
+
+        shard = queue.claim()
+        self.assertEqual(shard['id'], 'shard')
+        self.assertIsNone(queue.claim())
+
+        queue.complete(shard, None)
+        self.assertEqual(queue.claim()['id'], 'write')
+
+    def test_expired_lease_is_taken_over(self):
+        queue = WorkQueue(self.root, 'a', lease_seconds=5)
+        queue.put('t1', {})
+        lost = queue.claim()
+        _backdate(lost['path'], 60)
+
+        other = WorkQueue(self.root, 'b', lease_seconds=5)
+        self.assertEqual(other.recover(), ['t1'])
+        claim = other.claim()
+
+        self.assertEqual(claim['attempt'], 1)
+        self.assertFalse(queue.heartbeat(lost))
+        # The node that lost its lease cannot complete the task any more
+        self.assertFalse(queue.complete(lost, 'stale'))
+        self.assertTrue(other.complete(claim, 'fresh'))
+        self.assertEqual(queue.result('t1'), 'fresh')
+
+    def test_heartbeat_keeps_the_lease(self):
+        queue = WorkQueue(self.root, 'a', lease_seconds=5)
+        queue.put('t1', {})
+        claim = queue.claim()
+        _backdate(claim['path'], 60)
+
+        self.assertTrue(queue.heartbeat(claim))
+
+        self.assertEqual(WorkQueue(self.root, 'b', lease_seconds=5).recover(), [])
+
+    def test_task_abandoned_too_often_fails(self):
+        queue = WorkQueue(self.root, 'a', lease_seconds=5)
+        queue.put('t1', {})
+        for _ in range(MAX_ATTEMPTS):
+            _backdate(queue.claim()['path'], 60)
+            queue.recover()
+
+        self.assertEqual(queue.status()['failed'], 1)
+        self.assertTrue(queue.finished())
+        with self.assertRaises(KeyError):
+            queue.result('t1')
+
+    def test_handler_error_is_stored_as_result(self):
+        queue = WorkQueue(self.root, 'a')
+        queue.put('t1', {})
+
+        def handler(task, queue, claim):
+            raise ValueError("bad page")
+
+        self.assertEqual(queue.run(handler), 1)
+        self.assertIsInstance(queue.result('t1'), ValueError)
+
+    def test_output_of_abandoned_claim_is_removed(self):
+        queue = WorkQueue(self.root, 'a', lease_seconds=5)
+        queue.put('t1', {})
+        lost = queue.claim()
+        spill = os.path.join(queue.output_dir(lost), 'tables')
+        open(spill, 'wb').close()
+        _backdate(lost['path'], 60)
+
+        WorkQueue(self.root, 'b', lease_seconds=5).recover()
+
+        self.assertFalse(os.path.exists(spill))
+        self.assertEqual(os.listdir(os.path.join(self.root, 'output')), [])
+
+    def test_consumed_results_are_deleted_when_the_consumer_completes(self):
+        queue = WorkQueue(self.root, 'a')
+        queue.put('shard', {})
+        queue.put('write', {}, after=['shard'], consumes=True)
+        shard = queue.claim()
+        open(os.path.join(queue.output_dir(shard), 'tables'), 'wb').close()
+        queue.complete(shard, 'tables')
+        write = queue.claim()
+
+        self.assertEqual(queue.result('shard'), 'tables')
+        queue.complete(write, 'workbook')
+
+        with self.assertRaises(KeyError):
+            queue.result('shard')
+        self.assertEqual(os.listdir(os.path.join(self.root, 'results')), ['write~0'])
+        self.assertEqual(os.listdir(os.path.join(self.root, 'output')), [])
+
+
+class TestDistributedBatch(unittest.TestCase):
+
+    def tearDown(self):
+        shutdown_pools()
+
+    def _make_pdfs(self, tmp, count):
+        input_dir = os.path.join(tmp, 'pdfs')
+        os.makedirs(input_dir)
+        for n in range(count):
+            with open(os.path.join(input_dir, f'report{n}.pdf'), 'wb') as f:
+                f.write(make_pdf(ruled_table()))
+        return input_dir
+
+    def test_processes_share_the_queue(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            input_dir = self._make_pdfs(tmp, 3)
+            queue_dir = os.path.join(tmp, 'queue')
+            output_dir = os.path.join(tmp, 'out')
+
+            self.assertEqual(submit(input_dir, queue_dir, output_dir=output_dir), 3)
+            # One shard and one write task per document, each run once
+            self.assertEqual(work(queue_dir, workers=3), 6)
+
+            self.assertEqual(sorted(os.listdir(output_dir)),
+                             [f'report{n}_Tables.xlsx' for n in range(3)])
+            self.assertEqual(WorkQueue(queue_dir).status(),
+                             {'pending': 0, 'claimed': 0, 'done': 6, 'failed': 0})
+            # Only the write summaries are left; shard results and spill files are gone
+            self.assertEqual(len(os.listdir(os.path.join(queue_dir, 'results'))), 3)
+            self.assertEqual(os.listdir(os.path.join(queue_dir, 'output')), [])
+
+    def test_work_of_a_dead_node_is_recovered(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            input_dir = self._make_pdfs(tmp, 1)
+            queue_dir = os.path.join(tmp, 'queue')
+            output_dir = os.path.join(tmp, 'out')
+            submit(input_dir, queue_dir, output_dir=output_dir)
+            # A node claims the shard and dies without a heartbeat
+            dead = WorkQueue(queue_dir, 'dead-node', lease_seconds=5).claim()
+            _backdate(dead['path'], 60)
+
+            self.assertEqual(work(queue_dir, workers=1, lease_seconds=5), 2)
+
+            self.assertEqual(os.listdir(output_dir), ['report0_Tables.xlsx'])
+
+    def test_resubmitted_queue_does_not_reuse_earlier_results(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            input_dir = self._make_pdfs(tmp, 1)
+            queue_dir = os.path.join(tmp, 'queue')
+            output_dir = os.path.join(tmp, 'out')
+            submit(input_dir, queue_dir, output_dir=output_dir)
+            work(queue_dir, workers=1)
+            # The document changes and the same directory is submitted again
+            with open(os.path.join(input_dir, 'report0.pdf'), 'wb') as f:
+                f.write(make_pdf(ruled_table().replace('1,234.50', '4,321.00')))
+            submit(input_dir, queue_dir, output_dir=output_dir)
+
+            self.assertEqual(work(queue_dir, workers=1), 2)
+
+            sheet = load_workbook(os.path.join(output_dir, 'report0_Tables.xlsx'))['Table_1']
+            values = [cell.value for row in sheet.iter_rows() for cell in row]
+            self.assertIn(4321, values)
+            self.assertNotIn(1234.5, values)
+            self.assertEqual(WorkQueue(queue_dir).status()['done'], 4)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,129 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+from openpyxl import load_workbook
+import json
+from src.fingerprint import collapse_duplicate_tables
+from src.styles import create_style_pool, shared_styles
+from src.table import CompactTable
+from src.writer import (analyze_column_structure, create_excel_from_tables,
+                        create_sharded_workbooks, group_tables)
+
+class TestAnalyzeColumnStructure(unittest.TestCase):
+
+    def test_spanning_header_detected(self):
+        table = [
+            ['Particulars', 'Linked Business', '', '', 'Non-Linked', ''],
+            ['', 'Life', 'Pension', 'Health', 'Life', 'Annuity'],
+            ['Premium', '10', '20', '30', '40', '50'],
+        ]
+
+        result = analyze_column_structure(table)
+
+        self.assertEqual(result['header_rows'], 2)
+        self.assertEqual(result['column_groups'], [
+            {'row': 1, 'start_col': 2, 'end_col': 4, 'label': 'Linked Business'},
+            {'row': 1, 'start_col': 5, 'end_col': 6, 'label': 'Non-Linked'},
+        ])
+
+    def test_empty_cells_without_content_below_do_not_span(self):
+        table = [
+            ['Title', '', ''],
+            ['', '', ''],
+            ['', '', ''],
+        ]
+
+        result = analyze_column_structure(table)
+
+        self.assertEqual(result, {'header_rows': 1, 'column_groups': []})
+
+class TestCreateExcel(unittest.TestCase):
+
+    def test_failing_table_is_skipped(self):
+        tables = [
+            {'table': [['Particulars', 'Q1'], ['Premium', '10']], 'page': 1},
+            {'table': 42, 'page': 2},
+            {'table': [['Claims', '5']], 'page': 3},
+        ]
+        errors = []
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = create_excel_from_tables(tables, os.path.join(tmp, 'out.xlsx'), errors=errors)
+            sheets = load_workbook(path).sheetnames
+
+        self.assertEqual(sheets, ['Table_1', 'Table_3'])
+        self.assertEqual([(e['stage'], e['page']) for e in errors], [('write', 2)])
+
+    def _styled_sheet(self):
+        tables = [{'table': [['Particulars', 'Q1'], ['Premium', '(1,234)'], ['Claims', '56']],
+                   'page': 1}]
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = create_excel_from_tables(tables, os.path.join(tmp, 'out.xlsx'))
+            return load_workbook(path).active
+
+    def _assert_styled(self, ws):
+        self.assertTrue(ws['A1'].font.bold)
+        self.assertEqual(ws['A1'].fill.start_color.rgb, '001F4E79')
+        self.assertEqual(ws['B2'].value, -1234)
+        self.assertEqual(ws['B2'].number_format, '#,##0;(#,##0)')
+        self.assertEqual(ws['B2'].fill.start_color.rgb, '00FFFFFF')
+        self.assertEqual(ws['B3'].fill.start_color.rgb, '00F5F5F5')
+        self.assertEqual(ws['A3'].border.left.style, 'thin')
+
+    def test_pooled_styles_keep_number_formats(self):
+        self._assert_styled(self._styled_sheet())
+
+    def test_public_cell_styles_without_a_style_pool(self):
+        with patch('src.writer.create_style_pool', return_value=None):
+            ws = self._styled_sheet()
+
+        self._assert_styled(ws)
+
+    def test_no_style_pool_without_workbook_style_tables(self):
+        self.assertIsNone(create_style_pool(MagicMock(spec=[]), shared_styles()))
+
+    def test_streamed_duplicates_are_noted_in_the_sheet(self):
+        boilerplate = [['Disclaimer', 'Text'], ['a', 'b']]
+        tables = ({'table': CompactTable.from_rows(boilerplate), 'page': page}
+                  for page in (1, 2, 3))
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = create_excel_from_tables(collapse_duplicate_tables(tables),
+                                            os.path.join(tmp, 'out.xlsx'))
+            wb = load_workbook(path)
+
+        self.assertEqual(wb.sheetnames, ['Table_1'])
+        self.assertEqual(wb['Table_1']['A4'].value, 'Repeated on page(s) 2, 3')
+
+class TestShardedWorkbooks(unittest.TestCase):
+
+    def tables(self, pages):
+        return [{'table': [['Item', 'Value'], [f'p{p}', str(p)]], 'page': p} for p in pages]
+
+    def test_group_by_table_count_and_page_span(self):
+        tables = self.tables([1, 1, 2, 5, 9, 10])
+
+        by_count = [[t['page'] for t in g] for g in group_tables(tables, tables_per_workbook=4)]
+        by_pages = [[t['page'] for t in g] for g in group_tables(tables, pages_per_workbook=4)]
+
+        self.assertEqual(by_count, [[1, 1, 2, 5], [9, 10]])
+        self.assertEqual(by_pages, [[1, 1, 2], [5], [9, 10]])
+
+    def test_parts_and_manifest(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            manifest_path = create_sharded_workbooks(
+                iter(self.tables([1, 2, 3])), os.path.join(tmp, 'report_Tables.xlsx'),
+                tables_per_workbook=2)
+            with open(manifest_path) as f:
+                manifest = json.load(f)
+            second = load_workbook(os.path.join(tmp, 'report_Tables_part002.xlsx'))
+
+        self.assertEqual([w['workbook'] for w in manifest['workbooks']],
+                         ['report_Tables_part001.xlsx', 'report_Tables_part002.xlsx'])
+        self.assertEqual(manifest['workbooks'][1]['pages'], [3, 3])
+        self.assertEqual(second.sheetnames, ['Table_3'])
+
+if __name__ == '__main__':
+    unittest.main()